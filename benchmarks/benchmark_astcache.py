@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+
+"""benchmark_astcache.py - compares the time for parsing and transforming
+a source into an abstract syntax-tree with the time for loading the same
+tree from the AST-cache, and the time for compiling a source with several
+configurations with and without the cache.
+
+Usage examples::
+
+    $ python benchmarks/benchmark_astcache.py
+    $ python benchmarks/benchmark_astcache.py --size 20000 --shapes mixed
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+try:
+    scriptdir = os.path.dirname(os.path.realpath(__file__))
+except NameError:
+    scriptdir = ''
+rootdir = os.path.abspath(os.path.join(scriptdir, '..'))
+if rootdir not in sys.path:  sys.path.append(rootdir)
+if scriptdir not in sys.path:  sys.path.append(scriptdir)
+
+from DHParser.configuration import get_config_value, set_config_value
+from ts2pythonParser import compile_src, pipeline, set_compatibility_level, ASTCache, \
+    TS2PYTHON_CONFIG_DEFAULT
+from benchmark_ts2python import DEMO_FILES, SHAPES, generate
+
+
+VARIANTS: List[Tuple[Tuple[int, int], str]] = [
+    ((3, 8), 'local'), ((3, 10), 'local'), ((3, 12), 'toplevel'), ((3, 14), 'toplevel')]
+
+
+def best_of(repetitions: int, func) -> float:
+    best = float('inf')
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def configure(version_info: Tuple[int, int], anonymous: str):
+    for key, value in TS2PYTHON_CONFIG_DEFAULT.items():
+        set_config_value('ts2python.' + key, value, allow_new_key=True)
+    set_compatibility_level(version_info, 'config')
+    set_config_value('ts2python.RenderAnonymous', anonymous)
+
+
+def measure(source: str, repetitions: int) -> Dict[str, float]:
+    cache_dir = tempfile.mkdtemp()
+    try:
+        cache = ASTCache(cache_dir)
+        parse_time = best_of(repetitions, lambda: pipeline(source, 'AST'))
+        pipeline(source, 'AST', ast_cache=cache)
+        load_time = best_of(repetitions, lambda: cache.load(source))
+        cache_size = os.path.getsize(cache.file_name(source))
+
+        def compile_variants(ast_cache):
+            for version_info, anonymous in VARIANTS:
+                configure(version_info, anonymous)
+                compile_src(source, ast_cache=ast_cache)
+
+        uncached = best_of(repetitions, lambda: compile_variants(None))
+        cached = best_of(repetitions, lambda: compile_variants(cache))
+    finally:
+        shutil.rmtree(cache_dir)
+    return {'parse': parse_time, 'load': load_time,
+            'source_size': len(source.encode('utf-8')), 'cache_size': cache_size,
+            'uncached': uncached, 'cached': cached}
+
+
+def main():
+    from argparse import ArgumentParser
+    parser = ArgumentParser(description='Benchmarks the AST-cache of ts2python')
+    parser.add_argument('--size', type=int, default=5000,
+                        help='Number of lines of each synthetic source (default: 5000)')
+    parser.add_argument('--shapes', default='mixed',
+                        help='Comma-separated list of synthetic shapes: '
+                             + ', '.join(list(SHAPES) + ['mixed']))
+    parser.add_argument('--no-demo', action='store_true',
+                        help='Do not benchmark the demo-files')
+    parser.add_argument('--repetitions', type=int, default=3,
+                        help='Number of runs per measurement; the best time is reported')
+    args = parser.parse_args()
+
+    corpora = {}
+    if not args.no_demo:
+        for file_name in DEMO_FILES:
+            with open(file_name, 'r', encoding='utf-8') as f:
+                corpora[os.path.basename(file_name)] = f.read()
+    for shape in args.shapes.split(','):
+        shape = shape.strip()
+        corpora[f'{shape}-{args.size}'] = generate(shape, args.size)
+
+    saved = {key: get_config_value('ts2python.' + key, value)
+             for key, value in TS2PYTHON_CONFIG_DEFAULT.items()}
+    compile_src(generate('mixed', 200))  # warm up
+    print(f'{len(VARIANTS)} variants: '
+          + ', '.join(f'{v[0]}.{v[1]}/{a}' for v, a in VARIANTS))
+    print(f'{"corpus":<24}{"parse [ms]":>12}{"load [ms]":>12}{"source [kB]":>13}'
+          f'{"cache [kB]":>12}{"variants [ms]":>15}{"cached [ms]":>13}')
+    try:
+        for name, source in corpora.items():
+            r = measure(source, args.repetitions)
+            print(f'{name:<24}{r["parse"] * 1000:>12.1f}{r["load"] * 1000:>12.1f}'
+                  f'{r["source_size"] / 1024:>13.0f}{r["cache_size"] / 1024:>12.0f}'
+                  f'{r["uncached"] * 1000:>15.0f}{r["cached"] * 1000:>13.0f}')
+    finally:
+        for key, value in saved.items():
+            set_config_value('ts2python.' + key, value, allow_new_key=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+
+"""benchmark_chunked.py - compares the peak memory consumption and the time
+of compiling a source as a whole (compile_src()) with compiling it in
+chunks of top-level declarations (compile_chunked()).
+
+"peak" is the maximum size of the memory blocks allocated by the Python
+interpreter during the compilation, measured with tracemalloc. Because
+tracing slows down the compilation considerably, the time is measured
+in a separate run without tracing. Every measurement runs in a fresh
+interpreter, in which the grammar and the compiler have already been
+instantiated and the source has already been read.
+
+Usage examples::
+
+    $ python benchmarks/benchmark_chunked.py
+    $ python benchmarks/benchmark_chunked.py --size 50000 --chunk-size 500
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+from typing import Optional
+
+try:
+    scriptdir = os.path.dirname(os.path.realpath(__file__))
+except NameError:
+    scriptdir = ''
+rootdir = os.path.abspath(os.path.join(scriptdir, '..'))
+if rootdir not in sys.path:  sys.path.append(rootdir)
+if scriptdir not in sys.path:  sys.path.append(scriptdir)
+
+from ts2pythonParser import split_declarations, CHUNK_SIZE
+from benchmark_ts2python import DEMO_FILES, generate
+
+
+COMPILE_SCRIPT = """
+import sys, time, tracemalloc
+sys.path[:0] = [{rootdir!r}]
+import ts2pythonParser
+with open({source_file!r}, 'r', encoding='utf-8') as f:
+    source = f.read()
+ts2pythonParser.warm_up()
+if {trace!r}:  tracemalloc.start()
+start = time.perf_counter()
+if {chunk_size!r}:
+    ts2pythonParser.compile_chunked(source, {result_file!r}, {chunk_size!r})
+else:
+    code, _ = ts2pythonParser.compile_src(source)
+    with open({result_file!r}, 'w', encoding='utf-8') as f:
+        f.write(code)
+elapsed = time.perf_counter() - start
+print(tracemalloc.get_traced_memory()[1] if {trace!r} else elapsed)
+"""
+
+
+def run(source_file: str, chunk_size: int, trace: bool) -> Optional[float]:
+    """Compiles the source file in a fresh interpreter and returns the time
+    or, if trace is True, the peak memory of the compilation or None, if
+    the compilation fails."""
+    with tempfile.TemporaryDirectory() as directory:
+        script = COMPILE_SCRIPT.format(rootdir=rootdir, source_file=source_file,
+                                       result_file=os.path.join(directory, 'out.py'),
+                                       chunk_size=chunk_size, trace=trace)
+        process = subprocess.run([sys.executable, '-c', script],
+                                 capture_output=True, text=True)
+    if process.returncode != 0:
+        return None
+    return float(process.stdout.split()[-1])
+
+
+def main():
+    from argparse import ArgumentParser
+    parser = ArgumentParser(description='Benchmarks the chunked compilation of large sources')
+    parser.add_argument('--size', type=int, default=20000,
+                        help='Number of lines of the synthetic source (default: 20000)')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                        help=f'Lines per chunk (default: {CHUNK_SIZE})')
+    args = parser.parse_args()
+
+    corpora = {os.path.basename(file_name): file_name for file_name in DEMO_FILES}
+    with tempfile.TemporaryDirectory() as directory:
+        synthetic = os.path.join(directory, 'mixed.ts')
+        with open(synthetic, 'w', encoding='utf-8') as f:
+            f.write(generate('mixed', args.size))
+        corpora[f'mixed-{args.size}'] = synthetic
+
+        s = lambda t: f'{t:.2f}' if t is not None else 'n/a'
+        mb = lambda m: f'{m / 2**20:.1f}' if m is not None else 'n/a'
+        print('whole / chunked')
+        print(f'{"corpus":<20}{"lines":>8}{"chunks":>8}{"time [s]":>20}{"peak [MB]":>20}')
+        for name, file_name in corpora.items():
+            with open(file_name, 'r', encoding='utf-8') as f:
+                source = f.read()
+            chunks = split_declarations(source, args.chunk_size)
+            whole = [run(file_name, 0, trace) for trace in (False, True)]
+            chunked = [run(file_name, args.chunk_size, trace) for trace in (False, True)]
+            print(f'{name:<20}{source.count(chr(10)):>8}'
+                  f'{len(chunks) if chunks else "n/a":>8}'
+                  f'{s(whole[0]):>10}{s(chunked[0]):>10}'
+                  f'{mb(whole[1]):>10}{mb(chunked[1]):>10}')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+
+"""benchmark_comments.py - compares the time spent on preprocessing and
+parsing with and without removing the comments in the preprocessing
+stage (configuration value "ts2python.StripComments"). The comments are
+dropped from the AST in both cases, so the generated code is the same.
+
+Usage examples::
+
+    $ python benchmarks/benchmark_comments.py
+    $ python benchmarks/benchmark_comments.py --size 20000 --repetitions 5
+"""
+
+import os
+import sys
+from typing import Dict
+
+try:
+    scriptdir = os.path.dirname(os.path.realpath(__file__))
+except NameError:
+    scriptdir = ''
+rootdir = os.path.abspath(os.path.join(scriptdir, '..'))
+if rootdir not in sys.path:  sys.path.append(rootdir)
+if scriptdir not in sys.path:  sys.path.append(scriptdir)
+
+from DHParser.configuration import set_config_value
+from ts2pythonParser import compile_src, strip_comments, PipelineProfile, warm_up
+from benchmark_ts2python import DEMO_FILES, generate
+
+
+def measure(source: str, strip: bool, repetitions: int) -> Dict[str, float]:
+    """Returns the average time per compilation spent on each stage."""
+    set_config_value('ts2python.StripComments', strip, allow_new_key=True)
+    profile = PipelineProfile()
+    for _ in range(repetitions):
+        compile_src(source, profile=profile)
+    times = {name: stats.time / repetitions for name, stats in profile.stages.items()}
+    times['total'] = sum(times.values())
+    return times
+
+
+def comment_share(source: str) -> float:
+    """Returns the share of the comments in the size of the source."""
+    stripped, _ = strip_comments(source)
+    return 1 - len(stripped) / len(source)
+
+
+def main():
+    from argparse import ArgumentParser
+    parser = ArgumentParser(description='Benchmarks stripping comments before parsing')
+    parser.add_argument('--size', type=int, default=5000,
+                        help='Number of lines of the synthetic source (default: 5000)')
+    parser.add_argument('--repetitions', type=int, default=3,
+                        help='Number of compilations per measurement (default: 3)')
+    args = parser.parse_args()
+
+    corpora = {}
+    for file_name in DEMO_FILES:
+        with open(file_name, 'r', encoding='utf-8') as f:
+            corpora[os.path.basename(file_name)] = f.read()
+    corpora[f'mixed-{args.size}'] = generate('mixed', args.size)
+
+    set_config_value('ts2python.KeepComments', False, allow_new_key=True)
+    set_config_value('ts2python.DocComments', '', allow_new_key=True)
+    warm_up()
+    print('default / with ts2python.StripComments')
+    print(f'{"corpus":<20}{"comments":>10}{"preprocessing":>20}{"parsing":>20}'
+          f'{"total":>20}   [ms]')
+    try:
+        for name, source in corpora.items():
+            default = measure(source, False, args.repetitions)
+            stripped = measure(source, True, args.repetitions)
+            print(f'{name:<20}{comment_share(source):>9.0%} ' + ''.join(
+                f'{default[stage] * 1000:>10.0f}{stripped[stage] * 1000:>10.0f}'
+                for stage in ('preprocessing', 'parsing', 'total')))
+    finally:
+        set_config_value('ts2python.StripComments', False, allow_new_key=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+
+"""benchmark_dispatch.py - compares the structural dispatch of dictionaries
+on TypedDict-types by ts2python's singledispatch with trying the types one
+after the other with json_validation.validate_type().
+
+Two families of synthetic TypedDicts are generated: "literal" TypedDicts,
+which are told apart by the value of a common field "kind" with a
+Literal-type, and "keys" TypedDicts, which are told apart only by their
+keys. Every TypedDict is dispatched on equally often.
+
+The second table shows the latency of the first calls of single-dispatch
+methods, the registration of which has been postponed, because they
+dispatch on the class that defines them: "lazy" is the time of the first
+calls if the registrations are resolved by the calls, "finalize()" the
+time of resolving all registrations at once with
+singledispatch_shim.finalize() and "first calls" the time of the first
+calls afterwards.
+
+The third table compares the overhead of calling a generic function with
+arguments of different classes through functools.singledispatch and
+through ts2python's singledispatch and multidispatch with calling the
+implementations directly. "multidispatch (2)" dispatches on two arguments.
+
+Usage examples::
+
+    $ python benchmarks/benchmark_dispatch.py
+    $ python benchmarks/benchmark_dispatch.py --types 4,64,256 --calls 20000
+"""
+
+import functools
+import os
+import sys
+from time import perf_counter
+from types import ModuleType
+from typing import Callable, Dict, List, Tuple
+
+try:
+    scriptdir = os.path.dirname(os.path.realpath(__file__))
+except NameError:
+    scriptdir = ''
+rootdir = os.path.abspath(os.path.join(scriptdir, '..'))
+if rootdir not in sys.path:  sys.path.append(rootdir)
+if scriptdir not in sys.path:  sys.path.append(scriptdir)
+
+from ts2python.json_validation import validate_type
+from ts2python.singledispatch_shim import singledispatch, multidispatch, finalize
+from ts2python.typeddict_shim import TypedDict, Literal, NotRequired
+
+
+def generate(family: str, n: int) -> Tuple[List[type], List[Dict]]:
+    """Returns n TypedDicts of the given family and one sample for each."""
+    types, samples = [], []
+    for i in range(n):
+        if family == 'literal':
+            fields = {'kind': Literal[f'kind{i}'], 'id': int, 'name': str,
+                      'detail': NotRequired[str]}
+            sample = {'kind': f'kind{i}', 'id': i, 'name': f'name{i}'}
+        else:
+            fields = {'id': int, f'field{i}': str, 'detail': NotRequired[str]}
+            sample = {'id': i, f'field{i}': 'value'}
+        types.append(TypedDict(f'{family.capitalize()}{i}', fields))
+        samples.append(sample)
+    return types, samples
+
+
+def structural(types: List[type]) -> Callable:
+    @singledispatch
+    def handle(arg):
+        raise TypeError(f'No implementation for {arg}')
+    for i, T in enumerate(types):
+        handle.register(T, lambda arg, i=i: i)
+    return handle
+
+
+def sequential(types: List[type]) -> Callable:
+    def handle(arg):
+        for i, T in enumerate(types):
+            try:
+                validate_type(arg, T)
+                return i
+            except TypeError:
+                pass
+        raise TypeError(f'No implementation for {arg}')
+    return handle
+
+
+def measure(handle: Callable, samples: List[Dict], calls: int) -> float:
+    """Returns the average time per call in seconds."""
+    for i, sample in enumerate(samples):
+        assert handle(sample) == i
+    rounds = max(calls // len(samples), 1)
+    start = perf_counter()
+    for _ in range(rounds):
+        for sample in samples:
+            handle(sample)
+    return (perf_counter() - start) / (rounds * len(samples))
+
+
+METHOD_TEMPLATE = """
+class Handler{i}:
+    @singledispatchmethod
+    def handle(self, other):
+        raise TypeError(f'No implementation for {{other}}')
+
+    @handle.register
+    def _(self, other: Handler{i}):
+        return {i}
+
+    @handle.register
+    def _(self, other: int):
+        return -1
+"""
+
+
+def postponed_module(name: str, n: int) -> ModuleType:
+    """Returns a module with n classes with single-dispatch methods, the
+    registrations of which are postponed."""
+    code = 'from __future__ import annotations\n' \
+        'from ts2python.singledispatch_shim import singledispatchmethod\n' \
+        + ''.join(METHOD_TEMPLATE.format(i=i) for i in range(n))
+    module = ModuleType(name)
+    sys.modules[name] = module
+    exec(code, module.__dict__)
+    return module
+
+
+def first_calls(module: ModuleType, n: int) -> float:
+    """Returns the time of calling the method of each class once."""
+    handlers = [getattr(module, f'Handler{i}')() for i in range(n)]
+    start = perf_counter()
+    for i, handler in enumerate(handlers):
+        assert handler.handle(handler) == i
+    return perf_counter() - start
+
+
+class Custom:
+    pass
+
+
+class Derived(Custom):
+    pass
+
+
+def overhead(decorator: Callable, calls: int, repetitions: int = 5,
+             arguments: int = 1) -> float:
+    """Returns the best average time per call of a generic function created
+    with decorator in seconds."""
+    @decorator
+    def generic(*args):
+        return 0
+    classes = [int, str, list, Custom]
+    for i, cls in enumerate(classes):
+        if arguments == 1:
+            generic.register(cls, func=lambda *args, i=i: i)
+        else:
+            generic.register(cls, classes[-i], func=lambda *args, i=i: i)
+    samples = [(1,), ('a',), ([],), (Custom(),), (Derived(),), (1.0,)]
+    if arguments == 2:
+        samples = [args + other for args, other in zip(samples, reversed(samples))]
+    rounds = max(calls // len(samples), 1)
+    best = float('inf')
+    for _ in range(repetitions):
+        start = perf_counter()
+        for _ in range(rounds):
+            for sample in samples:
+                generic(*sample)
+        best = min(best, perf_counter() - start)
+    return best / (rounds * len(samples))
+
+
+def main():
+    from argparse import ArgumentParser
+    parser = ArgumentParser(description='Benchmarks the structural dispatch of dictionaries')
+    parser.add_argument('--types', default='4,16,64',
+                        help='Comma-separated numbers of TypedDicts (default: 4,16,64)')
+    parser.add_argument('--calls', type=int, default=10000,
+                        help='Number of calls per measurement (default: 10000)')
+    args = parser.parse_args()
+
+    print(f'{"family":<10}{"types":>8}{"singledispatch":>16}{"validate_type":>16}'
+          f'{"speedup":>10}   [µs/call]')
+    for family in ('literal', 'keys'):
+        for n in (int(n) for n in args.types.split(',')):
+            types, samples = generate(family, n)
+            dispatched = measure(structural(types), samples, args.calls)
+            validated = measure(sequential(types), samples, args.calls)
+            print(f'{family:<10}{n:>8}{dispatched * 1e6:>16.2f}{validated * 1e6:>16.2f}'
+                  f'{validated / dispatched:>9.0f}x')
+
+    print(f'\n{"postponed":<10}{"methods":>8}{"lazy":>16}{"finalize()":>16}'
+          f'{"first calls":>16}   [ms]')
+    for n in (int(n) for n in args.types.split(',')):
+        lazy = first_calls(postponed_module(f'lazy_{n}', n), n)
+        module = postponed_module(f'finalized_{n}', n)
+        start = perf_counter()
+        finalize(module.__name__)
+        finalized = perf_counter() - start
+        after = first_calls(module, n)
+        print(f'{"":<10}{n:>8}{lazy * 1000:>16.2f}{finalized * 1000:>16.2f}{after * 1000:>16.2f}')
+
+    print(f'\n{"call":<18}{"time":>16}   [ns/call]')
+    for name, decorator in (('direct', lambda f: setattr(f, 'register', lambda c, func: func) or f),
+                            ('functools', functools.singledispatch),
+                            ('singledispatch', singledispatch),
+                            ('multidispatch', multidispatch)):
+        print(f'{name:<18}{overhead(decorator, args.calls * 10) * 1e9:>16.0f}')
+    print(f'{"multidispatch (2)":<18}'
+          f'{overhead(multidispatch, args.calls * 10, arguments=2) * 1e9:>16.0f}')
+
+
+if __name__ == "__main__":
+    main()
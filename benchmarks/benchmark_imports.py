@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+
+"""benchmark_imports.py - measures the time and the memory it takes to
+import the modules that ts2python generates from the demo-files for
+different compatibility levels, with and without the configuration value
+"ts2python.MinimalImports".
+
+"cold" is the time of an import that compiles the module from source,
+"warm" the time of an import from the cached bytecode. "memory" is the
+size of the memory blocks allocated during the import that are still
+alive afterwards. Every measurement runs in a fresh interpreter.
+Compatibility levels that require a newer Python version than the one
+running the benchmark are reported as "n/a".
+
+Usage examples::
+
+    $ python benchmarks/benchmark_imports.py
+    $ python benchmarks/benchmark_imports.py --levels 3.8,3.11 --repetitions 10
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from typing import Dict, Optional, Tuple
+
+try:
+    scriptdir = os.path.dirname(os.path.realpath(__file__))
+except NameError:
+    scriptdir = ''
+rootdir = os.path.abspath(os.path.join(scriptdir, '..'))
+if rootdir not in sys.path:  sys.path.append(rootdir)
+if scriptdir not in sys.path:  sys.path.append(scriptdir)
+
+from DHParser.configuration import get_config_value, set_config_value
+from ts2pythonParser import compile_src, set_compatibility_level, TS2PYTHON_CONFIG_DEFAULT
+from benchmark_ts2python import DEMO_FILES
+
+
+TIME_SCRIPT = """
+import sys, time
+sys.path[:0] = [{directory!r}, {rootdir!r}]
+start = time.perf_counter()
+import generated
+print(time.perf_counter() - start)
+"""
+
+MEMORY_SCRIPT = """
+import sys, tracemalloc
+sys.path[:0] = [{directory!r}, {rootdir!r}]
+tracemalloc.start()
+import generated
+print(tracemalloc.get_traced_memory()[0])
+"""
+
+
+def run(script: str, directory: str, *flags: str) -> Optional[float]:
+    """Runs the script in a fresh interpreter and returns the number that it
+    prints last or None, if the script fails."""
+    script = script.format(directory=directory, rootdir=rootdir)
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    process = subprocess.run([sys.executable, *flags, '-c', script],
+                             capture_output=True, text=True, env=env)
+    if process.returncode != 0:
+        return None
+    return float(process.stdout.split()[-1])
+
+
+def measure(code: str, repetitions: int) -> Dict[str, Optional[float]]:
+    directory = tempfile.mkdtemp()
+    try:
+        with open(os.path.join(directory, 'generated.py'), 'w', encoding='utf-8') as f:
+            f.write(code)
+        # -B: do not write bytecode, so that every run compiles the module
+        cold = [run(TIME_SCRIPT, directory, '-B') for _ in range(repetitions)]
+        run(TIME_SCRIPT, directory)  # writes the bytecode
+        warm = [run(TIME_SCRIPT, directory) for _ in range(repetitions)]
+        memory = run(MEMORY_SCRIPT, directory)
+    finally:
+        shutil.rmtree(directory)
+    best = lambda times: None if None in times else min(times)
+    return {'cold': best(cold), 'warm': best(warm), 'memory': memory}
+
+
+def generate(source: str, version_info: Tuple[int, int], minimal: bool) -> str:
+    for key, value in TS2PYTHON_CONFIG_DEFAULT.items():
+        set_config_value('ts2python.' + key, value, allow_new_key=True)
+    set_compatibility_level(version_info, 'config')
+    set_config_value('ts2python.MinimalImports', minimal, allow_new_key=True)
+    code, _ = compile_src(source)
+    return code
+
+
+def main():
+    from argparse import ArgumentParser
+    parser = ArgumentParser(description='Benchmarks the import of generated modules')
+    parser.add_argument('--levels', default='3.8,3.9,3.10,3.11,3.12,3.13,3.14',
+                        help='Comma-separated list of compatibility levels')
+    parser.add_argument('--repetitions', type=int, default=5,
+                        help='Number of imports per measurement; the best time is reported')
+    args = parser.parse_args()
+    levels = [tuple(int(n) for n in level.split('.')) for level in args.levels.split(',')]
+
+    saved = {key: get_config_value('ts2python.' + key, value)
+             for key, value in TS2PYTHON_CONFIG_DEFAULT.items()}
+    ms = lambda t: f'{t * 1000:.1f}' if t is not None else 'n/a'
+    kb = lambda m: f'{m / 1024:.0f}' if m is not None else 'n/a'
+    print('default / with ts2python.MinimalImports')
+    print(f'{"corpus":<20}{"level":>6}{"cold [ms]":>20}{"warm [ms]":>20}{"memory [kB]":>20}')
+    try:
+        for file_name in DEMO_FILES:
+            with open(file_name, 'r', encoding='utf-8') as f:
+                source = f.read()
+            name = os.path.basename(file_name)
+            for version_info in levels:
+                default = measure(generate(source, version_info, False), args.repetitions)
+                minimal = measure(generate(source, version_info, True), args.repetitions)
+                print(f'{name:<20}{"%i.%i" % version_info:>6}'
+                      f'{ms(default["cold"]):>10}{ms(minimal["cold"]):>10}'
+                      f'{ms(default["warm"]):>10}{ms(minimal["warm"]):>10}'
+                      f'{kb(default["memory"]):>10}{kb(minimal["memory"]):>10}')
+    finally:
+        for key, value in saved.items():
+            set_config_value('ts2python.' + key, value, allow_new_key=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+
+"""benchmark_interning.py - measures the effect of interning structurally
+identical anonymous interfaces (configuration value
+"ts2python.InternAnonymous") on the number of generated classes, the size
+of the generated modules and the time it takes to import them.
+
+Usage examples::
+
+    $ python benchmarks/benchmark_interning.py
+    $ python benchmarks/benchmark_interning.py --size 20000 --anonymous toplevel
+"""
+
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+from typing import Dict, Optional
+
+try:
+    scriptdir = os.path.dirname(os.path.realpath(__file__))
+except NameError:
+    scriptdir = ''
+rootdir = os.path.abspath(os.path.join(scriptdir, '..'))
+if rootdir not in sys.path:  sys.path.append(rootdir)
+if scriptdir not in sys.path:  sys.path.append(scriptdir)
+
+from DHParser.configuration import set_config_value
+from ts2pythonParser import compile_src, interning_statistics
+from benchmark_ts2python import DEMO_FILES, generate
+
+
+IMPORT_SCRIPT = """
+import sys, time
+sys.path[:0] = [{directory!r}, {rootdir!r}]
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+
+def import_time(code: str, repetitions: int) -> Optional[float]:
+    """Returns the best time of importing the generated code in a fresh
+    interpreter or None, if the code cannot be imported."""
+    directory = tempfile.mkdtemp()
+    try:
+        with open(os.path.join(directory, 'generated.py'), 'w', encoding='utf-8') as f:
+            f.write(code)
+        script = IMPORT_SCRIPT.format(directory=directory, rootdir=rootdir, module='generated')
+        best = float('inf')
+        for _ in range(repetitions):
+            # -B: do not write bytecode, so that every run compiles the module
+            process = subprocess.run([sys.executable, '-B', '-c', script],
+                                     capture_output=True, text=True)
+            if process.returncode != 0:
+                return None
+            best = min(best, float(process.stdout.split()[-1]))
+        return best
+    finally:
+        shutil.rmtree(directory)
+
+
+def measure(source: str, intern: bool, repetitions: int) -> Dict:
+    set_config_value('ts2python.InternAnonymous', intern, allow_new_key=True)
+    code, errors = compile_src(source)
+    anonymous, duplicates = interning_statistics()
+    return {'classes': len(re.findall(r'^\s*class ', code, re.MULTILINE)),
+            'size': len(code.encode('utf-8')),
+            'anonymous': anonymous,
+            'duplicates': duplicates,
+            'import': import_time(code, repetitions)}
+
+
+def main():
+    from argparse import ArgumentParser
+    parser = ArgumentParser(description='Benchmarks interning of anonymous interfaces')
+    parser.add_argument('--size', type=int, default=5000,
+                        help='Number of lines of the synthetic source (default: 5000)')
+    parser.add_argument('--anonymous', default='local', choices=['local', 'toplevel'],
+                        help='Rendering of anonymous interfaces (default: local)')
+    parser.add_argument('--repetitions', type=int, default=5,
+                        help='Number of imports per module; the best time is reported')
+    args = parser.parse_args()
+
+    corpora = {}
+    for file_name in DEMO_FILES:
+        with open(file_name, 'r', encoding='utf-8') as f:
+            corpora[os.path.basename(file_name)] = f.read()
+    corpora[f'anonymous-{args.size}'] = generate('anonymous', args.size)
+
+    set_config_value('ts2python.RenderAnonymous', args.anonymous, allow_new_key=True)
+    print(f'{"corpus":<20}{"classes":>16}{"size [kB]":>16}{"duplicates":>12}'
+          f'{"import [ms]":>20}')
+    try:
+        for name, source in corpora.items():
+            before = measure(source, False, args.repetitions)
+            after = measure(source, True, args.repetitions)
+            ms = lambda t: f'{t * 1000:.1f}' if t is not None else 'n/a'
+            print(f'{name:<20}'
+                  f'{before["classes"]:>8}{after["classes"]:>8}'
+                  f'{before["size"] / 1024:>8.0f}{after["size"] / 1024:>8.0f}'
+                  f'{after["duplicates"]:>6}/{after["anonymous"]:<5}'
+                  f'{ms(before["import"]):>10}{ms(after["import"]):>10}')
+    finally:
+        set_config_value('ts2python.InternAnonymous', False, allow_new_key=True)
+        set_config_value('ts2python.RenderAnonymous', 'local', allow_new_key=True)
+
+
+if __name__ == "__main__":
+    main()
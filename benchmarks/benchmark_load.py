@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+
+"""benchmark_load.py - load test of ts2pythonServer: sends a burst of
+compilation requests at once and measures the latency of every request.
+
+The test is run against two servers: "unbounded" admits every request
+and submits each one as a task of its own (--maxpending 0 --batch 1), so
+the requests of a burst pile up in the queue of the worker pool. "bounded"
+uses admission control (--maxpending N) and batching (--batch N), rejecting
+the requests that exceed the limit with a "server busy"-error right away.
+The latency percentiles are those of the completed requests; rejected
+requests are counted separately. A fraction of the requests (--duplicates)
+repeats sources of the burst, which the server can coalesce with the
+identical requests that are still being compiled.
+
+Usage examples::
+
+    $ python benchmarks/benchmark_load.py
+    $ python benchmarks/benchmark_load.py --requests 400 --workers 2 --maxpending 16
+"""
+
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+try:
+    scriptdir = os.path.dirname(os.path.realpath(__file__))
+except NameError:
+    scriptdir = ''
+rootdir = os.path.abspath(os.path.join(scriptdir, '..'))
+if rootdir not in sys.path:  sys.path.append(rootdir)
+if scriptdir not in sys.path:  sys.path.append(scriptdir)
+
+
+def source(i: int, size: int) -> str:
+    return '\n'.join(f'interface L{i}_{k} {{\n  a: number;\n  b?: string[];\n}}\n'
+                     for k in range(size))
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+async def read_response(reader) -> bytes:
+    header = await reader.readuntil(b'\r\n\r\n')
+    length = int(header[header.find(b':') + 1:].strip())
+    return await reader.readexactly(length)
+
+
+def framed(data: str) -> bytes:
+    data = data.encode()
+    return b'Content-Length: %i\r\n\r\n' % len(data) + data
+
+
+async def burst(port: int, requests: int, duplicates: float, size: int) -> Dict:
+    from ts2pythonServer import IDENTIFY_REQUEST, STOP_SERVER_REQUEST_BYTES, \
+        is_busy_error, send_request
+    for _ in range(200):
+        try:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            break
+        except OSError:
+            await asyncio.sleep(0.1)
+    else:
+        raise ConnectionError('server did not start')
+    await send_request(reader, writer, IDENTIFY_REQUEST)
+    distinct = max(int(requests * (1.0 - duplicates)), 1)
+    numbers = [i % distinct for i in range(requests)]
+    sent = {}  # number -> list of times at which it was sent
+    started = time.perf_counter()
+    for i in numbers:
+        sent.setdefault(i, []).append(time.perf_counter())
+        writer.write(framed(source(i, size)))
+    await writer.drain()
+    latencies, rejected = [], 0
+    for _ in range(requests):
+        response = json.loads(await read_response(reader))
+        if is_busy_error(response):
+            rejected += 1
+            continue
+        code = response[0]
+        i = int(code[code.find('class L') + 7:code.find('_0(')])
+        latencies.append(time.perf_counter() - sent[i].pop())
+    total = time.perf_counter() - started
+    writer.write(STOP_SERVER_REQUEST_BYTES)
+    await writer.drain()
+    writer.close()
+    return {'latencies': sorted(latencies), 'rejected': rejected, 'total': total}
+
+
+def run(options: List[str], requests: int, duplicates: float, size: int) -> Dict:
+    port = free_port()
+    server = subprocess.Popen([sys.executable, os.path.join(rootdir, 'ts2pythonServer.py'),
+                               '--startserver', '127.0.0.1', str(port)] + options,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        return asyncio.run(burst(port, requests, duplicates, size))
+    finally:
+        try:
+            server.wait(10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+def main():
+    from argparse import ArgumentParser
+    parser = ArgumentParser(description='Load test of ts2pythonServer')
+    parser.add_argument('--requests', type=int, default=200,
+                        help='Number of requests of the burst')
+    parser.add_argument('--duplicates', type=float, default=0.25,
+                        help='Fraction of requests that repeat a source of the burst')
+    parser.add_argument('--size', type=int, default=20,
+                        help='Number of interfaces per source')
+    parser.add_argument('--workers', type=int, default=2,
+                        help='Number of worker processes of the server')
+    parser.add_argument('--maxpending', type=int, default=16,
+                        help='Limit of pending compile requests of the bounded server')
+    parser.add_argument('--batch', type=int, default=8,
+                        help='Batch size of the bounded server')
+    args = parser.parse_args()
+
+    workers = ['--workers', str(args.workers)]
+    configurations = {
+        'unbounded': workers + ['--maxpending', '0', '--batch', '1'],
+        'bounded': workers + ['--maxpending', str(args.maxpending), '--batch', str(args.batch)]}
+    ms = lambda t: f'{t * 1000:.1f}'
+    print(f'{"server":<12}{"done":>7}{"busy":>7}{"p50":>10}{"p95":>10}{"max":>10}'
+          f'{"total":>10}   [ms]')
+    for name, options in configurations.items():
+        result = run(options, args.requests, args.duplicates, args.size)
+        latencies = result['latencies']
+        percentile = lambda p: latencies[min(int(p * len(latencies)), len(latencies) - 1)]
+        print(f'{name:<12}{len(latencies):>7}{result["rejected"]:>7}'
+              + ''.join(f'{ms(t):>10}' for t in (percentile(0.5), percentile(0.95),
+                                                 latencies[-1], result['total'])))
+
+
+if __name__ == "__main__":
+    main()
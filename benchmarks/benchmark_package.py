@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+
+"""benchmark_package.py - compares the cold import time of generated code
+written as a single module with that of the same code written as a
+package with lazily loaded submodules (see ts2pythonParser.split_module()).
+
+For the package, the time for importing the package and accessing the
+first and the last class in the __all__-list and the time for accessing
+all classes in the __all__-list are measured. Every measurement runs in
+a fresh interpreter with the bytecode of the modules already cached.
+
+Usage examples::
+
+    $ python benchmarks/benchmark_package.py
+    $ python benchmarks/benchmark_package.py --part-size 100
+"""
+
+import ast
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from typing import List, Optional
+
+try:
+    scriptdir = os.path.dirname(os.path.realpath(__file__))
+except NameError:
+    scriptdir = ''
+rootdir = os.path.abspath(os.path.join(scriptdir, '..'))
+if rootdir not in sys.path:  sys.path.append(rootdir)
+if scriptdir not in sys.path:  sys.path.append(scriptdir)
+
+from ts2pythonParser import compile_src, write_package, PACKAGE_PART_SIZE
+from benchmark_ts2python import DEMO_FILES, generate
+
+
+IMPORT_SCRIPT = """
+import sys, time
+sys.path[:0] = [{directory!r}, {rootdir!r}]
+start = time.perf_counter()
+{statement}
+print(time.perf_counter() - start)
+"""
+
+
+def import_time(directory: str, statement: str, repetitions: int) -> Optional[float]:
+    """Returns the best time of executing the import statement in a fresh
+    interpreter or None, if the statement fails."""
+    script = IMPORT_SCRIPT.format(directory=directory, rootdir=rootdir, statement=statement)
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    best = float('inf')
+    for _ in range(repetitions + 1):  # the first run writes the bytecode
+        process = subprocess.run([sys.executable, '-c', script],
+                                 capture_output=True, text=True, env=env)
+        if process.returncode != 0:
+            return None
+        best = min(best, float(process.stdout.split()[-1]))
+    return best
+
+
+def get_all_special(code: str) -> List[str]:
+    for stmt in ast.parse(code).body:
+        if isinstance(stmt, ast.Assign) and getattr(stmt.targets[0], 'id', '') == '__all__':
+            return list(ast.literal_eval(stmt.value))
+    return []
+
+
+def main():
+    from argparse import ArgumentParser
+    parser = ArgumentParser(description='Benchmarks the cold import time of packages')
+    parser.add_argument('--size', type=int, default=5000,
+                        help='Number of lines of the synthetic source (default: 5000)')
+    parser.add_argument('--part-size', type=int, default=PACKAGE_PART_SIZE,
+                        help=f'Lines per submodule (default: {PACKAGE_PART_SIZE})')
+    parser.add_argument('--repetitions', type=int, default=5,
+                        help='Number of imports per measurement; the best time is reported')
+    args = parser.parse_args()
+
+    corpora = {}
+    for file_name in DEMO_FILES:
+        with open(file_name, 'r', encoding='utf-8') as f:
+            corpora[os.path.basename(file_name)] = f.read()
+    corpora[f'mixed-{args.size}'] = generate('mixed', args.size)
+
+    ms = lambda t: f'{t * 1000:.1f}' if t is not None else 'n/a'
+    print(f'{"corpus":<20}{"parts":>6}{"module":>10}{"package":>10}{"first":>10}'
+          f'{"last":>10}{"all":>10}   [ms]')
+    for name, source in corpora.items():
+        code, _ = compile_src(source)
+        directory = tempfile.mkdtemp()
+        try:
+            with open(os.path.join(directory, 'single.py'), 'w', encoding='utf-8') as f:
+                f.write(code)
+            write_package(code, os.path.join(directory, 'lazy'), args.part_size)
+            # __all__ may list names that are not defined at the top level, e.g.
+            # enumeration members. Only names that can be imported are used.
+            defined = {stmt.name for stmt in ast.parse(code).body
+                       if isinstance(stmt, ast.ClassDef)}
+            exported = [name for name in get_all_special(code) if name in defined]
+            parts = sum(fn.startswith('_part_')
+                        for fn in os.listdir(os.path.join(directory, 'lazy')))
+            times = [import_time(directory, statement, args.repetitions) for statement in (
+                'import single',
+                'import lazy',
+                f'from lazy import {exported[0]}',
+                f'from lazy import {exported[-1]}',
+                f'import lazy; _ = [getattr(lazy, name) for name in {exported!r}]')]
+            print(f'{name:<20}{parts:>6}' + ''.join(f'{ms(t):>10}' for t in times))
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
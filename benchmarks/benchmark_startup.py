@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+
+"""benchmark_startup.py - measures the time it takes a fresh interpreter
+to get ready for compiling, i.e. to import ts2pythonParser, to check
+whether the grammar must be recompiled and to instantiate the grammar,
+the transformer and the compiler (warm_up()).
+
+"check" is the startup with the freshness check of DHParser
+(grammar_changed(), which recompiles the grammar in memory and compares
+it with the parser-script), "snapshot" the startup with a verified
+grammar snapshot (grammar_verified()), which main() and the server use
+instead as long as neither the grammar nor the parser-script have been
+changed. The benchmark only measures the checks; it never regenerates
+the parser-script.
+
+Usage examples::
+
+    $ python benchmarks/benchmark_startup.py
+    $ python benchmarks/benchmark_startup.py --repetitions 20
+"""
+
+import os
+import subprocess
+import sys
+from typing import Dict, Optional
+
+try:
+    scriptdir = os.path.dirname(os.path.realpath(__file__))
+except NameError:
+    scriptdir = ''
+rootdir = os.path.abspath(os.path.join(scriptdir, '..'))
+if rootdir not in sys.path:  sys.path.append(rootdir)
+if scriptdir not in sys.path:  sys.path.append(scriptdir)
+
+
+STARTUP_SCRIPT = """
+import time
+start = time.perf_counter()
+import sys
+sys.path[:0] = [{rootdir!r}]
+import ts2pythonParser
+imported = time.perf_counter()
+grammar_path = {grammar_path!r}
+script_path = ts2pythonParser.__file__
+if {snapshot!r}:
+    stale = not ts2pythonParser.grammar_verified(grammar_path, script_path)
+else:
+    from DHParser.dsl import grammar_changed
+    stale = grammar_changed(script_path, grammar_path)
+checked = time.perf_counter()
+ts2pythonParser.warm_up()
+ready = time.perf_counter()
+print(imported - start, checked - imported, ready - checked, ready - start, int(stale))
+"""
+
+
+def run(snapshot: bool) -> Optional[Dict[str, float]]:
+    """Starts a fresh interpreter and returns the times of its startup
+    stages or None, if the interpreter fails."""
+    script = STARTUP_SCRIPT.format(rootdir=rootdir, snapshot=snapshot,
+                                   grammar_path=os.path.join(rootdir, 'ts2python.ebnf'))
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    process = subprocess.run([sys.executable, '-c', script],
+                             capture_output=True, text=True, env=env)
+    if process.returncode != 0:
+        return None
+    values = [float(v) for v in process.stdout.split()[-5:]]
+    return dict(zip(('import', 'check', 'warm-up', 'total', 'stale'), values))
+
+
+def main():
+    from argparse import ArgumentParser
+    parser = ArgumentParser(description='Benchmarks the startup of ts2python')
+    parser.add_argument('--repetitions', type=int, default=10,
+                        help='Number of startups per measurement; the best time is reported')
+    args = parser.parse_args()
+
+    from ts2pythonParser import record_grammar_snapshot, grammar_stamp_path
+    import ts2pythonParser
+    grammar_path = os.path.join(rootdir, 'ts2python.ebnf')
+    script_path = ts2pythonParser.__file__
+    stamp_path = grammar_stamp_path(script_path)
+    saved = None
+    if os.path.exists(stamp_path):
+        with open(stamp_path, 'r', encoding='utf-8') as f:
+            saved = f.read()
+    try:
+        # the benchmark measures the time of verifying a snapshot, no matter
+        # whether the parser-script is up-to-date or not
+        record_grammar_snapshot(grammar_path, script_path)
+        run(True)  # writes the bytecode
+        results = {}
+        for name, snapshot in (('check', False), ('snapshot', True)):
+            runs = [run(snapshot) for _ in range(args.repetitions)]
+            if None in runs:
+                results[name] = None
+            else:
+                results[name] = {stage: min(r[stage] for r in runs) for stage in runs[0]}
+    finally:
+        if saved is None:
+            os.remove(stamp_path)
+        else:
+            with open(stamp_path, 'w', encoding='utf-8') as f:
+                f.write(saved)
+
+    ms = lambda t: f'{t * 1000:.1f}'
+    print(f'{"startup":<12}{"import":>10}{"check":>10}{"warm-up":>10}{"total":>10}   [ms]')
+    for name, times in results.items():
+        if times is None:
+            print(f'{name:<12}{"n/a":>10}')
+            continue
+        print(f'{name:<12}' + ''.join(f'{ms(times[stage]):>10}'
+                                      for stage in ('import', 'check', 'warm-up', 'total')))
+    check = results.get('check')
+    if check and check['stale']:
+        print('\nThe grammar check reports the parser-script as outdated, so that '
+              'recompile_grammar() would also regenerate it during startup.')
+
+
+if __name__ == "__main__":
+    main()
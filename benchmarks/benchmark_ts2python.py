@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+
+"""benchmark_ts2python.py - measures the throughput and memory consumption
+of the ts2python-pipeline on the demo-files and on synthetic
+TypeScript-sources of configurable size and shape.
+
+Usage examples::
+
+    $ python benchmarks/benchmark_ts2python.py
+    $ python benchmarks/benchmark_ts2python.py --size 20000 --shapes unions,anonymous
+    $ python benchmarks/benchmark_ts2python.py --save-baseline baseline.json
+    $ python benchmarks/benchmark_ts2python.py --compare baseline.json
+
+When comparing against a baseline, the script exits with status 1 if the
+throughput of any corpus has dropped by more than the given tolerance.
+"""
+
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+
+try:
+    scriptdir = os.path.dirname(os.path.realpath(__file__))
+except NameError:
+    scriptdir = ''
+rootdir = os.path.abspath(os.path.join(scriptdir, '..'))
+if rootdir not in sys.path:  sys.path.append(rootdir)
+
+from ts2pythonParser import compile_src, PipelineProfile
+
+
+DEMO_FILES = [os.path.join(rootdir, 'demo', 'specification.ts'),
+              os.path.join(rootdir, 'demo', 'vscode.d.ts')]
+
+
+#######################################################################
+#
+# synthetic corpora
+#
+#######################################################################
+
+
+def _namespaces(rnd: random.Random, n: int) -> List[str]:
+    """Namespaces with interfaces, constants and functions that refer to the
+    members of earlier namespaces. (The grammar does not allow nesting
+    namespaces, so depth is emulated by chains of qualified references.)"""
+    ref = f'N{rnd.randint(0, n - 1)}.Item' if n > 0 else 'string'
+    lines = [f'export namespace N{n} {{',
+             '    export interface Item {',
+             '        id: number;',
+             f'        parent?: {ref};',
+             '        children: Item[];',
+             '    }']
+    for i in range(rnd.randint(1, 4)):
+        lines.append(f"    export const Kind{i}: 'k{i}' = 'k{i}';")
+    lines.extend([f'    export function create(id: number, parent?: {ref}): Item;',
+                  '}'])
+    return lines
+
+
+def _unions(rnd: random.Random, n: int) -> List[str]:
+    """Type aliases and fields with wide unions of literals and types."""
+    width = rnd.randint(8, 32)
+    literals = ' | '.join(f"'value{n}_{i}'" for i in range(width))
+    types = ' | '.join(rnd.choice(['string', 'number', 'boolean', 'null', 'string[]',
+                                   f'Union{max(0, n - 1)}'])
+                       for _ in range(width // 4))
+    return [f'export type Union{n} = {literals};',
+            f'export interface UnionHolder{n} {{',
+            f'    value: {types};',
+            f'    kind: Union{n};',
+            '}']
+
+
+def _anonymous(rnd: random.Random, n: int) -> List[str]:
+    """Interfaces with many, partly nested anonymous interfaces."""
+    lines = [f'export interface Anonymous{n} {{']
+    for i in range(rnd.randint(2, 6)):
+        lines.extend([f'    field{i}: {{',
+                      '        x: number;',
+                      '        y?: {',
+                      '            z: string;',
+                      '            w: { a: boolean; b: number[] };',
+                      '        };',
+                      '    };'])
+    lines.append('}')
+    return lines
+
+
+def _comments(rnd: random.Random, n: int) -> List[str]:
+    """Interfaces with heavy documentation and line comments."""
+    lines = ['/**',
+             f' * Documentation of interface Commented{n}.',
+             ' *',
+             ' * ' + ' '.join(rnd.choice(['lorem', 'ipsum', 'dolor', 'sit', 'amet'])
+                             for _ in range(16)),
+             ' */',
+             f'export interface Commented{n} {{']
+    for i in range(rnd.randint(2, 5)):
+        lines.extend(['    /**',
+                      f'     * The field number {i}.',
+                      '     */',
+                      f'    field{i}: string;  // a line comment'])
+    lines.append('}')
+    return lines
+
+
+SHAPES: Dict[str, Callable[[random.Random, int], List[str]]] = {
+    'namespaces': _namespaces,
+    'unions': _unions,
+    'anonymous': _anonymous,
+    'comments': _comments,
+}
+
+
+def generate(shape: str, size: int, seed: int = 0) -> str:
+    """Generates a synthetic TypeScript-source of approximately ``size``
+    lines. ``shape`` is either one of the keys of SHAPES or "mixed"."""
+    rnd = random.Random(seed)
+    generators = list(SHAPES.values()) if shape == 'mixed' else [SHAPES[shape]]
+    lines = []
+    n = 0
+    while len(lines) < size:
+        lines.extend(generators[n % len(generators)](rnd, n))
+        lines.append('')
+        n += 1
+    return '\n'.join(lines) + '\n'
+
+
+#######################################################################
+#
+# measurement
+#
+#######################################################################
+
+
+def measure(source: str, repetitions: int) -> Dict[str, float]:
+    """Compiles the source ``repetitions`` times and returns the best
+    time of the full pipeline and of each stage as well as the peak
+    memory of a separate run with tracemalloc switched on."""
+    lines = source.count('\n') + 1
+    best, stages = float('inf'), {}
+    for _ in range(repetitions):
+        profile = PipelineProfile()
+        start = time.perf_counter()
+        _, errors = compile_src(source, profile=profile)
+        elapsed = time.perf_counter() - start
+        if elapsed < best:
+            best = elapsed
+            stages = {name: stats.time for name, stats in profile.stages.items()}
+    tracemalloc.start()
+    compile_src(source)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'lines': lines,
+            'time': best,
+            'lines_per_second': lines / best,
+            'peak_memory': peak,
+            'errors': len(errors),
+            'stages': stages}
+
+
+def run(corpora: Dict[str, str], repetitions: int) -> Dict[str, Dict]:
+    compile_src(generate('mixed', 200))  # warm up: instantiate grammar, transformer, compiler
+    results = {}
+    for name, source in corpora.items():
+        results[name] = measure(source, repetitions)
+        r = results[name]
+        stages = '  '.join(f'{stage}: {t * 1000:.0f}' for stage, t in r['stages'].items())
+        print(f'{name:<24}{r["lines"]:>8}{r["lines_per_second"]:>12.0f}'
+              f'{r["peak_memory"] / 2**20:>12.1f}   {stages}'
+              + (f'   ({r["errors"]} errors/warnings)' if r['errors'] else ''))
+    return results
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float) -> bool:
+    """Prints the relative change of throughput and peak memory against the
+    baseline and returns False if any throughput regression exceeds the
+    tolerance."""
+    ok = True
+    print(f'\n{"corpus":<24}{"lines/s":>12}{"memory":>12}')
+    for name, r in results.items():
+        if name not in baseline:
+            continue
+        b = baseline[name]
+        speed = r['lines_per_second'] / b['lines_per_second'] - 1.0
+        memory = r['peak_memory'] / b['peak_memory'] - 1.0
+        regression = speed < -tolerance
+        ok = ok and not regression
+        print(f'{name:<24}{speed:>+12.1%}{memory:>+12.1%}'
+              + ('   REGRESSION' if regression else ''))
+    return ok
+
+
+def main():
+    from argparse import ArgumentParser
+    parser = ArgumentParser(description='Benchmarks the ts2python-pipeline')
+    parser.add_argument('--size', type=int, default=5000,
+                        help='Number of lines of each synthetic source (default: 5000)')
+    parser.add_argument('--shapes', default=','.join(list(SHAPES) + ['mixed']),
+                        help='Comma-separated list of synthetic shapes: '
+                             + ', '.join(list(SHAPES) + ['mixed']))
+    parser.add_argument('--no-demo', action='store_true',
+                        help='Do not benchmark the demo-files')
+    parser.add_argument('--repetitions', type=int, default=3,
+                        help='Number of runs per corpus; the best time is reported')
+    parser.add_argument('--save-baseline', metavar='FILE',
+                        help='Store the results as baseline in FILE')
+    parser.add_argument('--compare', metavar='FILE',
+                        help='Compare the results with the baseline stored in FILE')
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help='Tolerated loss of throughput when comparing (default: 0.1)')
+    parser.add_argument('--dump', metavar='DIR',
+                        help='Write the synthetic sources to DIR and exit')
+    args = parser.parse_args()
+
+    corpora = {}
+    if not args.no_demo:
+        for file_name in DEMO_FILES:
+            with open(file_name, 'r', encoding='utf-8') as f:
+                corpora[os.path.basename(file_name)] = f.read()
+    for shape in args.shapes.split(','):
+        shape = shape.strip()
+        if shape not in SHAPES and shape != 'mixed':
+            print(f'Unknown shape "{shape}"! Available: ' + ', '.join(list(SHAPES) + ['mixed']))
+            sys.exit(1)
+        corpora[f'{shape}-{args.size}'] = generate(shape, args.size)
+
+    if args.dump:
+        os.makedirs(args.dump, exist_ok=True)
+        for name, source in corpora.items():
+            if not name.endswith('.ts'):
+                with open(os.path.join(args.dump, name + '.d.ts'), 'w', encoding='utf-8') as f:
+                    f.write(source)
+        return
+
+    print(f'{"corpus":<24}{"lines":>8}{"lines/s":>12}{"peak [MiB]":>12}   stages [ms]')
+    results = run(corpora, args.repetitions)
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if not compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+
+"""benchmark_typeddict.py - measures the cost of creating the TypedDict
+classes of a generated module and of validating dictionaries against them
+with json_validation.validate_type().
+
+The first table shows the time of executing the module ("create classes"),
+of creating the field tables of all of its TypedDicts (see
+typeddict_shim.field_table()), of resolving the types of all fields
+once (json_validation.resolve_fields()) and, for comparison, of calling
+typing.get_type_hints() once for every TypedDict, which validate_TypedDict()
+did on every call before the field tables have been introduced.
+
+The second table shows the average time of validating one sample
+dictionary per TypedDict ("validate_type") and of get_type_hints() per
+TypedDict. The samples contain the required fields of the TypedDicts only.
+TypedDicts for which no valid sample can be generated are skipped.
+
+Usage examples::
+
+    $ python benchmarks/benchmark_typeddict.py
+    $ python benchmarks/benchmark_typeddict.py --module demo/vscode.d.py --rounds 20
+"""
+
+import os
+import sys
+from enum import Enum
+from time import perf_counter
+from types import ModuleType
+from typing import Any, Dict, List, Tuple, get_type_hints
+
+try:
+    scriptdir = os.path.dirname(os.path.realpath(__file__))
+except NameError:
+    scriptdir = ''
+rootdir = os.path.abspath(os.path.join(scriptdir, '..'))
+if rootdir not in sys.path:  sys.path.append(rootdir)
+if scriptdir not in sys.path:  sys.path.append(scriptdir)
+
+from ts2python.json_validation import validate_type, resolve_fields
+from ts2python.typeddict_shim import is_typeddict, field_table, get_origin, get_args, \
+    Literal
+
+
+def load(path: str, name: str) -> Tuple[ModuleType, float]:
+    """Executes the module at path and returns the module and the time of
+    its execution."""
+    with open(path, 'r', encoding='utf-8') as f:
+        code = compile(f.read(), path, 'exec')
+    module = ModuleType(name)
+    module.__file__ = path
+    sys.modules[name] = module
+    start = perf_counter()
+    exec(code, module.__dict__)
+    return module, perf_counter() - start
+
+
+def typeddicts(module: ModuleType) -> List[type]:
+    return [obj for obj in vars(module).values()
+            if is_typeddict(obj) and obj.__module__ == module.__name__]
+
+
+def resolvable(T: type) -> bool:
+    try:
+        get_type_hints(T)
+        return True
+    except NameError:
+        return False
+
+
+SIMPLE_VALUES = {int: 1, float: 1.0, str: 'a', bool: True, type(None): None,
+                 list: [], dict: {}, tuple: ()}
+
+
+def sample_value(typ, depth: int) -> Any:
+    """Returns a value of type typ or raises a ValueError."""
+    if typ in SIMPLE_VALUES:
+        return SIMPLE_VALUES[typ]
+    if is_typeddict(typ):
+        return sample(typ, depth + 1)
+    if isinstance(typ, type) and issubclass(typ, Enum):
+        return next(iter(typ)).value
+    if get_origin(typ) is Literal:
+        return get_args(typ)[0]
+    raise ValueError(f'No sample value for {typ}')
+
+
+def sample(T: type, depth: int = 0) -> Dict:
+    """Returns a dictionary with the required fields of the TypedDict T."""
+    if depth > 8:
+        raise ValueError('Nesting too deep')
+    resolve_fields(T)
+    D = {}
+    for name, field in field_table(T).items():
+        if not field.required:
+            continue
+        for typ in (field.members or (field.type,)):
+            try:
+                D[name] = sample_value(typ, depth)
+                break
+            except ValueError:
+                pass
+        else:
+            raise ValueError(f'No sample value for field {name} of {T}')
+    return D
+
+
+def timed(func, items) -> float:
+    start = perf_counter()
+    for item in items:
+        func(item)
+    return perf_counter() - start
+
+
+def main():
+    from argparse import ArgumentParser
+    parser = ArgumentParser(description='Benchmarks TypedDict creation and validation')
+    parser.add_argument('--module', default=os.path.join(rootdir, 'demo', 'vscode.d.py'),
+                        help='Generated module to be benchmarked (default: demo/vscode.d.py)')
+    parser.add_argument('--rounds', type=int, default=10,
+                        help='Number of validation rounds; the best round is reported')
+    args = parser.parse_args()
+
+    # TypedDicts with fields of undefined types are left out
+    names = {T.__name__ for T in typeddicts(load(args.module, 'probed_module')[0])
+             if resolvable(T)}
+    module, created = load(args.module, 'benchmarked_module')
+    classes = [T for T in typeddicts(module) if T.__name__ in names]
+    tables = timed(field_table, classes)
+    resolved = timed(resolve_fields, classes)
+    hints = timed(get_type_hints, classes)
+    print(f'{len(classes)} resolvable TypedDicts in {os.path.basename(args.module)}\n')
+    print(f'{"stage":<18}{"time":>10}   [ms]')
+    for stage, t in (('create classes', created), ('field tables', tables),
+                     ('resolve fields', resolved), ('get_type_hints', hints)):
+        print(f'{stage:<18}{t * 1000:>10.2f}')
+
+    samples = []
+    for T in classes:
+        try:
+            D = sample(T)
+            validate_type(D, T)
+        except (ValueError, TypeError, NameError):
+            continue
+        samples.append((D, T))
+    validated = min(timed(lambda s: validate_type(*s), samples) for _ in range(args.rounds))
+    reflected = min(timed(get_type_hints, [T for _, T in samples]) for _ in range(args.rounds))
+    print(f'\n{"per TypedDict":<18}{"time":>10}   [µs/call], {len(samples)} samples')
+    print(f'{"validate_type":<18}{validated / len(samples) * 1e6:>10.2f}')
+    print(f'{"get_type_hints":<18}{reflected / len(samples) * 1e6:>10.2f}')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+
+"""benchmark_workers.py - measures the latency of the first and of the
+subsequent compilation requests sent to a pool of worker processes.
+
+"cold" is a plain process pool, as the server used to start it, the
+workers of which import ts2pythonParser and set up the grammar, the
+transformer and the compiler when they receive their first task. "warm"
+is the WorkerPool of ts2pythonServer, which does this in the initializer
+of the workers before the pool is used. The time it takes to start and
+warm up the pool is reported separately. Both pools use the start-method
+"forkserver" (where available) like the server, the forkserver of which
+instantiates the grammar, the transformer and the compiler once, so that
+the workers inherit them. With --coldforkserver, the forkserver only
+imports ts2pythonParser, and every worker instantiates them anew.
+
+Usage examples::
+
+    $ python benchmarks/benchmark_workers.py
+    $ python benchmarks/benchmark_workers.py --workers 4 --requests 50
+    $ python benchmarks/benchmark_workers.py --coldforkserver
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict
+
+try:
+    scriptdir = os.path.dirname(os.path.realpath(__file__))
+except NameError:
+    scriptdir = ''
+rootdir = os.path.abspath(os.path.join(scriptdir, '..'))
+if rootdir not in sys.path:  sys.path.append(rootdir)
+if scriptdir not in sys.path:  sys.path.append(scriptdir)
+
+
+SOURCE = '\n'.join(f'interface I{i} {{\n  a: number;\n  b?: string[];\n}}\n'
+                   for i in range(20))
+
+
+def measure(pool, workers: int, requests: int) -> Dict[str, float]:
+    """Sends one request per worker at once (the first requests) and then
+    the remaining requests one after the other and returns the mean
+    latencies."""
+    from ts2pythonParser import compile_src
+    latencies = []
+    started = time.perf_counter()
+    first = [pool.submit(compile_src, SOURCE) for _ in range(workers)]
+    for future in first:
+        future.result()
+        latencies.append(time.perf_counter() - started)
+    first_mean = sum(latencies) / len(latencies)
+    latencies = []
+    for _ in range(max(requests - workers, 1)):
+        started = time.perf_counter()
+        pool.submit(compile_src, SOURCE).result()
+        latencies.append(time.perf_counter() - started)
+    return {'first': first_mean, 'subsequent': sum(latencies) / len(latencies)}
+
+
+def main():
+    from argparse import ArgumentParser
+    import multiprocessing
+    parser = ArgumentParser(description='Benchmarks cold and warm worker pools')
+    parser.add_argument('--workers', type=int, default=2,
+                        help='Number of worker processes')
+    parser.add_argument('--requests', type=int, default=20,
+                        help='Number of requests per pool')
+    parser.add_argument('--coldforkserver', action='store_true',
+                        help='Only import ts2pythonParser in the forkserver')
+    args = parser.parse_args()
+
+    from ts2pythonServer import WorkerPool, start_forkserver
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        multiprocessing.set_start_method('forkserver')
+        if args.coldforkserver:
+            multiprocessing.set_forkserver_preload(['ts2pythonParser'])
+        else:
+            start_forkserver()
+
+    results = {}
+    started = time.perf_counter()
+    with ProcessPoolExecutor(args.workers) as pool:
+        results['cold'] = {'start': time.perf_counter() - started,
+                           **measure(pool, args.workers, args.requests)}
+    started = time.perf_counter()
+    pool = WorkerPool(args.workers, recycle=0)
+    try:
+        pool.wait_warm()
+        results['warm'] = {'start': time.perf_counter() - started,
+                           **measure(pool, args.workers, args.requests)}
+    finally:
+        pool.shutdown()
+
+    ms = lambda t: f'{t * 1000:.1f}'
+    print(f'{"pool":<8}{"start":>10}{"first":>12}{"subsequent":>12}   [ms]')
+    for name, times in results.items():
+        print(f'{name:<8}' + ''.join(f'{ms(times[column]):>{width}}' for column, width
+                                     in (('start', 10), ('first', 12), ('subsequent', 12))))
+
+
+if __name__ == "__main__":
+    main()
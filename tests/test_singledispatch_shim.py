@@ -13,7 +13,10 @@ scriptpath = os.path.abspath(os.path.dirname(__file__) or '.')
 ts2pythonpath = os.path.normpath(os.path.join(scriptpath, '..'))
 if ts2pythonpath not in sys.path: sys.path.append(ts2pythonpath)
 
-from ts2python.singledispatch_shim import singledispatch, singledispatchmethod
+from ts2python import singledispatch_shim
+from ts2python.singledispatch_shim import singledispatch, singledispatchmethod, \
+    multidispatch, multidispatchmethod
+from ts2python.typeddict_shim import TypedDict, Literal
 
 
 @singledispatch
@@ -103,6 +106,227 @@ class TestGenericAlias:
         def _(param:List['int']):
             pass
 
+    def test_generic_alias_in_union(self):
+        @singledispatch
+        def func(param):
+            return 'object'
+        @func.register
+        def _(param: Union[str, List[str]]):
+            return 'str or list'
+        assert func('a') == func(['a']) == 'str or list'
+        assert func(1) == 'object'
+
+    def test_generic_alias_annotation(self):
+        @singledispatch
+        def func(param):
+            return 'object'
+        @func.register
+        def _(param: List[str]):
+            return 'list'
+        assert func(['a']) == 'list'
+        assert func not in singledispatch_shim._postponed_generics
+
+
+
+class Circle(TypedDict):
+    kind: Literal['circle']
+    radius: float
+
+
+class Square(TypedDict):
+    kind: Literal['square', 'box']
+    size: float
+
+
+class NamedBase(TypedDict):
+    name: str
+
+
+class Named(NamedBase, total=False):
+    label: str
+
+
+class Shapes:
+    @singledispatchmethod
+    def area(self, shape):
+        raise TypeError(f'Not a shape: {shape}')
+
+    @area.register
+    def _(self, shape: Circle):
+        return 'circle'
+
+    @area.register
+    def _(self, shape: Union[Square, Named]):
+        return 'square or named'
+
+
+class TestStructuralDispatch:
+    def test_typeddict_dispatch(self):
+        @singledispatch
+        def describe(arg):
+            return 'other'
+        @describe.register
+        def _(arg: Circle):
+            return 'circle'
+        @describe.register
+        def _(arg: Square):
+            return 'square'
+        @describe.register
+        def _(arg: Named):
+            return 'named'
+        @describe.register
+        def _(arg: dict):
+            return 'dict'
+        assert describe({'kind': 'circle', 'radius': 1.0}) == 'circle'
+        assert describe({'kind': 'box', 'size': 1.0}) == 'square'
+        assert describe({'name': 'A'}) == 'named'
+        assert describe({'name': 'A', 'label': 'a'}) == 'named'
+        assert describe({'kind': 'triangle', 'size': 1.0}) == 'dict'
+        assert describe({'name': 'A', 'size': 1.0}) == 'dict'
+        assert describe({'kind': [], 'size': 1.0}) == 'dict'
+        assert describe(1) == 'other'
+        assert Circle not in describe.registry
+
+    def test_typeddict_method_dispatch(self):
+        shapes = Shapes()
+        assert shapes.area({'kind': 'circle', 'radius': 1.0}) == 'circle'
+        assert shapes.area({'kind': 'square', 'size': 1.0}) == 'square or named'
+        assert shapes.area({'name': 'A'}) == 'square or named'
+        try:
+            shapes.area({'radius': 1.0})
+            assert False, "TypeError expected"
+        except TypeError:
+            pass
+
+
+class TestDispatchCache:
+    def test_cache(self):
+        @singledispatch
+        def func(arg):
+            return 'default'
+        Dynamic = type('Dynamic', (), {})
+        assert func(Dynamic()) == 'default'
+        assert func(Dynamic()) == 'default'
+        func.register(Dynamic, lambda arg: 'dynamic')
+        assert func(Dynamic()) == 'dynamic'
+        func._clear_cache()
+        func.register(int, lambda arg: 'int')
+        assert func(Dynamic()) == 'dynamic'
+        assert func(1) == 'int'
+        try:
+            func()
+            assert False, "TypeError expected"
+        except TypeError:
+            pass
+
+    def test_no_strong_references(self):
+        import gc, weakref
+        @singledispatch
+        def func(arg):
+            return 'default'
+        Dynamic = type('Dynamic', (), {})
+        assert func(Dynamic()) == 'default'
+        ref = weakref.ref(Dynamic)
+        del Dynamic
+        gc.collect()
+        assert ref() is None
+        assert func(type('Dynamic', (), {})()) == 'default'
+
+
+class TestFinalize:
+    def test_finalize(self):
+        global LateType
+        @singledispatch
+        def func(arg):
+            return 'default'
+        @func.register
+        def _(arg: LateType):
+            return 'late'
+        assert func in singledispatch_shim._postponed_generics
+        class LateType:
+            pass
+        singledispatch_shim.finalize(__name__)
+        assert func not in singledispatch_shim._postponed_generics
+        assert func(LateType()) == 'late'
+        assert func(1) == 'default'
+
+    def test_finalize_errors(self):
+        @singledispatch
+        def func(arg):
+            return 'default'
+        @func.register
+        def _(arg: NeverDefined):
+            return 'never'
+        errors = {}
+        singledispatch_shim.finalize(__name__, errors)
+        assert list(errors) == [func.__qualname__]
+        assert func in singledispatch_shim._postponed_generics
+        singledispatch_shim._postponed_generics.remove(func)
+
+
+@multidispatch
+def combine(a, b):
+    return 'default'
+
+
+@combine.register
+def _(a: int, b: Union[int, float]):
+    return 'int, number'
+
+
+@combine.register
+def _(a: int, b: Later):
+    return 'int, Later'
+
+
+@combine.register
+def _(a: object, b: str):
+    return 'object, str'
+
+
+@combine.register
+def _(a: List[int], b=None):
+    return 'list'
+
+
+combine.register(bool, str, func=lambda a, b: 'bool, str')
+
+
+class Later:
+    pass
+
+
+class Merger:
+    @multidispatchmethod
+    def merge(self, a, b):
+        return 'default'
+
+    @merge.register
+    def _(self, a: Merger, b: int):
+        return 'Merger, int'
+
+    @merge.register
+    def _(self, a: Merger, b: Merger):
+        return 'Merger, Merger'
+
+
+class TestMultiDispatch:
+    def test_multidispatch(self):
+        assert combine(1, 2) == 'int, number'
+        assert combine(1, 2.0) == 'int, number'
+        assert combine(1, Later()) == 'int, Later'
+        assert combine(1, 'a') == 'object, str'
+        assert combine(True, 'a') == 'bool, str'
+        assert combine(True, 1) == 'int, number'
+        assert combine([], 1) == 'list'
+        assert combine('a', 1) == 'default'
+        assert combine(1, 2) == 'int, number'  # cached
+
+    def test_multidispatchmethod(self):
+        m = Merger()
+        assert m.merge(m, 1) == 'Merger, int'
+        assert m.merge(m, m) == 'Merger, Merger'
+        assert m.merge(1, m) == 'default'
 
 
 if __name__ == "__main__":
@@ -368,6 +368,679 @@ class TestOptions:
         assert code.find('NotRequired[') >= 0
 
 
+class TestSymbolTable:
+    def test_scopes(self):
+        table = ts2pythonParser.SymbolTable({'str': 'str'})
+        table.define('Range', 'interface')
+        table.push_scope()
+        table.define('T', '[]')
+        table.define('Range', 'type_alias')
+        assert table.kind('T') == '[]'
+        assert table.kind('Range') == 'interface'  # outer definitions take precedence
+        assert table.local_kind('Range') == 'type_alias'
+        table.pop_scope()
+        assert 'T' not in table
+        assert table.kind('Range') == 'interface'
+
+    def test_export_symbols(self):
+        _ = compile_src(TEST_DATA)
+        symbols = ts2pythonParser.export_symbols()
+        assert symbols['symbols']['Position'][0] == 'interface'
+        assert symbols['symbols']['DiagnosticSeverity'][0] == 'virtual_enum'
+        assert symbols['symbols']['FoldingRangeKind'][0] == 'enum'
+        assert 'Diagnostic' in symbols['typed_dicts']
+        assert 'Diagnostic' in symbols['exported']
+        assert 'str' not in symbols['symbols']
+
+
+class TestProfile:
+    def test_profile(self):
+        profile = ts2pythonParser.PipelineProfile(trace_memory=True)
+        result, errors = compile_src(TEST_DATA, profile=profile)
+        unprofiled, _ = compile_src(TEST_DATA)
+        assert result.split('\n', 1)[1] == unprofiled.split('\n', 1)[1]  # skip time stamp
+        assert set(profile.stages) == {'preprocessing', 'parsing', 'AST', 'py'}
+        assert all(stats.calls == 1 and stats.time > 0 for stats in profile.stages.values())
+        assert profile.stages['parsing'].allocated > 0
+        calls, cumulative, own = profile.handlers['interface']
+        assert calls == TEST_DATA.count('interface ')
+        assert cumulative >= own > 0
+        assert 'on_interface' in profile.report()
+        assert ts2pythonParser.compiling.factory().handler_stats is None
+
+
+class TestASTCache:
+    def test_ast_cache(self):
+        import tempfile
+        from DHParser.configuration import set_config_value, get_config_value
+        cache = ts2pythonParser.ASTCache(tempfile.mkdtemp())
+        first, _ = compile_src(TEST_DATA, ast_cache=cache)
+        second, _ = compile_src(TEST_DATA, ast_cache=cache)
+        assert (cache.misses, cache.hits) == (1, 1)
+        assert first.split('\n', 1)[1] == second.split('\n', 1)[1]  # skip time stamp
+        results = ts2pythonParser.pipeline(TEST_DATA, 'AST', ast_cache=cache)
+        assert cache.hits == 2
+        assert results['AST'][0].equals(ts2pythonParser.pipeline(TEST_DATA, 'AST')['AST'][0])
+        save = get_config_value('ts2python.KeepComments', False)
+        try:
+            set_config_value('ts2python.KeepComments', not save, allow_new_key=True)
+            assert cache.load(TEST_DATA) is None
+        finally:
+            set_config_value('ts2python.KeepComments', save, allow_new_key=True)
+
+
+class TestVariants:
+    def test_compile_variants(self):
+        from DHParser.configuration import set_config_value, get_config_value
+        from DHParser.toolkit import SingleThreadExecutor
+        variants = dict(ts2pythonParser.variant_configuration(spec)
+                        for spec in ('3.8', '3.11/toplevel'))
+        assert list(variants) == ['py38', 'py311_toplevel']
+        not_required = get_config_value('ts2python.UseNotRequired', False)
+        results = ts2pythonParser.compile_variants(TEST_DATA, variants,
+                                                   submit_func=SingleThreadExecutor().submit)
+        assert get_config_value('ts2python.UseNotRequired', False) == not_required
+        for name, configuration in variants.items():
+            saved = {key: get_config_value(key, ts2pythonParser.TS2PYTHON_CONFIG_DEFAULT[key[10:]])
+                     for key in configuration}
+            try:
+                for key, value in configuration.items():
+                    set_config_value(key, value, allow_new_key=True)
+                expected, _ = compile_src(TEST_DATA)
+            finally:
+                for key, value in saved.items():
+                    set_config_value(key, value, allow_new_key=True)
+            result, errors = results[name]
+            assert result.split('\n', 1)[1] == expected.split('\n', 1)[1]  # skip time stamp
+        assert results['py38'][0] != results['py311_toplevel'][0]
+
+
+class TestInternAnonymous:
+    def test_intern_anonymous(self):
+        from DHParser.configuration import set_config_value, get_config_value
+        src = """interface A {
+            start: { line: number; character: number };
+            end: { line: number; character: number };
+        }
+        interface B<T> {
+            pos?: { line: number; character: number };
+            value: { v: T };
+        }
+        """
+        save = get_config_value('ts2python.InternAnonymous', False)
+        set_config_value('ts2python.InternAnonymous', True, allow_new_key=True)
+        try:
+            result, errors = compile_src(src)
+        finally:
+            set_config_value('ts2python.InternAnonymous', save, allow_new_key=True)
+        assert not errors
+        assert ts2pythonParser.interning_statistics() == (3, 2)
+        assert result.count('class A_Start_0(TypedDict)') == 1
+        assert result.find('class A_Start_0') < result.find('class A(')
+        assert result.count('A_Start_0') == 4
+        assert result.find('class Value_0') > result.find('class B(')  # uses type parameter
+        code = compile(result, '<intern_anonymous>', 'exec')
+        exec(code, {})
+
+    def test_name_collision(self):
+        from DHParser.configuration import set_config_value, get_config_value
+        src = """interface A {
+            start: { line: number; character: number };
+        }
+        interface A_Start_0 {
+            line: string;
+        }
+        """
+        save = get_config_value('ts2python.InternAnonymous', False)
+        set_config_value('ts2python.InternAnonymous', True, allow_new_key=True)
+        try:
+            result, errors = compile_src(src)
+        finally:
+            set_config_value('ts2python.InternAnonymous', save, allow_new_key=True)
+        assert not errors
+        assert result.count('class A_Start_0(') == 1
+        assert result.find('class A_Start_0_1(') < result.find('class A(')
+        namespace = {}
+        exec(compile(result, '<name_collision>', 'exec'), namespace)
+        assert namespace['A'].__annotations__['start'] in ('A_Start_0_1', namespace['A_Start_0_1'])
+
+
+class TestPackage:
+    def test_package(self):
+        import tempfile
+        code, _ = compile_src(TEST_DATA)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            ts2pythonParser.write_package(code, os.path.join(tmpdir, 'lazy'), 20)
+            with open(os.path.join(tmpdir, 'single.py'), 'w', encoding='utf-8') as f:
+                f.write(code)
+            parts = [name for name in os.listdir(os.path.join(tmpdir, 'lazy'))
+                     if name.startswith('_part_')]
+            assert len(parts) > 1
+            script = '\n'.join([
+                'import re, sys, typing',
+                f'sys.path[:0] = [{tmpdir!r}, {scriptdir_parent!r}]',
+                'import lazy, single',
+                'assert lazy.__all__ == single.__all__',
+                'assert not any(m.startswith("lazy._part_") for m in sys.modules)',
+                'from lazy import Location',
+                'loaded = [m for m in sys.modules if m.startswith("lazy._part_")]',
+                'assert 0 < len(loaded) < len(lazy._parts), loaded',
+                'hints = lambda m, n: re.sub(r"\\b(lazy\\._part_\\d+|single)\\.", "", '
+                'str(typing.get_type_hints(getattr(m, n))))',
+                'for name in lazy._parts:',
+                '    assert hints(lazy, name) == hints(single, name), name'])
+            process = subprocess.run([sys.executable, '-c', script],
+                                     capture_output=True, text=True)
+            assert process.returncode == 0, process.stderr
+
+
+class TestMinimalImports:
+    def test_minimal_imports(self):
+        from DHParser.configuration import set_config_value, get_config_value
+        save = get_config_value('ts2python.MinimalImports', False)
+        set_config_value('ts2python.MinimalImports', True, allow_new_key=True)
+        try:
+            result, errors = compile_src(TEST_DATA)
+        finally:
+            set_config_value('ts2python.MinimalImports', save, allow_new_key=True)
+        default, _ = compile_src(TEST_DATA)
+        assert not errors
+        header = result[:result.find('source_hash__')]
+        assert 'Awaitable' not in header and 'Iterator' not in header
+        assert result[result.find('source_hash__'):].split('\n', 1)[1] \
+            == default[default.find('source_hash__'):].split('\n', 1)[1]
+        namespace = {}
+        exec(compile(result, '<minimal_imports>', 'exec'), namespace)
+        assert namespace['Position'].__required_keys__ == {'line', 'character'}
+
+
+class TestSchema:
+    source = """
+        interface Tagged {
+            tag: DiagnosticTag.Deprecated;
+            info?: { name: string; version?: string };
+            other?: Unresolved;
+        }
+        """
+
+    def test_schema_table(self):
+        import types
+        from DHParser.configuration import set_config_value, get_config_value
+        from ts2python.json_validation import validate_type
+        save = get_config_value('ts2python.GenerateSchema', False)
+        set_config_value('ts2python.GenerateSchema', True, allow_new_key=True)
+        try:
+            result, errors = compile_src(TEST_DATA + self.source)
+        finally:
+            set_config_value('ts2python.GenerateSchema', save, allow_new_key=True)
+        assert not errors
+        module = types.ModuleType('schema_test')
+        sys.modules['schema_test'] = module
+        try:
+            exec(compile(result, '<schema_test>', 'exec'), module.__dict__)
+            schema = module.__ts2python_schema__
+            assert schema['Position'] == \
+                ('typeddict', (('line', True, 'int'), ('character', True, 'int')))
+            assert schema['RequestMessage'][1][0] == ('jsonrpc', True, 'str')
+            assert schema['ResponseMessage'][1][-1] == ('error', False, 'ResponseError')
+            assert schema['DocumentUri'] == ('alias', 'str')
+            assert schema['DiagnosticSeverity'] == ('enum', (1, 2, 3, 4))
+            assert schema['FoldingRangeKind'] == ('enum', ('comment', 'imports', 'region'))
+            assert schema['Tagged'] == ('typeddict', (
+                ('tag', True, ('literal', 2)),
+                ('info', False, ('typeddict', (('name', True, 'str'),
+                                               ('version', False, 'str')))),
+                ('other', False, 'Unresolved')))
+            position = {'line': 1, 'character': 2}
+            validate_type({'start': position, 'end': position}, module.Range)
+            validate_type({'tag': 2, 'info': {'name': 'a'}}, module.Tagged)
+            for bad, T in (({'start': position}, module.Range),
+                           ({'start': position, 'end': {'line': 1}}, module.Range),
+                           ({'tag': 1}, module.Tagged),
+                           ({'tag': 2, 'info': {'version': '1'}}, module.Tagged),
+                           ({'tag': 2, 'other': 1}, module.Tagged)):
+                try:
+                    validate_type(bad, T)
+                    assert False, f'{bad} should not pass the validation'
+                except TypeError:
+                    pass
+        finally:
+            del sys.modules['schema_test']
+
+
+class TestOverloads:
+    source = """
+        interface DocumentFilter {
+            language?: string;
+            pattern?: string;
+        }
+
+        type DocumentSelector = DocumentFilter | string | ReadonlyArray<DocumentFilter | string>;
+
+        interface Registration {
+            id: string;
+            selector: DocumentSelector | null;
+        }
+
+        function register(selector: DocumentSelector, provider: string): number;
+        function register(selector: number, provider: string): number;
+        """
+
+    def test_union_with_generics(self):
+        import types
+        result, errors = compile_src(self.source)
+        assert not errors
+        module = types.ModuleType('overloads_test')
+        sys.modules['overloads_test'] = module
+        try:
+            exec(compile(result, '<overloads_test>', 'exec'), module.__dict__)
+            registry = module.register.registry
+            assert list in registry and str in registry and float in registry
+            validate_type({'id': 'a', 'selector': ['*.ts', {'language': 'ts'}]},
+                          module.Registration)
+        finally:
+            del sys.modules['overloads_test']
+
+
+class TestStripComments:
+    source = ('/**\n * A position. // not a comment inside a comment\n */\n'
+              'interface Position {\n  line: number;  // zero-based\n'
+              "  uri: '//not/a/comment';\n  character: /* a */ number;\n}\n")
+
+    def compile(self, source: str, strip: bool):
+        from DHParser.configuration import set_config_value
+        set_config_value('ts2python.StripComments', strip, allow_new_key=True)
+        try:
+            return compile_src(source)
+        finally:
+            set_config_value('ts2python.StripComments', False, allow_new_key=True)
+
+    def test_strip_comments(self):
+        text, _ = ts2pythonParser.strip_comments(self.source)
+        assert text.find('/*') < 0 and text.find("'//not/a/comment'") >= 0
+        assert self.compile(self.source, True)[0].split('source_hash__')[1] \
+            == self.compile(self.source, False)[0].split('source_hash__')[1]
+
+    def test_escaped_quotes(self):
+        for source in ("export const A = 'it\\'s // here';\n",
+                       'export const B = "say \\"// here\\"";\n',
+                       'export const C = `a\\` // here`;\n'):
+            assert ts2pythonParser.strip_comments(source)[0] == source
+        text, _ = ts2pythonParser.strip_comments("export const A = 'it\\'s'; // comment\n")
+        assert text == "export const A = 'it\\'s'; \n"
+
+    def test_error_locations(self):
+        source = self.source + '/* comment */\ninterface Broken {\n  a: ;\n}\n'
+        stripped_errors = self.compile(source, True)[1]
+        errors = self.compile(source, False)[1]
+        assert errors and [(e.code, e.line, e.column) for e in stripped_errors] \
+            == [(e.code, e.line, e.column) for e in errors]
+
+
+class TestChunked:
+    def test_chunked(self):
+        import re
+        import tempfile
+        assert len(ts2pythonParser.split_declarations(TEST_DATA, 10)) > 1
+        without_date = lambda code: re.sub(r' on \d{4}-.*', '', code)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            result_filename = os.path.join(tmpdir, 'chunked.py')
+            errors = ts2pythonParser.compile_chunked(TEST_DATA, result_filename, 10)
+            with open(result_filename, 'r', encoding='utf-8') as f:
+                chunked = f.read()
+        whole, whole_errors = compile_src(TEST_DATA)
+        assert without_date(chunked) == without_date(whole)
+        assert [(e.code, e.line, e.column) for e in errors] \
+            == [(e.code, e.line, e.column) for e in whole_errors]
+
+    def test_fallback(self):
+        import tempfile
+        source = TEST_DATA + '\ninterface Unbalanced {\n  a: number;\n'
+        assert ts2pythonParser.split_declarations(source, 10) is None
+        with tempfile.TemporaryDirectory() as tmpdir:
+            errors = ts2pythonParser.compile_chunked(
+                source, os.path.join(tmpdir, 'chunked.py'), 10)
+        _, whole_errors = compile_src(source)
+        assert errors and [e.code for e in errors] == [e.code for e in whole_errors]
+
+
+class TestGrammarSnapshot:
+    def test_grammar_snapshot(self):
+        import tempfile
+        with tempfile.TemporaryDirectory() as tmpdir:
+            grammar_path = os.path.join(tmpdir, 'test.ebnf')
+            script_path = os.path.join(tmpdir, 'testParser.py')
+            for path in (grammar_path, script_path):
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write('# ' + path)
+            assert not ts2pythonParser.grammar_verified(grammar_path, script_path)
+            ts2pythonParser.record_grammar_snapshot(grammar_path, script_path)
+            assert ts2pythonParser.grammar_verified(grammar_path, script_path)
+            with open(script_path, 'a', encoding='utf-8') as f:
+                f.write('\n')
+            assert not ts2pythonParser.grammar_verified(grammar_path, script_path)
+
+    def test_check_without_parser(self):
+        # the server checks the snapshot before it imports the parser-script
+        script = ('import sys; import ts2python.grammar_stamp; '
+                  'sys.exit(int("ts2pythonParser" in sys.modules))')
+        result = subprocess.run([sys.executable, '-c', script], cwd=scriptdir_parent)
+        assert result.returncode == 0
+
+
+class TestResultCache:
+    def test_result_cache(self):
+        from ts2pythonServer import ResultCache
+        source = 'interface A {\n  a: number;\n}\n'
+        result = compile_src(source)
+        cache = ResultCache()
+        key = cache.key(source)
+        assert key == cache.key(source) != cache.key(source + ' ')
+        assert cache.get(key) is None
+        cache.put(key, result)
+        assert cache.get(key) is result
+        cache.max_size = 2 * cache.size
+        cache.put(cache.key(source + ' '), result)
+        cache.get(key)
+        cache.put(cache.key(source + '  '), result)
+        assert cache.get(key) is result
+        assert cache.get(cache.key(source + ' ')) is None
+        statistics = cache.statistics()
+        assert statistics['evictions'] == 1 and statistics['entries'] == 2
+        assert statistics['hits'] == 3 and statistics['misses'] == 2
+        assert statistics['size'] <= cache.max_size
+
+
+class TestWorkerPool:
+    def test_worker_pool(self):
+        from ts2pythonServer import WorkerPool, worker_ready
+        source = 'interface A {\n  a: number;\n}\n'
+        pool = WorkerPool(size=2, recycle=1)
+        try:
+            assert pool.wait_warm()
+            assert 'class A(' in pool.submit(compile_src, source).result()[0]
+            pids = {pool.submit(worker_ready).result() for _ in range(2)}
+            assert pool.successor is not None
+            assert pool.successor[1].result()
+            assert pool.submit(worker_ready).result() not in pids
+            statistics = pool.statistics()
+            assert statistics['generation'] == 1 and statistics['tasks'] == 1
+            assert statistics['warmUp'] > 0.0 and statistics['warmUpFailures'] == 0
+            assert statistics['first']['count'] == 2
+            assert statistics['subsequent']['count'] == 2
+        finally:
+            pool.shutdown()
+
+
+class TestAdmissionControl:
+    def test_admission_control(self):
+        from ts2pythonServer import AdmissionControl, is_busy_error
+        admission = AdmissionControl({'compile': 1, 'batch': 0})
+        assert admission.admit('compile')
+        assert not admission.admit('compile')
+        assert is_busy_error(admission.busy_error('compile'))
+        admission.release('compile')
+        assert admission.admit('compile')
+        assert all(admission.admit('batch') for _ in range(10))
+        statistics = admission.statistics()
+        assert statistics['compile'] == {'pending': 1, 'limit': 1, 'peak': 1,
+                                         'admitted': 2, 'rejected': 1}
+        assert statistics['batch']['pending'] == 10
+
+    def test_batching_and_coalescing(self):
+        import asyncio
+        from ts2pythonServer import ts2pythonLanguageServerProtocol, WorkerPool, \
+            RequestBatcher
+        sources = [f'interface A{i} {{\n  a: number;\n}}\n' for i in range(5)]
+        lsp = ts2pythonLanguageServerProtocol()
+        lsp.worker_pool = WorkerPool(size=1, recycle=0)
+        lsp.batcher = RequestBatcher(lsp.worker_pool, size=8)
+
+        async def compile_all():
+            return await asyncio.gather(*(lsp.simply_compile(source)
+                                          for source in sources + sources[:2]))
+        try:
+            results = asyncio.run(compile_all())
+        finally:
+            lsp.worker_pool.shutdown()
+        for i, (code, errors) in enumerate(results):
+            assert f'class A{i % 5}(' in code and not errors
+        assert lsp.admission.coalesced == 2
+        assert lsp.batcher.batches == 1 and lsp.batcher.batched == 4
+        assert lsp.admission.statistics()['compile']['pending'] == 0
+        assert not lsp.in_flight
+        assert lsp.result_cache.get(lsp.result_cache.key(sources[0])) is not None
+
+
+class TestBatchProgress:
+    def test_batch_progress(self):
+        import asyncio, shutil, tempfile
+        from concurrent.futures import ThreadPoolExecutor
+        from types import SimpleNamespace
+        from ts2pythonServer import ts2pythonLanguageServerProtocol, WorkerPool
+        notifications = []
+
+        class Connection:
+            def server_notification(self, method, params):
+                # records the notifications in the order in which they are sent
+                notifications.append((method, params))
+                return asyncio.sleep(0)
+            def log(self, *args):
+                pass
+
+        async def compile_batch(src: str, out: str):
+            connection = Connection()
+            connection.exec = SimpleNamespace(loop=asyncio.get_running_loop(),
+                                              thread_executor=executor)
+            lsp.connection = connection
+            return await lsp.lsp_ts2python_compileBatch(inDir=src, outDir=out,
+                                                        workDoneToken='batch')
+
+        tmpdir = tempfile.mkdtemp()
+        executor = ThreadPoolExecutor(1)
+        lsp = ts2pythonLanguageServerProtocol()
+        lsp.worker_pool = WorkerPool(size=2, recycle=0)
+        try:
+            src, out = os.path.join(tmpdir, 'src'), os.path.join(tmpdir, 'out')
+            os.mkdir(src)
+            for i in range(3):
+                with open(os.path.join(src, f'p{i}.ts'), 'w', encoding='utf-8') as f:
+                    f.write(f'interface P{i} {{\n  p: number;\n}}\n' if i else 'interface P0 {\n')
+            result = asyncio.run(compile_batch(src, out))
+            assert [os.path.basename(name) for name in result['errorFiles']] == ['p0_ERRORS.txt']
+            progress = [params['value'] for method, params in notifications
+                        if method == '$/progress' and params['token'] == 'batch']
+            assert [value['kind'] for value in progress] == ['begin'] + ['report'] * 3 + ['end']
+            assert progress[-2]['filesDone'] == 3 and progress[-2]['percentage'] == 100
+            assert progress[-2]['bytesProcessed'] > 0
+            compiled = {os.path.basename(params['source']): params
+                        for method, params in notifications if method == 'ts2python/fileCompiled'}
+            assert sorted(compiled) == ['p0.ts', 'p1.ts', 'p2.ts']
+            assert compiled['p0.ts']['diagnostics'] and not compiled['p1.ts']['diagnostics']
+            assert os.path.isfile(compiled['p2.ts']['output'])
+        finally:
+            lsp.worker_pool.shutdown()
+            executor.shutdown()
+            shutil.rmtree(tmpdir)
+
+    def test_cancelled(self):
+        from concurrent import futures
+        from functools import partial
+        from ts2pythonServer import ts2pythonLanguageServerProtocol
+        future, reported = futures.Future(), futures.Future()
+        future.add_done_callback(partial(ts2pythonLanguageServerProtocol.processed,
+                                         'p.ts', 'p.py', None, reported))
+        future.cancel()
+        assert reported.cancelled()
+
+
+class TestDaemon:
+    def setup_class(self):
+        import tempfile
+        self.tmpdir = tempfile.mkdtemp()
+        self.sources = [os.path.join(self.tmpdir, 'twice.ts'), os.path.join(self.tmpdir, 'once.ts')]
+        with open(self.sources[0], 'w', encoding='utf-8') as f:
+            f.write('interface A {\n  a: number;\n}\ninterface A {\n  b: string;\n}\n')
+        with open(self.sources[1], 'w', encoding='utf-8') as f:
+            f.write('interface B {\n  b: number;\n}\n')
+
+    def teardown_class(self):
+        import shutil
+        shutil.rmtree(self.tmpdir)
+
+    def test_compile_on_daemon(self):
+        import asyncio, socket
+        from ts2pythonServer import compile_on_daemon, final_request, single_request, \
+            IDENTIFY_REQUEST, STOP_SERVER_REQUEST_BYTES
+        with socket.socket() as s:
+            s.bind(('127.0.0.1', 0))
+            port = s.getsockname()[1]
+        out_dir = os.path.join(self.tmpdir, 'daemon')
+        os.mkdir(out_dir)
+        server = subprocess.Popen(
+            [sys.executable, os.path.join(scriptdir_parent, 'ts2pythonServer.py'),
+             '--startserver', '127.0.0.1', str(port)],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        async def identify() -> str:
+            # the server may not answer on a connection that has been opened
+            # and closed again without a request, so don't probe it that way
+            for _ in range(200):
+                try:
+                    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+                    return await final_request(reader, writer, IDENTIFY_REQUEST, 10.0)
+                except OSError:
+                    await asyncio.sleep(0.1)
+            return ''
+
+        try:
+            assert asyncio.run(identify()).find('ts2pythonServer') >= 0
+            error_files = asyncio.run(compile_on_daemon(self.sources, out_dir, '127.0.0.1', port))
+            assert error_files == [os.path.join(out_dir, 'twice_WARNINGS.txt'), '']
+            assert os.path.isfile(os.path.join(out_dir, 'once.py'))
+        finally:
+            asyncio.run(single_request(STOP_SERVER_REQUEST_BYTES, '127.0.0.1', port))
+            try:
+                server.wait(10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+    def test_in_process_fallback(self):
+        import asyncio, socket
+        from ts2pythonServer import compile_on_daemon, compile_files
+        with socket.socket() as s:
+            s.bind(('127.0.0.1', 0))
+            port = s.getsockname()[1]  # no daemon is listening on this port
+        out_dir = os.path.join(self.tmpdir, 'fallback')
+        assert asyncio.run(compile_on_daemon(self.sources, out_dir, '127.0.0.1', port)) is None
+        error_files = compile_files(self.sources, out_dir, '127.0.0.1', port)
+        assert error_files == [os.path.join(out_dir, 'twice_WARNINGS.txt')]
+        assert os.path.isfile(os.path.join(out_dir, 'once.py'))
+
+
+class TestProject:
+    def setup_class(self):
+        import tempfile
+        self.tmpdir = tempfile.mkdtemp()
+        self.src = os.path.join(self.tmpdir, 'src')
+        os.makedirs(os.path.join(self.src, 'api'))
+        sources = {
+            'base.d.ts': 'export interface Position {\n  line: number;\n}\n',
+            os.path.join('api', 'range.d.ts'):
+                'import { Position } from "../base";\n'
+                'export interface Range {\n  start: Position;\n  end: Position;\n}\n',
+            os.path.join('api', 'location.d.ts'):
+                'import { Range as R } from "./range";\n'
+                'import * as base from "../base.js";\n'
+                'export interface Location extends R {\n  at: base.Position;\n}\n'}
+        for name, source in sources.items():
+            with open(os.path.join(self.src, name), 'w', encoding='utf-8') as f:
+                f.write(source)
+
+    def teardown_class(self):
+        import shutil
+        shutil.rmtree(self.tmpdir)
+
+    def test_module_names(self):
+        assert ts2pythonParser.relative_module('a.b.c', 'a.d') == '..d'
+        assert ts2pythonParser.relative_module('a.b', 'a.b.c') == '.b.c'
+        assert ts2pythonParser.python_module_name(
+            os.path.join('root', 'lib', 'in.d.ts'), 'root') == 'lib.in_'
+
+    def test_compile_project(self):
+        from DHParser.configuration import get_config_value, set_config_value
+        parallelization = get_config_value('batch_processing_parallelization')
+        set_config_value('batch_processing_parallelization', False)
+        out_dir = os.path.join(self.tmpdir, 'generated')
+        os.mkdir(out_dir)
+        try:
+            names = [os.path.join(self.src, 'api', 'location.d.ts'),
+                     os.path.join(self.src, 'api', 'range.d.ts'),
+                     os.path.join(self.src, 'base.d.ts')]
+            compiled = []
+            errors = ts2pythonParser.compile_project(names, out_dir, log_func=compiled.append)
+            assert not errors, errors
+            assert compiled == ['Compiled "base.d.ts"', 'Compiled "range.d.ts"',
+                                'Compiled "location.d.ts"']
+            with open(os.path.join(out_dir, 'api', 'location.py'), encoding='utf-8') as f:
+                location = f.read()
+            assert 'from .range import Range as R' in location
+            assert 'from .. import base' in location
+            assert 'class Location(R):' in location
+            compilations = []
+            compile_src = ts2pythonParser.compile_src
+
+            def counting_compile_src(*args, **kwargs):
+                compilations.append(args[0])
+                return compile_src(*args, **kwargs)
+
+            ts2pythonParser.compile_src = counting_compile_src
+            try:
+                errors = ts2pythonParser.compile_project(names, out_dir)
+            finally:
+                ts2pythonParser.compile_src = compile_src
+            assert not errors
+            assert compilations == []  # all modules are served from the symbols cache
+            sys.path.insert(0, self.tmpdir)
+            try:
+                from generated.api.location import Location
+                from generated.base import Position
+                assert Location.__annotations__['start'] is Position
+            finally:
+                sys.path.remove(self.tmpdir)
+        finally:
+            set_config_value('batch_processing_parallelization', parallelization)
+
+
+class TestWatch:
+    def test_watch(self):
+        import tempfile, threading, time
+        with tempfile.TemporaryDirectory() as tmpdir:
+            source = os.path.join(tmpdir, 'watched.ts')
+            with open(source, 'w', encoding='utf-8') as f:
+                f.write('export interface A {\n  a: number;\n}\n')
+            stop = threading.Event()
+            messages = []
+            watcher = threading.Thread(target=ts2pythonParser.watch, args=([tmpdir], tmpdir),
+                kwargs={'interval': 0.02, 'debounce': 0.02, 'log_func': messages.append,
+                        'cancel_func': stop.is_set})
+            watcher.start()
+            try:
+                while not messages:  time.sleep(0.01)
+                time.sleep(0.05)
+                with open(source, 'w', encoding='utf-8') as f:
+                    f.write('export interface B {\n  b: string;\n}\n')
+                for _ in range(500):
+                    if len(messages) > 1:  break
+                    time.sleep(0.01)
+            finally:
+                stop.set()
+                watcher.join()
+            assert len(messages) == 2 and messages[1].startswith('Rebuilt 1 changed file(s)')
+            with open(os.path.join(tmpdir, 'watched.py'), encoding='utf-8') as f:
+                assert 'class B(TypedDict' in f.read()
+
+
 class TestScriptCall:
     def setup_class(self):
         with open('testdata.ts', 'w', encoding='utf-8') as f:
@@ -8,6 +8,8 @@
 from enum import IntEnum
 import os
 import sys
+import types
+import typing
 from typing import TypeVar, Generic, Union, Dict, List, Optional
 
 scriptdir = os.path.dirname(os.path.abspath(__file__))
@@ -157,6 +159,34 @@ class TestValidation:
         except TypeError:
             pass
 
+    def test_field_table(self):
+        fields = typeddict_shim.field_table(ResponseMessage)
+        assert list(fields.keys()) == ['jsonrpc', 'id', 'result', 'error']
+        assert fields['jsonrpc'].required and not fields['error'].required
+        assert fields['jsonrpc'].owner in (Message, ResponseMessage)
+        annotations = dict(ResponseMessage.__annotations__)
+        validate_type({'jsonrpc': '2.0', 'id': 1, 'error': {'code': 1, 'message': 'm'}},
+                      ResponseMessage)
+        assert fields['error'].kind == 'typeddict'
+        assert fields['error'].type is ResponseError
+        assert fields['id'].kind == 'union'
+        assert ResponseMessage.__annotations__ == annotations
+        try:
+            validate_type({'jsonrpc': '2.0', 'error': {'code': 1}}, ResponseMessage)
+            assert False, "Missing key in nested TypedDict not detected"
+        except TypeError:
+            pass
+
+    def test_readonly_fields(self):
+        if (3, 11, 0) <= sys.version_info < (3, 13, 0):
+            return  # neither ReadOnly nor the shim's TypedDict are available
+        Config = TypedDict('Config', {'name': 'ReadOnly[str]',
+                                      'size': 'NotRequired[ReadOnly[int]]',
+                                      'label': 'str'})
+        fields = typeddict_shim.field_table(Config)
+        assert fields['name'].readonly and fields['size'].readonly
+        assert not fields['label'].readonly
+
 
 DEFINITION_AFTERT_USAGE_TS = '''
 class Range {
@@ -171,6 +201,48 @@ class Position {
 '''
 
 
+RECURSIVE_TYPES_TS = '''
+type Label = Name | number;
+type Name = string;
+
+interface Node {
+    label: Label;
+    children?: Node[];
+    parent?: Parent;
+}
+
+type Parent = Node | null;
+'''
+
+
+class TestFreezeModule:
+    def test_freeze_module(self):
+        pycode, err = compile_src(RECURSIVE_TYPES_TS)
+        module = types.ModuleType('test_frozen_module')
+        sys.modules[module.__name__] = module
+        try:
+            exec(pycode, vars(module))
+            assert json_validation.freeze_module(module) == {}
+            assert typing.get_args(module.Label) == (str, float)
+            fields = typeddict_shim.field_table(module.Node)
+            assert all(field.kind is not None for field in fields.values())
+            validate_type({'label': 'root', 'children': [{'label': 1}], 'parent': None},
+                          module.Node)
+            try:
+                validate_type({'label': None}, module.Node)
+                assert False, "Type error not detected after freezing"
+            except TypeError:
+                pass
+        finally:
+            del sys.modules[module.__name__]
+
+    def test_long_reference_chain(self):
+        graph = {f'T{i}': {f'T{i + 1}'} for i in range(5 * sys.getrecursionlimit())}
+        components = json_validation._strongly_connected(graph)
+        assert len(components) == len(graph)
+        assert components[0] == {f'T{len(graph) - 1}'} and components[-1] == {'T0'}
+
+
 class TestClassDefinitionOrder:
     def test_class_definition_order(self):
         pycode, err = compile_src(DEFINITION_AFTERT_USAGE_TS)
@@ -0,0 +1,79 @@
+"""grammar_stamp.py - records a verified snapshot of the grammar
+
+Checking whether the parser-script of ts2python must be regenerated from
+its grammar with DHParser's recompile_grammar() takes much longer than
+starting up otherwise. After a successful check, ts2pythonParser and
+ts2pythonServer record a checksum of the grammar, the parser-script and
+the DHParser-version and skip the check as long as it matches. This module
+does not import ts2pythonParser, so that the server can check the snapshot
+before it loads the parser-script.
+
+Copyright 2021  by Eckhart Arnold (arnold@badw.de)
+                Bavarian Academy of Sciences an Humanities (badw.de)
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+implied. See the License for the specific language governing
+permissions and limitations under the License.
+"""
+
+import os
+
+
+__all__ = ['grammar_stamp_path', 'grammar_checksum', 'grammar_verified',
+           'record_grammar_snapshot']
+
+
+def grammar_stamp_path(script_path: str) -> str:
+    """Returns the path of the file that records the last successful check
+    of the grammar for the parser-script at script_path."""
+    return os.path.splitext(script_path)[0] + '.grammar_stamp'
+
+
+def grammar_checksum(grammar_path: str, script_path: str) -> str:
+    """Returns a checksum of the grammar, the parser-script and the version
+    of DHParser, i.e. of everything that decides whether the grammar in
+    the parser-script must be recompiled. (Not a cryptographic hash, because
+    importing hashlib alone takes longer than reading both files.)"""
+    from zlib import crc32
+    from DHParser.versionnumber import __version__
+    checksum = crc32(__version__.encode('utf-8'))
+    sizes = []
+    for path in (grammar_path, script_path):
+        with open(path, 'rb') as f:
+            content = f.read()
+        checksum = crc32(content, checksum)
+        sizes.append(str(len(content)))
+    return '-'.join(sizes + ['%08x' % checksum])
+
+
+def grammar_verified(grammar_path: str, script_path: str) -> bool:
+    """Returns True, if a snapshot of the grammar and the parser-script has
+    been recorded after the last successful check and neither of them has
+    changed since. In this case, calling ``recompile_grammar()``, which
+    takes much longer, can be skipped."""
+    try:
+        with open(grammar_stamp_path(script_path), 'r', encoding='utf-8') as f:
+            stamp = f.read().strip()
+        return stamp == grammar_checksum(grammar_path, script_path)
+    except OSError:
+        return False
+
+
+def record_grammar_snapshot(grammar_path: str, script_path: str):
+    """Records a snapshot of the grammar and the parser-script after a
+    successful check with ``recompile_grammar()``. A read-only installation
+    is not an error: The grammar will simply be checked again next time."""
+    try:
+        checksum = grammar_checksum(grammar_path, script_path)
+        with open(grammar_stamp_path(script_path), 'w', encoding='utf-8') as f:
+            f.write(checksum)
+    except OSError:
+        pass
@@ -21,9 +21,11 @@ permissions and limitations under the License.
 from enum import Enum
 import functools
 import inspect
+import re
 import sys
+import typing
 from typing import Union, List, Tuple, Dict, Set, Any, \
-    TypeVar, Iterable, Callable, get_type_hints, Union
+    TypeVar, Iterable, Callable, Optional, get_type_hints, Union
 try:
     from typing_extensions import GenericMeta, \
         ClassVar, Final, Protocol, NoReturn, Literal
@@ -33,20 +35,20 @@ except (ImportError, ModuleNotFoundError):
 
 try:
     from ts2python.typeddict_shim import TypedDict, _TypedDictMeta, get_origin, \
-        get_args, ForwardRef, _GenericAlias, is_typeddict, NotRequired
+        get_args, ForwardRef, _GenericAlias, is_typeddict, NotRequired, field_table
 except (ImportError, ModuleNotFoundError):
     try:
         from typeddict_shim import TypedDict, _TypedDictMeta, get_origin, \
-            get_args, ForwardRef, _GenericAlias, is_typeddict, NotRequired
+            get_args, ForwardRef, _GenericAlias, is_typeddict, NotRequired, field_table
     except (ImportError, ModuleNotFoundError):
         from .typeddict_shim import TypedDict, _TypedDictMeta, get_origin, \
-            get_args, ForwardRef, _GenericAlias, is_typeddict, NotRequired
+            get_args, ForwardRef, _GenericAlias, is_typeddict, NotRequired, field_table
 
 if sys.version_info >= (3, 11, 0):
     from typing import _GenericAlias, TypedDict, _TypedDictMeta, get_origin, get_args, ForwardRef
 
 
-__all__ = ['validate_type', 'type_check', 'validate_uniform_sequence']
+__all__ = ['validate_type', 'type_check', 'validate_uniform_sequence', 'freeze_module']
 
 
 def strdata(data: Any) -> str:
@@ -89,6 +91,131 @@ def resolve_forward_refs(T: type, Ur_T: type = None,) -> type:
     return T
 
 
+SCHEMA_TYPES = {'int': int, 'float': float, 'str': str, 'bool': bool, 'None': type(None)}
+
+
+def get_schema(T) -> Optional[Dict[str, tuple]]:
+    """Returns the schema table "__ts2python_schema__" that ts2python adds to
+    the generated modules with the configuration value
+    "ts2python.GenerateSchema", if the module (or, for generated packages,
+    the package) in which T has been defined has one, or None otherwise."""
+    module = sys.modules.get(getattr(T, '__module__', ''), None)
+    schema = getattr(module, '__ts2python_schema__', None)
+    if schema is None and getattr(module, '__package__', ''):
+        package = sys.modules.get(module.__package__, None)
+        schema = getattr(package, '__ts2python_schema__', None)
+    return schema
+
+
+def schema_type_name(spec) -> str:
+    """Returns a readable name for a type from the schema table."""
+    if isinstance(spec, str):
+        return spec
+    kind, args = spec[0], spec[1:]
+    if kind == 'typeddict':
+        return 'TypedDict'
+    if kind == 'literal':
+        return f"Literal[{', '.join(repr(arg) for arg in args)}]"
+    names = ', '.join('...' if arg is Ellipsis else schema_type_name(arg) for arg in args)
+    return f"{kind.capitalize()}[{names}]"
+
+
+def schema_type_error(value: Any, spec, schema: Dict[str, tuple], module) -> str:
+    """Validates a value against a type from the schema table and returns
+    an error message or the empty string, if the value is of that type."""
+    if isinstance(spec, str):
+        if spec == 'Any':
+            return ''
+        if spec in schema:
+            entry = schema[spec]
+            kind = entry[0]
+            if kind == 'alias':
+                error = schema_type_error(value, entry[1], schema, module)
+                return f"'{strdata(value)}' is not of {spec}, but of type {type(value)}" \
+                    if error else ''
+            if kind == 'enum':
+                return '' if value in entry[1] else f"{value} is not contained in enum {spec}"
+            if not isinstance(value, Dict):
+                return f"'{strdata(value)}' is not of {spec}, but of type {type(value)}"
+            errors = schema_field_errors(value, entry[1], schema, module)
+            return f"Type error(s) in dictionary of type {spec}:\n" + '\n'.join(errors) \
+                if errors else ''
+        if spec in SCHEMA_TYPES:
+            typ = SCHEMA_TYPES[spec]
+            return '' if isinstance(value, typ) \
+                else f"'{strdata(value)}' is not a {typ}, but a {type(value)}"
+        typ = module
+        for name in spec.split('.'):
+            typ = getattr(typ, name, None)
+        if typ is None:
+            return f"Type {spec} of '{strdata(value)}' cannot be resolved " \
+                   f"in module {getattr(module, '__name__', module)}"
+        if isinstance(typ, TypeVar):
+            return ''
+        try:
+            validate_type(value, typ)
+        except TypeError as e:
+            return str(e)
+        return ''
+    kind, args = spec[0], spec[1:]
+    if kind == 'union':
+        if any(not schema_type_error(value, arg, schema, module) for arg in args):
+            return ''
+        return f"'{strdata(value)}' is not any of {schema_type_name(spec)}, " \
+               f"but of type {type(value)}"
+    if kind == 'literal':
+        return '' if value in args else f"{value} is not of type {schema_type_name(spec)}"
+    if kind == 'typeddict':
+        if not isinstance(value, Dict):
+            return f"'{strdata(value)}' is not a dictionary, but of type {type(value)}"
+        return '\n'.join(schema_field_errors(value, args[0], schema, module))
+    if kind == 'list':
+        items = value if isinstance(value, list) else None
+        item_types = [args[0]] * len(value) if items is not None else []
+    elif kind == 'tuple':
+        items = value if isinstance(value, (list, tuple)) else None
+        if items is None:
+            item_types = []
+        elif args[-1:] == (Ellipsis,):
+            item_types = [args[0]] * len(items)
+        elif len(args) == len(items):
+            item_types = args
+        else:
+            items = None
+    else:
+        assert kind == 'dict', kind
+        if not isinstance(value, Dict):
+            items = None
+        else:
+            items = list(value.keys()) + list(value.values())
+            item_types = [args[0]] * len(value) + [args[1]] * len(value)
+    if items is None:
+        return f"{value} is not of type {schema_type_name(spec)}"
+    for item, item_type in zip(items, item_types):
+        error = schema_type_error(item, item_type, schema, module)
+        if error:
+            return error
+    return ''
+
+
+def schema_field_errors(D: Dict, fields: tuple, schema: Dict[str, tuple], module) -> List[str]:
+    """Validates a dictionary against the fields of a TypedDict from the
+    schema table and returns a list of error messages."""
+    type_errors = []
+    missing = {key for key, required, _ in fields if required} - D.keys()
+    if missing:
+        type_errors.append(f"Missing required keys: {missing}")
+    unexpected = D.keys() - {key for key, _, _ in fields}
+    if unexpected:
+        type_errors.append(f"Unexpected keys: {unexpected}")
+    for key, _, spec in fields:
+        if key in D:
+            error = schema_type_error(D[key], spec, schema, module)
+            if error:
+                type_errors.append(f"Field {key}: {error}")
+    return type_errors
+
+
 def validate_enum(val: Any, typ: Enum):
     # if not any(member.value == val for member in typ.__members__.values()):
     #     raise ValueError(f"{val} is not contained in enum {typ}")
@@ -219,6 +346,42 @@ def validate_compound_type(value: Any, T):
         raise TypeError(f"{value} is not of type {T}")
 
 
+def resolve_fields(T: _TypedDictMeta):
+    """Resolves the types of all fields of the TypedDict T that have not
+    been resolved, yet, and records them in the field table of T (see
+    typeddict_shim.field_table()), so that the type hints of T need to be
+    evaluated only once."""
+    hints = get_type_hints(T)
+    for field, descriptor in field_table(T).items():
+        if descriptor.kind is not None:
+            continue
+        owner = descriptor.owner
+        field_type = resolve_forward_refs(hints[field], owner)
+        members = ()
+        if is_TypedDictClass(field_type):
+            kind = 'typeddict'
+        elif get_origin(field_type) is Union:
+            kind = 'union'
+            members = []
+            for union_typ in field_type.__args__:
+                union_typ = resolve_forward_refs(union_typ, owner)
+                if isinstance(union_typ, ForwardRef):
+                    if sys.version_info >= (3, 9, 0):
+                        union_typ = union_typ._evaluate(globals(), sys.modules[owner.__module__].__dict__,
+                                                        recursive_guard=set())
+                    else:
+                        union_typ = union_typ._evaluate(globals(), sys.modules[owner.__module__].__dict__)
+                members.append(union_typ)
+            members = tuple(members)
+        elif hasattr(field_type, '__args__'):
+            kind = 'compound'
+        elif isinstance(field_type, TypeVar):
+            kind = 'typevar'
+        else:
+            kind = 'class'
+        descriptor.resolve(field_type, kind, members)
+
+
 def validate_TypedDict(D: Dict, T: _TypedDictMeta):
     """Validates a dictionary against a TypedDict-definition and raises
     a TypeError, if any of the following is detected:
@@ -226,7 +389,9 @@ def validate_TypedDict(D: Dict, T: _TypedDictMeta):
     - "Missing" keys, i.e. keys that have been defined in the TypedDict,
       and not been marked as NotRequired/Optional
     Types are validated recursively for any contained dictionaries, lists
-    or tuples. Example::
+    or tuples. If the module that defines the TypedDict contains a schema
+    table (see get_schema()), the fields and their types are taken from the
+    table instead of being reflected from the annotations. Example::
 
     >>> class Position(TypedDict, total=True):
     ...     line: int
@@ -247,39 +412,39 @@ def validate_TypedDict(D: Dict, T: _TypedDictMeta):
     """
     assert isinstance(D, Dict), str(D)
     assert is_TypedDictClass(T), str(T)
+    schema = get_schema(T)
+    if schema is not None and T.__qualname__ in schema:
+        type_errors = schema_field_errors(D, schema[T.__qualname__][1], schema,
+                                          sys.modules[T.__module__])
+        if type_errors:
+            raise TypeError(f"Type error(s) in dictionary of type {T}:\n"
+                            + '\n'.join(type_errors))
+        return
     type_errors = []
-    # X = T.__required_keys__
+    fields = field_table(T)
     missing = T.__required_keys__ - D.keys()
-    x = T.__required_keys__.copy()
     if missing:
         type_errors.append(f"Missing required keys: {missing}")
-    unexpected = D.keys() - (T.__required_keys__ | T.__optional_keys__)
+    unexpected = D.keys() - fields.keys()
     if unexpected:
         type_errors.append(f"Unexpected keys: {unexpected}")
-    for field, field_type in get_type_hints(T).items():
+    for field, descriptor in fields.items():
         if field not in D:
             continue
-        resolved_field_type = resolve_forward_refs(field_type, T)
-        if resolved_field_type != field_type:
-            field_type = resolved_field_type
-            T.__annotations__[field] = field_type
-        if is_TypedDictClass(field_type):
-            value = D[field]
+        kind = descriptor.kind
+        if kind is None:
+            resolve_fields(T)
+            kind = descriptor.kind
+        field_type = descriptor.type
+        value = D[field]
+        if kind == 'typeddict':
             if isinstance(value, Dict):
                 validate_TypedDict(value, field_type)
             else:
-                type_errors.append(f"Field {field}: '{strdata(D[field])}' is not of {field_type}, "
-                                   f"but of type {type(D[field])}")
-        elif get_origin(field_type) is Union:
-            value = D[field]
-            for union_typ in field_type.__args__:
-                union_typ = resolve_forward_refs(union_typ, T)
-                if isinstance(union_typ, ForwardRef):
-                    if sys.version_info >= (3, 9, 0):
-                        union_typ = union_typ._evaluate(globals(), sys.modules[T.__module__].__dict__,
-                                                        recursive_guard=set())
-                    else:
-                        union_typ = union_typ._evaluate(globals(), sys.modules[T.__module__].__dict__)
+                type_errors.append(f"Field {field}: '{strdata(value)}' is not of {field_type}, "
+                                   f"but of type {type(value)}")
+        elif kind == 'union':
+            for union_typ in descriptor.members:
                 if is_TypedDictClass(union_typ):
                     if isinstance(value, Dict):
                         try:
@@ -297,18 +462,18 @@ def validate_TypedDict(D: Dict, T: _TypedDictMeta):
                     break
             else:
                 # TODO: bugfix?
-                type_errors.append(f"Field {field}: '{strdata(D[field])}' is not any of "
-                                   f"{field_type}, but of type {type(D[field])}")
-        elif hasattr(field_type, '__args__'):
-            validate_compound_type(D[field], field_type)
-        elif isinstance(field_type, TypeVar):
+                type_errors.append(f"Field {field}: '{strdata(value)}' is not any of "
+                                   f"{field_type}, but of type {type(value)}")
+        elif kind == 'compound':
+            validate_compound_type(value, field_type)
+        elif kind == 'typevar':
             pass  # for now
-        elif not isinstance(D[field], field_type):
+        elif not isinstance(value, field_type):
             if issubclass(field_type, Enum):
-                validate_enum(D[field], field_type)
+                validate_enum(value, field_type)
             else:
-                type_errors.append(f"Field {field}: '{strdata(D[field])}' is not a {field_type}, "
-                                   f"but a {type(D[field])}")
+                type_errors.append(f"Field {field}: '{strdata(value)}' is not a {field_type}, "
+                                   f"but a {type(value)}")
     if type_errors:
         raise TypeError(f"Type error(s) in dictionary of type {T}:\n"
                         + '\n'.join(type_errors))
@@ -385,3 +550,175 @@ def type_check(func: Callable, check_return_type: bool = True) -> Callable:
         return ret
 
     return guard
+
+
+def _forward_names(T, names: Set[str]):
+    """Adds the names referred to by the forward references in T to names."""
+    if isinstance(T, str):
+        T = ForwardRef(T)
+    if isinstance(T, ForwardRef):
+        names.update(re.findall(r'[A-Za-z_][\w.]*', T.__forward_arg__))
+    else:
+        for arg in getattr(T, '__args__', None) or ():
+            _forward_names(arg, names)
+    return names
+
+
+def _substitute_forward_refs(T, namespace: Dict[str, Any], keep: Set[str]):
+    """Returns T with the forward references substituted by the objects
+    they refer to in namespace, except for the references to the names in
+    keep, i.e. the recursive references."""
+    if isinstance(T, ForwardRef):
+        if T.__forward_arg__ in keep:
+            return T
+        return eval(T.__forward_arg__, namespace, {})
+    args = getattr(T, '__args__', None)
+    if not args or get_origin(T) is Literal:
+        return T
+    substituted = tuple(_substitute_forward_refs(arg, namespace, keep) for arg in args)
+    if all(a is b for a, b in zip(args, substituted)):
+        return T
+    try:
+        return T.copy_with(substituted)
+    except AttributeError:
+        return T
+
+
+def _frozen_objects(module) -> Dict[str, Tuple[Any, Set[str]]]:
+    """Returns the type aliases with forward references and the TypedDicts
+    of module, including TypedDicts nested in classes, by their qualified
+    names, together with the names of the forward references they contain."""
+    objects = dict()
+    for name, obj in list(vars(module).items()):
+        if not name.startswith('__') and not inspect.isclass(obj) \
+                and getattr(obj, '__args__', None):
+            names = _forward_names(obj, set())
+            if names:
+                objects[name] = (obj, names)
+    classes = [obj for obj in vars(module).values()
+               if inspect.isclass(obj) and obj.__module__ == module.__name__]
+    while classes:
+        cls = classes.pop()
+        if is_TypedDictClass(cls):
+            names = set()
+            for descriptor in field_table(cls).values():
+                _forward_names(descriptor.annotation, names)
+            objects[cls.__qualname__] = (cls, names)
+        classes.extend(obj for obj in vars(cls).values() if inspect.isclass(obj)
+                       and obj.__qualname__.startswith(cls.__qualname__ + '.'))
+    return objects
+
+
+def _strongly_connected(graph: Dict[str, Set[str]]) -> List[Set[str]]:
+    """Returns the strongly connected components of the graph (Tarjan's
+    algorithm) in topological order, i.e. every component is preceded by
+    the components it refers to. The depth-first search is run with an
+    explicit stack, so that long chains of references do not exceed the
+    recursion limit."""
+    index, lowlink, stack, on_stack = dict(), dict(), [], set()
+    components = []
+
+    def visit(node: str):
+        index[node] = lowlink[node] = len(index)
+        stack.append(node)
+        on_stack.add(node)
+        return node, iter(sorted(graph[node]))
+
+    for root in graph:
+        if root in index:
+            continue
+        path = [visit(root)]
+        while path:
+            node, successors = path[-1]
+            for successor in successors:
+                if successor not in graph:
+                    continue
+                if successor not in index:
+                    path.append(visit(successor))
+                    break
+                elif successor in on_stack:
+                    lowlink[node] = min(lowlink[node], index[successor])
+            else:
+                path.pop()
+                if path:
+                    parent = path[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = set()
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.add(member)
+                        if member == node:
+                            break
+                    components.append(component)
+    return components
+
+
+def freeze_module(module) -> Dict[str, str]:
+    """Resolves all forward references of a module that has been generated
+    with ts2python in one pass: The forward references in the type aliases
+    are substituted by the types they refer to, except for the references
+    that make a type recursive, the types of the fields of all TypedDicts
+    are resolved and recorded in their field tables (see resolve_fields()),
+    and the postponed registrations of the single- and multi-dispatch
+    functions of the module are resolved (see singledispatch_shim.finalize()).
+
+    The type aliases and TypedDicts are processed in topological order of
+    their forward references, so that type aliases and TypedDicts see the
+    resolved type aliases they refer to. Afterwards, validating dictionaries
+    against the TypedDicts and dispatching does not need to reflect on the
+    annotations, any more. Calling freeze_module() after the module has been
+    imported, e.g. at the startup of a server, moves this work out of the
+    first calls. Example::
+
+        >>> import types
+        >>> module = types.ModuleType('frozen_example')
+        >>> sys.modules['frozen_example'] = module
+        >>> vars(module).update(TypedDict=TypedDict, NotRequired=NotRequired,
+        ...                     List=List, Union=Union)
+        >>> exec('''
+        ... class Node(TypedDict):
+        ...     label: 'Label'
+        ...     children: NotRequired[List['Node']]
+        ... Label = Union['Name', int]
+        ... Name = str
+        ... class Broken(TypedDict):
+        ...     field: 'Undefined'
+        ... ''', vars(module))
+        >>> freeze_module(module)
+        {'Broken': "name 'Undefined' is not defined"}
+        >>> module.Label
+        typing.Union[str, int]
+        >>> field_table(module.Node)['label'].members
+        (<class 'str'>, <class 'int'>)
+
+    :param module: the module (or its name) the types of which shall be resolved
+    :return: a dictionary of the qualified names of the objects that could
+        not be resolved, mapped to the error messages.
+    """
+    try:
+        from ts2python.singledispatch_shim import finalize
+    except (ImportError, ModuleNotFoundError):
+        try:
+            from singledispatch_shim import finalize
+        except (ImportError, ModuleNotFoundError):
+            from .singledispatch_shim import finalize
+    if isinstance(module, str):
+        module = sys.modules[module]
+    namespace = vars(module)
+    objects = _frozen_objects(module)
+    graph = {name: names for name, (_, names) in objects.items()}
+    failures = dict()
+    for component in _strongly_connected(graph):
+        for name in sorted(component):
+            obj = objects[name][0]
+            try:
+                if is_TypedDictClass(obj):
+                    resolve_fields(obj)
+                else:
+                    namespace[name] = _substitute_forward_refs(obj, namespace, component)
+            except (NameError, TypeError, AttributeError) as e:
+                failures[name] = str(e)
+    finalize(module.__name__, failures)
+    return failures
@@ -9,7 +9,9 @@ allows this kind of annotation as a simple form of forward-referencing,
 reference.
 
 singledispatch_shim contains an alternative implementation of
-single dispatch that works correctly with forward-referenced types.
+single dispatch that works correctly with forward-referenced types
+and an implementation of multiple dispatch on the types of several
+positional arguments (multidispatch).
 
 Copyright 2022  by Eckhart Arnold (arnold@badw.de)
                 Bavarian Academy of Sciences an Humanities (badw.de)
@@ -29,15 +31,17 @@ permissions and limitations under the License.
 
 
 from functools import _find_impl, get_cache_token, update_wrapper
-from typing import Union, ForwardRef
+from itertools import product
+from operator import attrgetter
+from typing import Union, ForwardRef, Dict, FrozenSet, Optional, Tuple, Any
 import sys
 try:
-    from typing import get_args, get_origin, get_type_hints
+    from typing import get_args, get_origin, get_type_hints, Literal
 except ImportError:
     try:
-        from typing_extensions import get_args, get_origin, get_type_hints
+        from typing_extensions import get_args, get_origin, get_type_hints, Literal
     except ImportError:
-        from .typing_extensions import get_args, get_origin, get_type_hints
+        from .typing_extensions import get_args, get_origin, get_type_hints, Literal
 
 
 try:
@@ -52,6 +56,176 @@ except (ImportError, ModuleNotFoundError):
         return getattr(cls, '__annotations__', {})
 
 
+def _is_typeddict(cls) -> bool:
+    return isinstance(cls, type) and hasattr(cls, '__required_keys__') \
+        and hasattr(cls, '__optional_keys__')
+
+
+def _literal_values(T) -> Optional[FrozenSet]:
+    """Returns the values of a Literal-type or of a union of Literal-types
+    or None, if T is not a Literal-type."""
+    if T is type(None):
+        return frozenset([None])
+    origin = get_origin(T)
+    if origin is Literal:
+        return frozenset(get_args(T))
+    if origin is Union or type(T).__name__ == 'UnionType':
+        values = [_literal_values(arg) for arg in get_args(T)]
+        if all(v is not None for v in values):
+            return frozenset().union(*values)
+    return None
+
+
+def _literal_fields(td) -> Dict[str, FrozenSet]:
+    """Returns a dictionary of the fields of the TypedDict td that have a
+    Literal-type and their admissible values."""
+    try:
+        hints = get_type_hints(td)
+    except (NameError, TypeError):
+        # unresolvable forward references: use the annotations that are
+        # not forward references
+        hints = {k: v for k, v in getattr(td, '__annotations__', {}).items()
+                 if not isinstance(v, (str, ForwardRef))}
+    fields = dict()
+    for field, T in hints.items():
+        try:
+            values = _literal_values(T)
+        except TypeError:  # unhashable literal values
+            values = None
+        if values is not None:
+            fields[field] = values
+    return fields
+
+
+_MISSING = object()  # discriminating key is missing
+_OTHER = object()    # value of a discriminating key is not a literal value
+
+
+class _TypedDictIndex:
+    """Decision index that picks the implementation for a dictionary among
+    the TypedDict-types registered on a generic function by the structure of
+    the dictionary. A dictionary matches a TypedDict, if it contains all of
+    its required keys, no keys that the TypedDict does not define and, for
+    the fields with a Literal-type, one of the literal values. (Other field
+    values are not validated.) If several TypedDicts match, the one with the
+    most required keys wins, if they have the same number of required keys,
+    the one that has been registered first.
+
+    The keys of the Literal-fields ("discriminators") and the types that
+    remain possible for each of their values are computed once, when the
+    first dictionary is dispatched after a registration. The decision for
+    a particular set of keys and discriminator values is cached, so that
+    dispatching a dictionary of the same shape again takes one lookup.
+    """
+    cache_size = 1024
+
+    def __init__(self):
+        self.entries = []  # (TypedDict-class, implementation) in order of registration
+        self.index = None
+        self.cache = dict()
+
+    def add(self, td, func):
+        self.entries = [(t, f) for t, f in self.entries if t is not td]
+        self.entries.append((td, func))
+        self.index = None
+        self.cache.clear()
+
+    def build(self):
+        shapes = []
+        for td, func in self.entries:
+            required = frozenset(td.__required_keys__)
+            shapes.append((required, required | frozenset(td.__optional_keys__),
+                           _literal_fields(td), func))
+        shapes.sort(key=lambda shape: -len(shape[0]))
+        discriminators = sorted({key for shape in shapes for key in shape[2]})
+        all_shapes = (1 << len(shapes)) - 1
+        candidates = []  # value -> bitmask of the shapes that admit the value
+        for key in discriminators:
+            unrestricted = sum(1 << i for i, shape in enumerate(shapes)
+                               if key not in shape[2])
+            table = {_MISSING: all_shapes, _OTHER: unrestricted}
+            for i, shape in enumerate(shapes):
+                for value in shape[2].get(key, ()):
+                    table[value] = table.get(value, unrestricted) | (1 << i)
+            candidates.append((key, table))
+        self.index = (shapes, candidates)
+
+    def lookup(self, D: Dict):
+        """Returns the implementation for the dictionary D or None, if D
+        does not match any of the registered TypedDicts."""
+        if self.index is None:
+            self.build()
+        shapes, candidates = self.index
+        signature = [frozenset(D)]
+        for key, table in candidates:
+            value = D.get(key, _MISSING)
+            try:
+                signature.append(value if value in table else _OTHER)
+            except TypeError:  # unhashable value
+                signature.append(_OTHER)
+        signature = tuple(signature)
+        try:
+            return self.cache[signature]
+        except KeyError:
+            pass
+        keys = signature[0]
+        mask = (1 << len(shapes)) - 1
+        for (key, table), value in zip(candidates, signature[1:]):
+            mask &= table[value]
+        impl = None
+        for i, (required, allowed, _, func) in enumerate(shapes):
+            if mask & (1 << i) and required <= keys <= allowed:
+                impl = func
+                break
+        if len(self.cache) >= self.cache_size:
+            self.cache.clear()
+        self.cache[signature] = impl
+        return impl
+
+
+_postponed_generics = []  # generic functions with postponed registrations
+
+
+def finalize(module: str = '', errors: Optional[Dict[str, str]] = None):
+    """Resolves the postponed registrations of all generic functions or, if
+    *module* is given, of the generic functions defined in this module or
+    its submodules in one go.
+
+    The registration of an implementation is postponed, if its dispatch type
+    is a forward reference to a type that has not been defined, yet, e.g.
+    the class in the body of which a single-dispatch method is defined. By
+    default, the postponed registrations of a generic function are resolved
+    when it is called for the first time, which makes the first call
+    considerably slower than the following calls. Calling finalize() after
+    the modules that define the types and generic functions have been
+    imported moves this work to the startup of the application. Raises a
+    NameError, if a forward reference cannot be resolved, or a TypeError,
+    if it does not refer to a class, unless a dictionary *errors* is passed,
+    in which case the error messages are recorded there under the qualified
+    names of the generic functions and the remaining generic functions are
+    resolved nonetheless.
+    """
+    global _postponed_generics
+    pending, _postponed_generics = _postponed_generics, []
+    remaining = []
+    try:
+        while pending:
+            generic = pending.pop(0)
+            name = getattr(generic, '__module__', '') or ''
+            if not module or name == module or name.startswith(module + '.'):
+                try:
+                    generic.finalize()
+                except (NameError, TypeError) as e:
+                    # registrations that cannot be resolved remain postponed
+                    if errors is None:
+                        raise
+                    errors[getattr(generic, '__qualname__', repr(generic))] = str(e)
+            else:
+                remaining.append(generic)
+    finally:
+        _postponed_generics[:0] = remaining + pending
+
+
 # The following functions have been copied from the Python
 # standard libraries typing-module. They have been adapted
 # to allow overloading functions that are annotated with
@@ -66,6 +240,13 @@ def singledispatch(func):
     function acts as the default implementation, and additional
     implementations can be registered using the register() attribute of the
     generic function.
+
+    Unlike functools.singledispatch, dictionaries are dispatched structurally
+    on the TypedDict-types that have been registered, because TypedDicts
+    are plain dictionaries at runtime (see _TypedDictIndex). Dictionaries
+    that do not match any of these TypedDicts are dispatched on their class.
+    The TypedDicts are kept in an index of their own and do not appear in
+    the registry.
     """
     # There are many programs that use functools without singledispatch, so we
     # trade-off making singledispatch marginally slower for the benefit of
@@ -75,14 +256,43 @@ def singledispatch(func):
     registry = {}
     dispatch_cache = weakref.WeakKeyDictionary()
     cache_token = None
+    typeddicts = None
+    postponed = []  # registrations with unresolved forward references
+    # A plain dictionary is much faster than a WeakKeyDictionary. It maps the
+    # ids of the classes to their implementations, while a weak reference to
+    # each class removes its entry when the class is garbage-collected, i.e.
+    # before its id can be reused. The cache is only filled as long as there
+    # are neither ABCs, which require checking the cache token on each call,
+    # nor postponed registrations, and not for dictionaries, if TypedDicts
+    # have been registered.
+    fast_cache = {}
+    fast_cache_refs = {}
+    fast_get = fast_cache.get  # no exception on misses, e.g. for dictionaries
+
+    def clear_caches():
+        dispatch_cache.clear()
+        fast_cache.clear()
+        fast_cache_refs.clear()
 
-    def dispatch(cls):
-        """generic_func.dispatch(cls) -> <function implementation>
+    def remember(cls, impl):
+        if cache_token is not None or postponed \
+                or (cls is dict and typeddicts is not None):
+            return
+        key = id(cls)
 
-        Runs the dispatch algorithm to return the best available implementation
-        for the given *cls* registered on *generic_func*.
+        def evict(_, key=key):
+            fast_cache.pop(key, None)
+            fast_cache_refs.pop(key, None)
 
-        """
+        try:
+            fast_cache_refs[key] = weakref.ref(cls, evict)
+        except TypeError:  # class cannot be weakly referenced
+            return
+        fast_cache[key] = impl
+
+    def lookup(cls):
+        """Returns the best available implementation for *cls* among
+        the registered implementations."""
         nonlocal cache_token
         if cache_token is not None:
             current_token = get_cache_token()
@@ -95,25 +305,66 @@ def singledispatch(func):
             try:
                 impl = registry[cls]
             except KeyError:
-                if 'postponed' in registry:
-                    postponed = registry['postponed']
-                    del registry['postponed']
-                    for postponed_cls in postponed:
-                        register(postponed_cls)
-                    if 'postponed' in registry:
-                        for f in registry['postponed']:
-                            get_type_hints(f)   # provoke NameError
-                        raise AssertionError('singledispatch: Internal Error: '
-                                             + str(registry['postponed']))
-                    try:
-                        impl = registry[cls]
-                    except KeyError:
-                        impl = _find_impl(cls, registry)
-                else:
-                    impl = _find_impl(cls, registry)
+                impl = _find_impl(cls, registry)
             dispatch_cache[cls] = impl
         return impl
 
+    def dispatch(cls):
+        """generic_func.dispatch(cls) -> <function implementation>
+
+        Runs the dispatch algorithm to return the best available implementation
+        for the given *cls* registered on *generic_func*.
+
+        """
+        if postponed and cls not in registry:
+            finalize()
+        return lookup(cls)
+
+    # As long as there are postponed registrations, dispatch() is called
+    # on the hot path, afterwards lookup()
+    dispatch_class = lookup
+
+    def finalize():
+        """generic_func.finalize()
+
+        Registers the implementations, the registration of which has been
+        postponed, because their dispatch type was a forward reference that
+        could not be resolved at the time. Raises a NameError, if forward
+        references still cannot be resolved. Otherwise, dispatching on
+        *generic_func* does not need to check for postponed registrations
+        any more.
+
+        """
+        nonlocal postponed, dispatch_class
+        pending, postponed = postponed, []
+        for item in pending:
+            register(item)
+        if postponed:
+            for f in postponed:
+                get_type_hints(f)   # provoke NameError
+            raise AssertionError('singledispatch: Internal Error: ' + str(postponed))
+        dispatch_class = lookup
+        if wrapper in _postponed_generics:
+            _postponed_generics.remove(wrapper)
+
+    def dispatch_arg(arg):
+        """generic_func.dispatch_arg(arg) -> <function implementation>
+
+        Returns the best available implementation for the argument *arg*.
+        Other than dispatch(), this takes the structure of dictionaries
+        into account, if TypedDicts have been registered.
+
+        """
+        impl = fast_get(id(arg.__class__))
+        if impl is not None:
+            return impl
+        cls = arg.__class__
+        impl = dispatch_class(cls)
+        if typeddicts is not None and cls is dict:
+            return typeddicts.lookup(arg) or impl
+        remember(cls, impl)
+        return impl
+
     def _is_union_type(cls):
         try:
             return get_origin(cls) in {Union, types.UnionType}
@@ -133,7 +384,7 @@ def singledispatch(func):
         Registers a new implementation for the given *cls* on a *generic_func*.
 
         """
-        nonlocal cache_token
+        nonlocal cache_token, typeddicts, dispatch_class
         if _is_valid_dispatch_type(cls):
             if func is None:
                 return lambda f: register(cls, f)
@@ -168,7 +419,12 @@ def singledispatch(func):
             # only import typing if annotation parsing is necessary
             try:
                 argname, cls = next(iter(get_type_hints(func).items()))
-                if not isinstance(cls, type) and str(type(cls))[1:6] == "class":
+                if isinstance(get_origin(cls), type):
+                    # parameterized generics, e.g. List[str], are dispatched
+                    # on their origin, e.g. list
+                    cls = get_origin(cls)
+                if not isinstance(cls, type) and not _is_union_type(cls) \
+                        and str(type(cls))[1:6] == "class":
                     raise NameError
             except NameError:
                 if cls != func:
@@ -177,10 +433,18 @@ def singledispatch(func):
                     except AttributeError as e:
                         pass  # TODO: Is this risky?
                         # raise(e)
-                registry.setdefault('postponed', []).append(cls)
+                if not postponed and wrapper not in _postponed_generics:
+                    _postponed_generics.append(wrapper)
+                postponed.append(cls)
+                dispatch_class = dispatch
+                clear_caches()
                 return func
             except StopIteration:
                 func = method
+            if _is_union_type(cls) and not _is_valid_dispatch_type(cls):
+                # likewise, parameterized generics in unions
+                origins = tuple(get_origin(arg) or arg for arg in get_args(cls))
+                cls = Union[origins]
             if not _is_valid_dispatch_type(cls):
                 if _is_union_type(cls):
                     raise TypeError(
@@ -193,29 +457,37 @@ def singledispatch(func):
                         f"{cls!r} of type {type(cls)!r} is not a class."
                     )
 
-        if _is_union_type(cls):
-            for arg in get_args(cls):
+        for arg in (get_args(cls) if _is_union_type(cls) else (cls,)):
+            if _is_typeddict(arg):
+                # TypedDicts do not support class checks, which _find_impl() requires
+                if typeddicts is None:
+                    typeddicts = _TypedDictIndex()
+                typeddicts.add(arg, func)
+            else:
                 registry[arg] = func
-        else:
-            registry[cls] = func
         if cache_token is None and hasattr(cls, '__abstractmethods__'):
             cache_token = get_cache_token()
-        dispatch_cache.clear()
+        clear_caches()
         return func
 
     def wrapper(*args, **kw):
-        if not args:
+        try:
+            impl = fast_get(id(args[0].__class__))
+        except IndexError:
             raise TypeError(f'{funcname} requires at least '
                             '1 positional argument')
-
-        return dispatch(args[0].__class__)(*args, **kw)
+        if impl is None:
+            impl = dispatch_arg(args[0])
+        return impl(*args, **kw)
 
     funcname = getattr(func, '__name__', 'singledispatch function')
     registry[object] = func
     wrapper.register = register
     wrapper.dispatch = dispatch
+    wrapper.dispatch_arg = dispatch_arg
+    wrapper.finalize = finalize
     wrapper.registry = types.MappingProxyType(registry)
-    wrapper._clear_cache = dispatch_cache.clear
+    wrapper._clear_cache = clear_caches
     update_wrapper(wrapper, func)
     return wrapper
 
@@ -243,7 +515,7 @@ class singledispatchmethod:
 
     def __get__(self, obj, cls=None):
         def _method(*args, **kwargs):
-            method = self.dispatcher.dispatch(args[0].__class__)
+            method = self.dispatcher.dispatch_arg(args[0])
             return method.__get__(obj, cls)(*args, **kwargs)
 
         _method.__isabstractmethod__ = self.__isabstractmethod__
@@ -255,3 +527,273 @@ class singledispatchmethod:
     def __isabstractmethod__(self):
         return getattr(self.func, '__isabstractmethod__', False)
 
+
+def _dispatch_classes(T) -> Tuple[type, ...]:
+    """Returns the classes, an argument annotated with type T is dispatched
+    on: the classes of a union, the origin of a parameterized generic type,
+    dict for a TypedDict, object for Any."""
+    if T is Any:
+        return (object,)
+    if T is None:
+        return (type(None),)
+    origin = get_origin(T)
+    if origin is Union or type(T).__name__ == 'UnionType':
+        return tuple(cls for arg in get_args(T) for cls in _dispatch_classes(arg))
+    if _is_typeddict(T):
+        # TypedDicts do not support class checks
+        return (dict,)
+    if isinstance(T, type):
+        return (T,)
+    if isinstance(origin, type):
+        return (origin,)
+    raise TypeError(f"{T!r} of type {type(T)!r} is neither a class nor a union of classes.")
+
+
+_class_of = attrgetter('__class__')
+
+
+def _multidispatch(func, skip: int):
+    """Implements multidispatch() for functions (skip = 0) and methods
+    (skip = 1, i.e. the parameter "self" is not dispatched on)."""
+    import types, weakref
+
+    registry = {}  # tuple of classes -> implementation
+    cache = {}  # tuple of ids of classes -> implementation
+    cache_refs = {}  # id of class -> weak reference that clears the cache
+    cache_get = cache.get
+    cache_token = None
+    arity = 0  # the maximum number of arguments that are dispatched on
+    postponed = []  # registrations with unresolved forward references
+
+    def clear_cache():
+        cache.clear()
+        cache_refs.clear()
+
+    def remember(classes, key, impl):
+        if cache_token is not None or postponed:
+            return
+        for cls in classes:
+            if id(cls) not in cache_refs:
+                try:
+                    cache_refs[id(cls)] = weakref.ref(cls, lambda _: clear_cache())
+                except TypeError:  # class cannot be weakly referenced
+                    return
+        cache[key] = impl
+
+    def find_impl(classes):
+        """Returns the implementation, the signature of which matches the
+        classes most specifically, comparing the positions of the classes
+        of the signature in the method resolution orders of the classes
+        from left to right. Positions beyond the signature count like
+        object. If two signatures match equally well, the first one that
+        has been registered wins."""
+        best, best_rank = None, None
+        for signature, impl in registry.items():
+            if len(signature) > len(classes):
+                continue
+            rank = []
+            for cls, sig_cls in zip(classes, signature):
+                if not issubclass(cls, sig_cls):
+                    break
+                mro = cls.__mro__
+                rank.append(mro.index(sig_cls) if sig_cls in mro else len(mro) - 1)
+            else:
+                rank.extend(len(cls.__mro__) - 1 for cls in classes[len(signature):])
+                if best_rank is None or rank < best_rank:
+                    best, best_rank = impl, rank
+        return best
+
+    def dispatch(*classes):
+        """generic_func.dispatch(*classes) -> <function implementation>
+
+        Returns the best available implementation for arguments of the
+        given *classes*.
+
+        """
+        nonlocal cache_token
+        if postponed:
+            finalize()
+        if cache_token is not None:
+            current_token = get_cache_token()
+            if cache_token != current_token:
+                clear_cache()
+                cache_token = current_token
+        classes = classes[:arity]
+        key = tuple(map(id, classes))
+        impl = cache_get(key)
+        if impl is None:
+            impl = find_impl(classes)
+            remember(classes, key, impl)
+        return impl
+
+    def dispatch_args(args):
+        """generic_func.dispatch_args(args) -> <function implementation>
+
+        Returns the best available implementation for the positional
+        arguments *args*.
+
+        """
+        impl = cache_get(key_of(args))
+        if impl is None:
+            impl = dispatch(*map(_class_of, args))
+        return impl
+
+    def key_of(args):
+        """Returns the key of the cache for the arguments args."""
+        if arity == 1 and args:
+            return (id(args[0].__class__),)
+        if arity == 2 and len(args) >= 2:
+            return (id(args[0].__class__), id(args[1].__class__))
+        return tuple(map(id, map(_class_of, args[:arity])))
+
+    def finalize():
+        """generic_func.finalize()
+
+        Registers the implementations, the registration of which has been
+        postponed, because their annotations contain forward references
+        that could not be resolved at the time.
+
+        """
+        nonlocal postponed
+        pending, postponed = postponed, []
+        for impl in pending:
+            register(impl)
+        if postponed:
+            for impl in postponed:
+                get_type_hints(impl)  # provoke NameError
+            raise AssertionError('multidispatch: Internal Error: ' + str(postponed))
+        if wrapper in _postponed_generics:
+            _postponed_generics.remove(wrapper)
+
+    def signatures(impl):
+        """Returns the signatures of an implementation, i.e. the product of
+        the classes of the annotations of the leading positional parameters."""
+        code = getattr(impl, '__func__', impl).__code__
+        hints = get_type_hints(impl)
+        annotations = []
+        for name in code.co_varnames[skip:code.co_argcount]:
+            if name not in hints:
+                break
+            annotations.append(_dispatch_classes(hints[name]))
+        return list(product(*annotations))
+
+    def register(*classes, func=None):
+        """generic_func.register(*classes, func=None) -> func
+
+        Registers a new implementation for arguments of the given *classes*
+        on a *generic_func*. Without classes, the implementation is
+        registered for the annotations of its leading positional parameters.
+        Each of the classes can also be a union of classes.
+
+        """
+        nonlocal cache_token, arity
+        if len(classes) == 1 and func is None \
+                and hasattr(getattr(classes[0], '__func__', classes[0]), '__code__'):
+            func = classes[0]
+            try:
+                new_signatures = signatures(func)
+            except NameError:
+                if not postponed and wrapper not in _postponed_generics:
+                    _postponed_generics.append(wrapper)
+                postponed.append(func)
+                clear_cache()
+                return func
+        elif func is None:
+            return lambda f: register(*classes, func=f)
+        else:
+            new_signatures = list(product(*(_dispatch_classes(cls) for cls in classes)))
+        for signature in new_signatures:
+            registry[signature] = func
+            arity = max(arity, len(signature))
+            if cache_token is None \
+                    and any(hasattr(cls, '__abstractmethods__') for cls in signature):
+                cache_token = get_cache_token()
+        clear_cache()
+        return func
+
+    def wrapper(*args, **kw):
+        # key_of(args), inlined for the most frequent numbers of arguments
+        if arity == 1 and args:
+            key = (id(args[0].__class__),)
+        elif arity == 2 and len(args) >= 2:
+            key = (id(args[0].__class__), id(args[1].__class__))
+        else:
+            key = tuple(map(id, map(_class_of, args[:arity])))
+        impl = cache_get(key)
+        if impl is None:
+            impl = dispatch(*map(_class_of, args))
+        return impl(*args, **kw)
+
+    registry[()] = func
+    wrapper.register = register
+    wrapper.dispatch = dispatch
+    wrapper.dispatch_args = dispatch_args
+    wrapper.finalize = finalize
+    wrapper.registry = types.MappingProxyType(registry)
+    wrapper._clear_cache = clear_cache
+    update_wrapper(wrapper, func)
+    return wrapper
+
+
+def multidispatch(func):
+    """Multiple-dispatch generic function decorator.
+
+    Transforms a function into a generic function, which can have different
+    behaviours depending upon the types of its positional arguments. The
+    decorated function acts as the default implementation, and additional
+    implementations can be registered using the register() attribute of the
+    generic function, either with the classes of the arguments or, like
+    with singledispatch, for the annotations of the leading positional
+    parameters of the implementation, which may contain unions and forward
+    references. Example::
+
+        >>> @multidispatch
+        ... def combine(a, b):
+        ...     return 'anything'
+        >>> @combine.register
+        ... def _(a: int, b: Union[int, float]):
+        ...     return 'number'
+        >>> @combine.register
+        ... def _(a: int, b: str):
+        ...     return 'text'
+        >>> combine(1, 2.0), combine(1, 'a'), combine('a', 'a')
+        ('number', 'text', 'anything')
+
+    Parameterized generic types are dispatched on their origin, e.g. List[int]
+    on list, and TypedDicts on dict. The implementations are cached for the
+    tuples of the classes of the arguments, so that calling a generic
+    function is only little slower than a single-dispatch function.
+    """
+    return _multidispatch(func, 0)
+
+
+class multidispatchmethod(singledispatchmethod):
+    """Multiple-dispatch generic method descriptor.
+
+    Dispatches on the types of the positional arguments following "self",
+    see multidispatch().
+    """
+
+    def __init__(self, func):
+        if not callable(func) and not hasattr(func, "__get__"):
+            raise TypeError(f"{func!r} is not callable or a descriptor")
+
+        self.dispatcher = _multidispatch(func, 1)
+        self.func = func
+
+    def register(self, *classes, method=None):
+        """generic_method.register(*classes, method=None) -> method
+
+        Registers a new implementation for the given *classes* on a *generic_method*.
+        """
+        return self.dispatcher.register(*classes, func=method)
+
+    def __get__(self, obj, cls=None):
+        def _method(*args, **kwargs):
+            method = self.dispatcher.dispatch_args(args)
+            return method.__get__(obj, cls)(*args, **kwargs)
+
+        _method.__isabstractmethod__ = self.__isabstractmethod__
+        _method.register = self.register
+        update_wrapper(_method, self.func)
+        return _method
@@ -43,7 +43,8 @@ import sys
 
 __all__ = ['NotRequired', 'TypedDict', 'GenericTypedDict', '_TypedDictMeta',
            'GenericMeta', 'get_origin', 'get_args', 'Literal', 'is_typeddict',
-           'ForwardRef', '_GenericAlias', 'ReadOnly', 'TypeAlias']
+           'ForwardRef', '_GenericAlias', 'ReadOnly', 'TypeAlias',
+           'FieldDescriptor', 'field_table']
 
 if sys.version_info >= (3, 14, 0):
     from typing import (NotRequired, TypedDict, _TypedDictMeta,
@@ -164,11 +165,13 @@ else:
                 }
                 required_keys = set()
                 optional_keys = set()
+                readonly_keys = set()
 
                 for base in bases:
                     annotations.update(base.__dict__.get('__annotations__', {}))
                     required_keys.update(base.__dict__.get('__required_keys__', ()))
                     optional_keys.update(base.__dict__.get('__optional_keys__', ()))
+                    readonly_keys.update(base.__dict__.get('__readonly_keys__', ()))
 
                 annotations.update(own_annotations)
 
@@ -187,12 +190,30 @@ else:
                         total = False
                     else:
                         required_keys.add(field)
+                    # ReadOnly is an alias of Union here, which swallows ReadOnly[T]
+                    # in evaluated annotations. Only postponed annotations (strings)
+                    # tell that a field is read-only.
+                    if (isinstance(field_type, ForwardRef)
+                            and (field_type.__forward_arg__.startswith('ReadOnly[')
+                                 or field_type.__forward_arg__.startswith('NotRequired[ReadOnly['))):
+                        readonly_keys.add(field)
 
                 tp_dict.__annotations__ = annotations
                 tp_dict.__required_keys__ = frozenset(required_keys)
                 tp_dict.__optional_keys__ = frozenset(optional_keys)
+                tp_dict.__readonly_keys__ = frozenset(readonly_keys)
                 if not hasattr(tp_dict, '__total__'):
                     tp_dict.__total__ = total
+
+                # the descriptors of inherited fields are shared with the bases
+                fields = {}
+                for base in bases:
+                    fields.update(base.__dict__.get('__ts2python_fields__', {}))
+                for field, field_type in own_annotations.items():
+                    fields[field] = FieldDescriptor(field, field_type, tp_dict,
+                                                    field in required_keys,
+                                                    field in readonly_keys)
+                tp_dict.__ts2python_fields__ = fields
                 return tp_dict
 
             def __getitem__(self, *args, **kwargs):
@@ -279,4 +300,88 @@ else:
 
     def is_typeddict(typ) -> bool:
         return isinstance(typ, _typing_TypedDictMeta) \
-            or (typing_TDM_flag and isinstance(typ, _TypedDictMeta))
\ No newline at end of file
+            or (typing_TDM_flag and isinstance(typ, _TypedDictMeta))
+
+
+class FieldDescriptor:
+    """Describes a field of a TypedDict class. The descriptors of a
+    TypedDict are kept in its field table (see field_table()).
+    Derived TypedDicts share the descriptors of the fields they
+    inherit with their bases.
+
+    :ivar name: the name of the field
+    :ivar annotation: the annotation of the field as found in the class,
+        which may contain forward references
+    :ivar owner: the TypedDict class that defines the field
+    :ivar required: True, if the field must be present in a dictionary
+    :ivar readonly: True, if the field has been marked as ReadOnly
+    :ivar type: the resolved type of the field or None, as long as the
+        field has not been resolved
+    :ivar kind: the kind of the resolved type, e.g. 'typeddict', 'union',
+        'compound', 'typevar' or 'class', or None, as long as the field
+        has not been resolved
+    :ivar members: the resolved member types, if the field's type is a union
+    """
+    __slots__ = ('name', 'annotation', 'owner', 'required', 'readonly',
+                 'type', 'kind', 'members')
+
+    def __init__(self, name: str, annotation, owner, required: bool, readonly: bool):
+        self.name = name
+        self.annotation = annotation
+        self.owner = owner
+        self.required = required
+        self.readonly = readonly
+        self.type = None
+        self.kind = None
+        self.members = ()
+
+    def resolve(self, typ, kind: str, members: tuple = ()):
+        """Records the resolved type of the field."""
+        self.type = typ
+        self.members = members
+        self.kind = kind  # assigned last, because it marks the field as resolved
+
+    def __repr__(self):
+        return f'FieldDescriptor({self.name!r}, {self.annotation!r}, ' \
+               f'{self.owner.__qualname__}, required={self.required}, ' \
+               f'readonly={self.readonly})'
+
+
+def field_table(T) -> dict:
+    """Returns the field table of the TypedDict class T, i.e. a dictionary
+    that maps the names of the fields of T to their descriptors. TypedDicts
+    created by this module carry their field table from the start, the field
+    tables of any other TypedDicts are created on first use and cached on the
+    class. Example::
+
+        >>> class Position(TypedDict):
+        ...     line: int
+        ...     character: int
+        >>> class Mark(Position, total=False):
+        ...     label: str
+        >>> fields = field_table(Mark)
+        >>> [(name, field.required) for name, field in fields.items()]
+        [('line', True), ('character', True), ('label', False)]
+        >>> fields is field_table(Mark)
+        True
+    """
+    try:
+        return T.__dict__['__ts2python_fields__']
+    except KeyError:
+        pass
+    # the bases of TypedDicts are only known from Python 3.12 onward
+    inherited = {}
+    for base in T.__dict__.get('__orig_bases__', ()):
+        base = get_origin(base) or base
+        if base is not T and is_typeddict(base):
+            inherited.update(field_table(base))
+    required = T.__required_keys__
+    readonly = getattr(T, '__readonly_keys__', frozenset())
+    fields = {}
+    for name, annotation in T.__annotations__.items():
+        field = inherited.get(name, None)
+        if field is None or field.annotation is not annotation:
+            field = FieldDescriptor(name, annotation, T, name in required, name in readonly)
+        fields[name] = field
+    T.__ts2python_fields__ = fields
+    return fields
@@ -25,11 +25,15 @@ permissions and limitations under the License.
 #
 #######################################################################
 
+from contextlib import nullcontext
 import datetime
 import keyword
 from functools import partial, lru_cache
 import os
+import shutil
 import sys
+import tempfile
+from time import perf_counter
 from typing import Tuple, List, Union, Any, Callable, Set, Dict, Sequence, \
     Optional
 
@@ -60,12 +64,13 @@ from DHParser.parse import Grammar, PreprocessorToken, Whitespace, Drop, AnyChar
     ZeroOrMore, Forward, NegativeLookahead, Required, CombinedParser, Custom, mixin_comment, \
     last_value, matching_bracket, optional_last_value, SmartRE, RX_NEVER_MATCH
 from DHParser.pipeline import create_parser_junction, create_preprocess_junction, \
-    create_junction, PseudoJunction, full_pipeline, end_points, PipelineResult
+    create_junction, PseudoJunction, full_pipeline, run_pipeline, end_points, PipelineResult
 from DHParser.preprocess import nil_preprocessor, PreprocessorFunc, PreprocessorResult, \
-    gen_find_include_func, preprocess_includes, make_preprocessor, chain_preprocessors
+    gen_find_include_func, preprocess_includes, make_preprocessor, chain_preprocessors, \
+    gen_neutral_srcmap_func, SourceMap
 from DHParser.stringview import StringView
 from DHParser.toolkit import re, is_filename, load_if_file, cpu_count, \
-    ThreadLocalSingletonFactory, expand_table, md5, as_list, static
+    ThreadLocalSingletonFactory, expand_table, md5, as_list, static, linebreaks, line_col
 from DHParser.trace import set_tracer, resume_notices_on, trace_history
 from DHParser.transform import is_empty, remove_if, TransformationDict, TransformerFunc, \
     transformation_factory, remove_children_if, move_fringes, normalize_whitespace, \
@@ -114,8 +119,81 @@ def ts2pythonTokenizer(original_text) -> Tuple[str, List[Error]]:
 #
 # get_preprocessor = ThreadLocalSingletonFactory(preprocessor_factory)
 
+RX_COMMENT_OR_STRING = re.compile(r'("(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'|`(?:\\.|[^`\\])*`)'
+                                  r'|//[^\n]*|/\*.*?\*/', re.DOTALL)
+
+
+def strip_comments(original_text: str, original_name: str = '') -> Tuple[str, SourceMap]:
+    r"""Removes all comments from the source text and returns the stripped
+    text and a source map for mapping positions in the stripped text back
+    to positions in the original text. A comment is replaced by a line
+    break, if it spans several lines, or by a blank, if the tokens before
+    and after the comment would otherwise be joined. Example::
+
+        >>> source = 'a: /* x */ string; // y\nb:/*z*/number;'
+        >>> text, srcmap = strip_comments(source)
+        >>> text
+        'a:  string; \nb: number;'
+        >>> srcmap.srcpos(text.find('number')) == source.find('number')
+        True
+    """
+    positions, offsets = [0], [0]
+    parts = []
+    last = 0  # the end of the last comment in the original text
+    length = 0  # the length of the stripped text so far
+    for m in RX_COMMENT_OR_STRING.finditer(original_text):
+        if m.lastindex:
+            continue  # a string literal
+        start, end = m.span()
+        if original_text.find('\n', start, end) >= 0:
+            replacement = '\n'
+        elif 0 < start and end < len(original_text) \
+                and not original_text[start - 1].isspace() and not original_text[end].isspace():
+            replacement = ' '
+        else:
+            replacement = ''
+        parts.append(original_text[last:start])
+        parts.append(replacement)
+        length += start - last + len(replacement)
+        last = end
+        if positions[-1] == length:
+            offsets[-1] = end - length
+        else:
+            positions.append(length)
+            offsets.append(end - length)
+    parts.append(original_text[last:])
+    stripped = ''.join(parts)
+    positions.append(len(stripped) + 1)
+    offsets.append(offsets[-1])
+    return stripped, SourceMap(original_name, positions, offsets,
+                               [original_name] * len(positions),
+                               {original_name: original_text})
+
+
+def comments_stripped() -> bool:
+    """Returns True, if the comments are to be removed by the preprocessor,
+    which is the case if the configuration value "ts2python.StripComments"
+    is set and if the comments would be removed from the AST, anyway."""
+    return get_config_value('ts2python.StripComments', False) \
+        and not get_config_value('ts2python.KeepComments', False) \
+        and get_config_value('ts2python.DocComments', '') in ('', 'drop')
+
+
+def ts2pythonPreprocessor(original_text: str, original_name: str, *args) \
+        -> PreprocessorResult:
+    """Removes the comments from the source before parsing, if
+    comments_stripped() is True, so that the parser does not need to match
+    them. Otherwise, the source is passed on to ts2pythonTokenizer()."""
+    if comments_stripped():
+        text, srcmap = strip_comments(original_text, original_name)
+        return PreprocessorResult(original_text, text, srcmap.map, [])
+    text, errors = ts2pythonTokenizer(original_text)
+    return PreprocessorResult(original_text, text,
+                              gen_neutral_srcmap_func(original_text, original_name), errors)
+
+
 preprocessing: PseudoJunction = create_preprocess_junction(
-    ts2pythonTokenizer, RE_INCLUDE, RE_COMMENT)
+    ts2pythonPreprocessor, RE_INCLUDE, RE_COMMENT)
 
 
 #######################################################################
@@ -422,7 +500,11 @@ TS2PYTHON_CONFIG_DEFAULT = {
     'KeepComments': False,
     'DocComments': '',
     'UseExtraItems': False,
-    'GenerateAllSpecial': True
+    'GenerateAllSpecial': True,
+    'InternAnonymous': False,
+    'MinimalImports': False,
+    'GenerateSchema': False,
+    'StripComments': False
 }
 
 TS2PYTHON_QUALIFIED_CONFIG_KEYS = frozenset(
@@ -493,6 +575,36 @@ def required_python_version(ts2python_cfg: Dict[str, bool],
     return min_version
 
 
+def compatibility_settings(version_info: Tuple[int, ...] = (3, 7)) -> Dict[str, bool]:
+    """Returns the configuration values that are implied by the minimal
+    required python version, e.g.::
+
+        >>> compatibility_settings((3, 10))
+        {'ts2python.UseLiteralType': True, 'ts2python.UseTypeUnion': True, \
+'ts2python.UseExplicitTypeAlias': True}
+    """
+    settings = {}
+    if version_info >= (3, 8):
+        settings['ts2python.UseLiteralType'] = True
+    if version_info >= (3, 10):
+        settings['ts2python.UseTypeUnion'] = True
+        if version_info < (3, 12):
+            settings['ts2python.UseExplicitTypeAlias'] = True
+    if version_info >= (3, 11):
+        settings['ts2python.UseNotRequired'] = True
+        settings['ts2python.UseVariadicGenerics'] = True
+    if version_info >= (3, 12):
+        settings['ts2python.UseTypeParameters'] = True
+    if version_info >= (3, 13):
+        settings['ts2python.AllowReadOnly'] = True
+    if version_info >= (3, 14):
+        settings['ts2python.AssumeDeferredEvaluation'] = True
+        settings['ts2python.UsePostponedEvaluation'] = False
+    if version_info >= (3, 15):
+        settings['ts2python.UseExtraItems'] = True
+    return settings
+
+
 def set_compatibility_level(version_info: Tuple[int, ...] = (3, 7),
                             config_or_preset: str = "preset"):
     if config_or_preset == "preset":
@@ -503,24 +615,8 @@ def set_compatibility_level(version_info: Tuple[int, ...] = (3, 7),
     if not version_info >= (3, 7):  # TODO: Eventually change this to 3.8
         print('Compatibility version must be >= 3.8')
         sys.exit(1)
-    if version_info >= (3, 8):
-        set_value('ts2python.UseLiteralType', True, allow_new_key=True)
-    if version_info >= (3, 10):
-        set_value('ts2python.UseTypeUnion', True, allow_new_key=True)
-        if version_info < (3, 12):
-            set_value('ts2python.UseExplicitTypeAlias', True, allow_new_key=True)
-    if version_info >= (3, 11):
-        set_value('ts2python.UseNotRequired', True, allow_new_key=True)
-        set_value('ts2python.UseVariadicGenerics', True, allow_new_key=True)
-    if version_info >= (3, 12):
-        set_value('ts2python.UseTypeParameters', True, allow_new_key=True)
-    if version_info >= (3, 13):
-        set_value('ts2python.AllowReadOnly', True, allow_new_key=True)
-    if version_info >= (3, 14):
-        set_value('ts2python.AssumeDeferredEvaluation', True, allow_new_key=True)
-        set_value('ts2python.UsePostponedEvaluation', False, allow_new_key=True)
-    if version_info >= (3, 15):
-        set_value('ts2python.UseExtraItems', True, allow_new_key=True)
+    for key, value in compatibility_settings(version_info).items():
+        set_value(key, value, allow_new_key=True)
 
 
 def source_hash(source_text: str) -> str:
@@ -607,6 +703,93 @@ except ImportError:
 """
 
 
+TYPING_NAMES = ('Union', 'Optional', 'Any', 'Generic', 'TypeVar', 'Callable', 'List',
+                'Iterable', 'Iterator', 'Tuple', 'Dict', 'Awaitable')
+
+TYPEDDICT_NAMES = ('TypedDict', 'GenericTypedDict', 'NotRequired', 'Literal', 'ReadOnly',
+                   'TypeAlias')
+
+READONLY_IMPORT_311 = """try:
+    from typing import ReadOnly
+except ImportError:
+    ReadOnly = Union"""
+
+
+def import_statement(module: str, names: List[str]) -> str:
+    """Returns an import statement for the names, wrapped after about 80
+    characters, e.g.::
+
+        >>> print(import_statement('typing', ['Any', 'List']))
+        from typing import Any, List
+    """
+    lines = [f'from {module} import ']
+    for i, name in enumerate(names):
+        item = name + (', ' if i < len(names) - 1 else '')
+        if len(lines[-1]) + len(item.rstrip()) > 80:
+            lines[-1] = lines[-1].rstrip() + ' \\'
+            lines.append('    ')
+        lines[-1] += item
+    return '\n'.join(lines)
+
+
+def minimal_imports(code: str, compatibility_level: Tuple[int, int],
+                    require_singledispatch: bool = False) -> str:
+    """Returns the import statements for the generated code that only import
+    the names which the code actually uses. Below compatibility level 3.11,
+    the names that ts2python.typeddict_shim provides are imported directly
+    from the typing module by interpreters of version 3.11 and above, where
+    the shim does nothing but re-export them. Example::
+
+        >>> print(minimal_imports('class A(TypedDict):\\n    a: NotRequired[List[int]]', (3, 11)))
+        from typing import List, TypedDict, NotRequired
+    """
+    def used(names) -> List[str]:
+        return [name for name in names if re.search(r'\b' + name + r'\b', code)]
+
+    typing_names = used(TYPING_NAMES)
+    typeddict_names = used(TYPEDDICT_NAMES)
+    blocks = []
+    if (typeddict_names and compatibility_level < (3, 11)) or require_singledispatch:
+        blocks.append('import sys')
+    enums = used(('Enum', 'IntEnum'))
+    if enums:
+        blocks.append(import_statement('enum', enums))
+    read_only = 'ReadOnly' in typeddict_names
+    if compatibility_level >= (3, 11):
+        read_only_fallback = read_only and compatibility_level < (3, 13)
+        if read_only_fallback:
+            typeddict_names.remove('ReadOnly')
+            if 'Union' not in typing_names:  typing_names.insert(0, 'Union')
+        typing_names += typeddict_names + used(('Self',))
+        blocks.append(import_statement('typing', typing_names))
+        if read_only_fallback:
+            blocks.append(READONLY_IMPORT_311)
+    elif typeddict_names:
+        # the fallbacks of TYPEDDICT_IMPORTS_37 refer to Optional, Union and Any
+        fallback = ('Optional', 'Union', 'Any')
+        typing_names = [name for name in TYPING_NAMES
+                        if name in typing_names or name in fallback]
+        blocks.append(import_statement('typing', typing_names))
+        direct = [name for name in typeddict_names if name not in ('GenericTypedDict', 'ReadOnly')]
+        if 'GenericTypedDict' in typeddict_names and 'TypedDict' not in direct:
+            direct.insert(0, 'TypedDict')
+        guarded = ['if sys.version_info >= (3, 11):']
+        if direct:
+            guarded.append('    ' + import_statement('typing', direct).replace('\n', '\n    '))
+        if 'GenericTypedDict' in typeddict_names:
+            guarded.append('    GenericTypedDict = TypedDict')
+        if read_only:
+            guarded.append('    ' + READONLY_IMPORT_311.replace('\n', '\n    '))
+        guarded.append('else:')
+        guarded.append('    ' + TYPEDDICT_IMPORTS_37.strip('\n').replace('\n', '\n    '))
+        blocks.append('\n'.join(guarded))
+    elif typing_names:
+        blocks.append(import_statement('typing', typing_names))
+    if require_singledispatch:
+        blocks.append(FUNCTOOLS_IMPORTS.strip('\n'))
+    return '\n'.join(blocks)
+
+
 PROMISE_LIKE_CLASS_312 = """class PromiseLike[T]:
     def then(self, onfullfilled: Optional[Callable], onrejected: Optional[Callable]) -> Self:
         pass
@@ -692,6 +875,7 @@ def strip_type_parameters(objname: str) -> str:
 
 NOT_YET_IMPLEMENTED_WARNING = ErrorCode(310)
 UNSUPPORTED_WARNING = ErrorCode(320)
+UNRESOLVED_IMPORT_WARNING = ErrorCode(330)
 
 TYPE_NAME_SUBSTITUTION = {
     'object': 'Dict',
@@ -718,10 +902,149 @@ TYPE_NAME_SUBSTITUTION = {
     'RegExp': 'str' }
 
 
+PREDEFINED_TYPES = {
+    'Union': 'Union', 'List': 'List', 'Tuple': 'Tuple', 'Optional': 'Optional',
+    'Dict': 'Dict', 'Set': 'Set', 'Any': 'Any', 'Generic': 'Generic',
+    'Coroutine': 'Coroutine', 'list': 'list', 'tuple': 'tuple', 'dict': 'dict',
+    'set': 'set', 'frozenset': 'frozenset', 'int': 'int', 'float': 'float',
+    'str': 'str', 'None': 'None'}
+
+
+class Symbol:
+    """An entry of the symbol table: The name of a type (or of another
+    named object, e.g. a namespace), its kind, i.e. 'interface', 'type_alias',
+    'enum', 'namespace', '[]' for type parameters, etc. and its site of
+    declaration as position in the source text."""
+    __slots__ = ('name', 'kind', 'pos', 'depth')
+
+    def __init__(self, name: str, kind: str, pos: int = -1, depth: int = 0):
+        self.name = name
+        self.kind = kind
+        self.pos = pos
+        self.depth = depth  # nesting level of the scope the symbol has been defined in
+
+    def __repr__(self) -> str:
+        return f'Symbol({self.name!r}, {self.kind!r}, {self.pos}, {self.depth})'
+
+
+class SymbolTable:
+    """A symbol table with chained scopes. Besides the stack of scopes, the
+    table keeps a flattened view of all visible symbols, so that looking
+    up a name does not require walking the scopes. As has always been the
+    case with ts2python, a definition in an outer scope takes precedence
+    over a definition of the same name in an inner scope.
+
+    Example::
+
+        >>> table = SymbolTable({'str': 'str'})
+        >>> _ = table.define('Position', 'interface', 12)
+        >>> table.push_scope()
+        >>> _ = table.define('T', '[]')
+        >>> table.kind('T'), table.kind('Position'), table.kind('str')
+        ('[]', 'interface', 'str')
+        >>> _ = table.pop_scope()
+        >>> table.kind('T', 'unknown')
+        'unknown'
+        >>> table.export()['symbols']
+        {'Position': ['interface', 12]}
+    """
+
+    def __init__(self, predefined: Optional[Dict[str, str]] = None):
+        if predefined is None:  predefined = dict()
+        self.scopes: List[Dict[str, Symbol]] = [dict()]
+        self.view: Dict[str, Symbol] = dict()
+        self.predefined: Set[str] = set(predefined.keys())
+        self.typed_dicts: Set[str] = set()  # names of classes that are TypedDicts
+        self.overloaded: Set[str] = set()  # type-aliases that are also namespaces
+        self.exported: Set[str] = set()  # names marked with "export" in the source
+        for name, kind in predefined.items():
+            self.define(name, kind)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.view
+
+    @property
+    def depth(self) -> int:
+        return len(self.scopes) - 1
+
+    def push_scope(self):
+        self.scopes.append(dict())
+
+    def pop_scope(self) -> Dict[str, Symbol]:
+        assert len(self.scopes) > 1, "The global scope cannot be removed!"
+        scope = self.scopes.pop()
+        for name, symbol in scope.items():
+            if self.view.get(name, None) is symbol:
+                del self.view[name]
+        return scope
+
+    def define(self, name: str, kind: str, pos: int = -1) -> Symbol:
+        """Adds a symbol to the innermost scope, replacing any previous
+        definition of the same name in that scope."""
+        symbol = Symbol(name, kind, pos, len(self.scopes) - 1)
+        self.scopes[-1][name] = symbol
+        visible = self.view.get(name, None)
+        if visible is None or visible.depth >= symbol.depth:
+            self.view[name] = symbol
+        return symbol
+
+    def undefine(self, name: str):
+        """Removes a symbol from the innermost scope."""
+        symbol = self.scopes[-1].pop(name)
+        if self.view.get(name, None) is symbol:
+            del self.view[name]
+
+    def lookup(self, name: str) -> Optional[Symbol]:
+        return self.view.get(name, None)
+
+    def kind(self, name: str, default: str = '') -> str:
+        symbol = self.view.get(name, None)
+        return default if symbol is None else symbol.kind
+
+    def local_kind(self, name: str, default: str = '') -> str:
+        """Returns the kind of the symbol, if it has been defined in the
+        innermost scope, or the default value, otherwise."""
+        symbol = self.scopes[-1].get(name, None)
+        return default if symbol is None else symbol.kind
+
+    def export(self) -> Dict[str, Any]:
+        """Returns the global scope (without the predefined types) in a
+        JSON-serializable form that can be stored and reused by other tools."""
+        return {'symbols': {name: [symbol.kind, symbol.pos]
+                            for name, symbol in self.scopes[0].items()
+                            if name not in self.predefined},
+                'typed_dicts': sorted(self.typed_dicts),
+                'overloaded': sorted(self.overloaded),
+                'exported': sorted(self.exported)}
+
+
+# attributes of the compiler that are passed on from one chunk to the
+# next, when a source is compiled in chunks, see compile_chunked()
+CHUNK_STATE = ('symbol_table', 'base_classes', 'basic_type_aliases', 'export',
+               'interned_shapes', 'additional_imports', 'require_singledispatch',
+               'anonymous_count', 'duplicates_count', 'declared_names', 'schema',
+               'schema_members')
+
+
 class ts2pythonCompiler(Compiler):
     """Compiler for the abstract-syntax-tree of a ts2python source file.
     """
 
+    def __init__(self):
+        # maps module specifiers of import statements to the name of
+        # the generated python module and its exported symbols, see
+        # compile_project(). This is not cleared by reset()!
+        self.imported_modules: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        # if not None, compile() records the number of calls, the cumulative
+        # and the own time of the on_XXX()-handlers, see PipelineProfile
+        self.handler_stats: Optional[Dict[str, List]] = None
+        self.handler_child_time: float = 0.0
+        # if not None, the state of the compilation of the previous chunk
+        # of a source that is compiled in chunks, see compile_chunked().
+        # This is not cleared by reset()!
+        self.chunk_state: Optional[Dict[str, Any]] = None
+        super().__init__()
+
     def reset(self):
         super().reset()
         self.additional_imports = ''
@@ -765,6 +1088,12 @@ class ts2pythonCompiler(Compiler):
             'ts2python.UseExtraItems', defaults['UseExtraItems'])
         self.generate_all_special = ts2python_cfg.get(
             'ts2python.GenerateAllSpecial', defaults['GenerateAllSpecial'])
+        self.intern_anonymous = ts2python_cfg.get(
+            'ts2python.InternAnonymous', defaults['InternAnonymous'])
+        self.minimal_imports = ts2python_cfg.get(
+            'ts2python.MinimalImports', defaults['MinimalImports'])
+        self.generate_schema = ts2python_cfg.get(
+            'ts2python.GenerateSchema', defaults['GenerateSchema'])
         self.compatibility_level = required_python_version(ts2python_cfg, "compatibility")
         self.feature_level = required_python_version(ts2python_cfg, "features")
         if self.use_type_parameters and not self.use_variadic_generics:
@@ -772,16 +1101,10 @@ class ts2pythonCompiler(Compiler):
                 'Configuration flag UseTypeParameters can only be set to True '
                 'if UseVariadicGenerics is also set to True!')
 
-        self.overloaded_type_names: Set[str] = set()
-        self.known_types: List[Dict[str, str]] = [
-            {'Union': 'Union', 'List': 'List', 'Tuple': 'Tuple', 'Optional': 'Optional',
-             'Dict': 'Dict', 'Set': 'Set', 'Any': 'Any', 'Generic': 'Generic',
-             'Coroutine': 'Coroutine', 'list': 'list', 'tuple': 'tuple', 'dict': 'dict',
-             'set': 'set', 'frozenset': 'frozenset', 'int': 'int', 'float': 'float',
-             'str': 'str', 'None': 'None'}]
+        self.symbol_table = SymbolTable(PREDEFINED_TYPES)
+        self.symbol_table.typed_dicts.add('TypedDict')
         self.local_classes: List[List[str]] = [[]]
         self.base_classes: Dict[str, List[str]] = {}
-        self.typed_dicts: Set[str] = {'TypedDict'}  # names of classes that are TypedDicts
         # self.default_values: Dict = {}
         # self.referred_objects: Dict = {}
         self.basic_type_aliases: Set[str] = set()
@@ -793,70 +1116,291 @@ class ts2pythonCompiler(Compiler):
         self.strip_type_from_const = False
         self.extra_items_type = 'None'
         self.export = []
+        # structurally identical anonymous TypedDicts are rendered only
+        # once at the top level, if self.intern_anonymous is True
+        self.interned_shapes: Dict[str, str] = {}  # rendered shape -> class name
+        self.interned_classes: List[str] = []  # definitions not yet written out
+        self.declared_names: Set[str] = set()  # names the interned classes must avoid
+        self.anonymous_count = 0
+        self.duplicates_count = 0
+        # the TypedDicts, enums and type aliases in the order of their
+        # definition, if self.generate_schema is True, see schema_table()
+        self.schema: Dict[str, Tuple[tuple, Tuple[str, ...], List[str]]] = {}
+        self.schema_members: Dict[str, Any] = {}  # qualified names of enum members -> values
+        self.schema_scope: List[str] = []  # names of the enclosing namespaces
+        if self.chunk_state:
+            self.__dict__.update(self.chunk_state)
 
     def compile(self, node) -> str:
-        result = super().compile(node)
+        if self.handler_stats is None:
+            result = super().compile(node)
+        else:
+            result = self.profiled_compile(node)
         if isinstance(result, str):
             return result
         raise TypeError(f"Compilation of {node.name} yielded a result of "
                         f"type {str(type(result))} and not str as expected!")
 
+    def profiled_compile(self, node) -> Any:
+        stats = self.handler_stats.setdefault(node.name, [0, 0.0, 0.0])
+        outer_child_time = self.handler_child_time
+        self.handler_child_time = 0.0
+        start = perf_counter()
+        try:
+            return super().compile(node)
+        finally:
+            elapsed = perf_counter() - start
+            stats[0] += 1
+            stats[1] += elapsed
+            stats[2] += elapsed - self.handler_child_time
+            self.handler_child_time = outer_child_time + elapsed
+
     def is_toplevel(self) -> bool:
         return self.obj_name == ['TOPLEVEL_']
 
     def get_known_type(self, typename: str, value: str = "") -> str:
         i = typename.find('[')
         if i >= 0:  typename = typename[:i]  # for example, reduces List[str] to List
-        for type_dict in self.known_types:
-            if typename in type_dict:
-                return type_dict[typename]
-        return value
+        return self.symbol_table.kind(typename, value)
 
     def add_to_known_types(self, node, typename: str, kind: str):
-        if typename in self.known_types[-1] and not is_qualified(kind):
+        defined = self.symbol_table.local_kind(typename)
+        if defined and not is_qualified(kind):
             self.tree.new_error(
                 node, f'{node.name} {typename} has already been defined earlier as '
-                f'{self.known_types[-1][typename]}!', WARNING)
-        self.known_types[-1][typename] = kind
+                f'{defined}!', WARNING)
+        self.symbol_table.define(typename, kind, node.pos)
 
     def prepare(self, root: Node) -> None:
         type_aliases = {nd['identifier'].content for nd in root.select_children('type_alias')}
         namespaces = {nd['identifier'].content for nd in root.select_children('namespace')}
-        self.overloaded_type_names = type_aliases & namespaces
+        self.symbol_table.overloaded = type_aliases & namespaces
+        if self.intern_anonymous:
+            # names of interned classes must not collide with declarations
+            # that follow later in the source, see intern_declarations()
+            self.declared_names.update(declared_names(str(self.tree.source)))
         self.tree.stage = 'py'
         return None
 
-    def finalize(self, python_code: Any) -> Any:
-        chksum = f'source_hash__ = "{source_hash(self.tree.source)}"'
-        if self.tree.name == 'root':
-            for py_version, type_imports in TYPE_IMPORTS_MAPPING.items():
-                if self.compatibility_level >= py_version:
-                    break
-            else:
-                raise ValueError(f'Illegal minimal Python version {self.compatibility_level}')
-            c_major, c_minor = self.compatibility_level
-            # f_major, f_minor = self.feature_level
-            code_blocks = [f'# Generated by ts2python version {version} '
-                           f'on {datetime.datetime.now()}\n# compatibility level: '
-                           f'Python {c_major}.{c_minor} and above\n',
-                           # f'# feature level: Python {f_major}.{f_minor}\n',
-                           'from __future__ import annotations' if
-                           self.use_postponed_evaluation else '',
-                           GENERAL_IMPORTS] \
-                + type_imports \
-                + ([FUNCTOOLS_IMPORTS] if self.require_singledispatch else []) \
-                + [self.additional_imports, chksum, '\n##### BEGIN OF ts2python generated code\n']
+    def render_header(self, python_code: str, source_text: str) -> List[str]:
+        """Returns the blocks of the module header, i.e. the comments, the
+        import statements and the source-hash, for the python code."""
+        for py_version, type_imports in TYPE_IMPORTS_MAPPING.items():
+            if self.compatibility_level >= py_version:
+                break
+        else:
+            raise ValueError(f'Illegal minimal Python version {self.compatibility_level}')
+        c_major, c_minor = self.compatibility_level
+        # f_major, f_minor = self.feature_level
+        code_blocks = [f'# Generated by ts2python version {version} '
+                       f'on {datetime.datetime.now()}\n# compatibility level: '
+                       f'Python {c_major}.{c_minor} and above\n',
+                       # f'# feature level: Python {f_major}.{f_minor}\n',
+                       'from __future__ import annotations' if
+                       self.use_postponed_evaluation else '']
+        if self.minimal_imports:
+            code_blocks.append(minimal_imports(python_code, self.compatibility_level,
+                                               self.require_singledispatch))
         else:
-            code_blocks = []
+            code_blocks += [GENERAL_IMPORTS] + type_imports \
+                + ([FUNCTOOLS_IMPORTS] if self.require_singledispatch else [])
+        code_blocks += [self.additional_imports,
+                        f'source_hash__ = "{source_hash(source_text)}"',
+                        '\n##### BEGIN OF ts2python generated code\n']
+        return code_blocks
+
+    def render_all_special(self) -> str:
+        """Returns the __all__-list of the exported names or the empty string."""
         if self.export and self.generate_all_special:
             self.export.sort()
             exports = ['\n\n__all__ = (',
                        ",\n           ".join(self.export), 
                        ')\n\n']
-            code_blocks.append(''.join(exports))
-        code_blocks.append(python_code)
-        if self.tree.name == 'root':
-            code_blocks.append('\n##### END OF ts2python generated code\n')
+            return ''.join(exports)
+        return ''
+
+    def add_to_schema(self, name: str, entry: tuple, bases: List[str] = ()):
+        qualified = '.'.join(self.schema_scope + [name])
+        self.schema[qualified] = (entry, tuple(self.schema_scope), list(bases))
+
+    def schema_key(self, node) -> str:
+        if node.name == 'pseudo_identifier':
+            return self.on_pseudo_identifier(node)
+        return node.content + '_' if keyword.iskeyword(node.content) else node.content
+
+    def schema_literal(self, node) -> Any:
+        literal = node[0]
+        if literal.name == 'integer':
+            return int(literal.content)
+        if literal.name == 'number':
+            return float(literal.content)
+        if literal.name == 'boolean':
+            return literal.content == 'true'
+        if literal.name == 'string':
+            return literal.content[1:-1]
+        raise ValueError(f'{literal.name}-literals have no value in the schema table')
+
+    def schema_fields(self, node) -> tuple:
+        return tuple((self.schema_key(nd.get('identifier', nd.get('pseudo_identifier', None))),
+                      'optional' not in nd,
+                      self.schema_type(nd['types']) if 'types' in nd else 'Any')
+                     for nd in node.select_children('declaration'))
+
+    def schema_name(self, typename: str) -> Any:
+        if typename in ('List', 'Iterator'):
+            return ('list', 'Any')
+        if typename == 'List[int]':
+            return ('list', 'int')
+        if typename == 'Dict':
+            return ('dict', 'Any', 'Any')
+        symbol = self.symbol_table.lookup(typename)
+        if symbol is not None and (symbol.kind == '[]' or is_qualified(symbol.kind)):
+            return 'Any'  # a type parameter
+        return typename
+
+    def schema_type(self, node) -> Any:
+        """Returns the type of the schema table (see schema_table()) for
+        the type-expression ``node``, while it is being compiled, i.e.
+        while its type parameters are in scope. The names of the other
+        types are resolved by schema_table()."""
+        if node.name in ('types', 'parameter_types', 'array_types'):
+            alternatives = []
+            for nd in node.children:
+                if nd.name not in ('comment__', 'docstring__'):
+                    spec = self.schema_type(nd)
+                    for alternative in (spec[1:] if spec[:1] == ('union',) else (spec,)):
+                        if alternative not in alternatives:
+                            alternatives.append(alternative)
+            if 'Any' in alternatives:
+                return 'Any'
+            return alternatives[0] if len(alternatives) == 1 else ('union', *alternatives)
+        if node.name in ('type', 'parameter_type', 'array_type'):
+            return self.schema_type(node[1] if node[0].name == 'readonly' else node[0])
+        if node.name == 'basic_type':
+            return self.schema_name(TYPE_NAME_SUBSTITUTION[node.content])
+        if node.name == 'type_name':
+            return self.schema_name(self.on_type_name(node))
+        if node.name == 'generic_type':
+            base = self.schema_type(node['type_name'])
+            parameters = [self.schema_type(nd) for nd in node['type_parameters'].children]
+            if base == ('list', 'Any'):
+                return ('list', parameters[0])
+            if base == ('dict', 'Any', 'Any') and len(parameters) == 2:
+                return ('dict', *parameters)
+            return base
+        if node.name == 'array_of':
+            return ('list', self.schema_type(node[0]))
+        if node.name == 'type_tuple':
+            return ('tuple', *(self.schema_type(nd) for nd in node.children))
+        if node.name in ('declarations_block', 'declarations_tuple'):
+            return ('typeddict', self.schema_fields(node))
+        if node.name == 'mapped_type':
+            signature = node['map_signature']
+            index = signature['index_signature']
+            key = 'Any' if 'keyof' in index else self.schema_type(index['type'])
+            return ('dict', key, self.schema_type(signature['types']))
+        if node.name == 'literal':
+            if self.use_literal_type:
+                try:
+                    return ('literal', self.schema_literal(node))
+                except ValueError:
+                    return 'Any'
+            literal_typ = node[0].name
+            if literal_typ in ('number', 'integer'):
+                try:
+                    _ = int(node.content)
+                    return 'int'
+                except ValueError:
+                    return 'str'
+            return {'array': ('list', 'Any'), 'object': ('dict', 'Any', 'Any'),
+                    'boolean': 'bool', 'string': 'str'}[literal_typ]
+        return 'Any'  # function types, indexed types, intersections
+
+    def schema_table(self) -> Dict[str, tuple]:
+        """Returns a table of the TypedDicts, enums and type aliases that have
+        been compiled, so that runtime consumers need not reconstruct the
+        type structure from the annotations of the generated classes.
+        Definitions inside namespaces appear under their qualified names. A
+        type is encoded either as a name, i.e. the name of a builtin type or
+        of another entry of the table, or as a tuple of a kind and its
+        arguments: ``('list', T)``, ``('dict', K, V)``, ``('tuple', T, ...)``,
+        ``('union', T, ...)``, ``('literal', value, ...)`` or
+        ``('typeddict', fields)`` for anonymous interfaces. Enumeration members
+        that are used as types become literals. Fields, including the
+        inherited fields, are given as triples of name, required-flag and
+        type. For example, the entries for the interfaces::
+
+            interface Message { jsonrpc: string; }
+            interface Request extends Message { id: integer | string; params?: LSPAny[]; }
+
+        are::
+
+            'Message': ('typeddict', (('jsonrpc', True, 'str'),)),
+            'Request': ('typeddict', (('jsonrpc', True, 'str'),
+                                      ('id', True, ('union', 'int', 'str')),
+                                      ('params', False, ('list', 'LSPAny'))))
+        """
+        table: Dict[str, Optional[tuple]] = {}
+
+        def qualify(name: str, scope: Tuple[str, ...]) -> str:
+            for i in range(len(scope), 0, -1):
+                qualified = '.'.join(scope[:i] + (name,))
+                if qualified in self.schema or qualified in self.schema_members:
+                    return qualified
+            return name
+
+        def resolve(spec, scope: Tuple[str, ...]) -> Any:
+            if isinstance(spec, str):
+                name = qualify(spec, scope)
+                return ('literal', self.schema_members[name]) \
+                    if name in self.schema_members else name
+            kind, args = spec[0], spec[1:]
+            if kind in ('literal', 'enum'):
+                return spec
+            if kind == 'typeddict':
+                return (kind, tuple((key, required, resolve(typ, scope))
+                                    for key, required, typ in args[0]))
+            return (kind, *(resolve(arg, scope) for arg in args))
+
+        def add(name: str):
+            if name in table or name not in self.schema:
+                return
+            table[name] = None  # guards against cyclic inheritance
+            entry, scope, bases = self.schema[name]
+            inherited = []
+            for base in bases:
+                base_name = qualify(strip_type_parameters(base), scope)
+                add(base_name)
+                if (table.get(base_name, None) or ('',))[0] != 'typeddict':
+                    return  # not a TypedDict
+                inherited.extend(table[base_name][1])
+            entry = resolve(entry, scope)
+            if entry[0] == 'typeddict':
+                keys = {field[0] for field in entry[1]}
+                entry = ('typeddict', tuple(field for field in inherited if field[0] not in keys)
+                         + entry[1])
+            table[name] = entry
+
+        for name in self.schema:
+            add(name)
+        return {name: table[name] for name in self.schema if table[name] is not None}
+
+    def finalize(self, python_code: Any) -> Any:
+        if self.chunk_state is not None:
+            # only a chunk of a larger source has been compiled, see compile_chunked()
+            self.chunk_state = {name: getattr(self, name) for name in CHUNK_STATE}
+            code_blocks = [python_code]
+        else:
+            root = self.tree.name == 'root'
+            code_blocks = self.render_header(python_code, self.tree.source) if root else []
+            all_special = self.render_all_special()
+            if all_special:
+                code_blocks.append(all_special)
+            code_blocks.append(python_code)
+            if self.generate_schema and root:
+                code_blocks.append(render_schema_table(self.schema_table()))
+            if root:
+                code_blocks.append('\n##### END OF ts2python generated code\n')
         cooked = '\n\n'.join(code_blocks)
         cooked = re.sub(' +(?=\n)', '', cooked)
         return re.sub(r'\n\n\n+', '\n\n\n', cooked)
@@ -909,16 +1453,62 @@ class ts2pythonCompiler(Compiler):
                 'be transpiled for now.', NOT_YET_IMPLEMENTED_WARNING)
             return self.compile(node['module'][0]['document'])
         self.mark_overloaded_functions(node)
-        code = '\n\n'.join(self.compile(child) for child in node.children
-                           if child.name != 'declaration')
+        blocks = []
+        for child in node.children:
+            if child.name != 'declaration':
+                block = self.compile(child)
+                if self.interned_classes:
+                    # interned classes must be defined before their first use
+                    block = '\n'.join(self.interned_classes) + '\n\n' + block
+                    self.interned_classes = []
+                blocks.append(block)
+        code = '\n\n'.join(blocks)
         return code.replace('\n\n"""', '\n"""')
 
     def on_module(self, node) -> str:
         name = self.compile(node['identifier'])
         return self.compile(node['document'])
 
+    def import_symbol(self, name: str, local_name: str, symbols: Dict[str, Any], node):
+        kind = symbols['symbols'][name][0]
+        self.symbol_table.define(local_name, kind, node.pos)
+        if name in symbols['typed_dicts']:
+            self.symbol_table.typed_dicts.add(local_name)
+
     def on_Import(self, node) -> str:
-        return ""  # For now, ignore imports
+        specifier = node['string'].content[1:-1]
+        if specifier not in self.imported_modules:
+            return ""  # ignore imports from outside the project
+        module, symbols = self.imported_modules[specifier]
+        if 'wildcard' in node:
+            alias = node['wildcard']['alias'].content
+            for name in symbols['symbols']:
+                self.import_symbol(name, f'{alias}.{name}', symbols, node)
+            i = module.rfind('.')
+            package = module[:i] if module[:i].strip('.') else module[:i + 1]
+            name = module[i + 1:]
+            return f"from {package} import {name}" + (f" as {alias}" if alias != name else "")
+        if 'importList' not in node:
+            return ""
+        imports = []
+        for nd in node['importList'].children:
+            for sym in (nd.children if nd.name == 'symList' else (nd,)):
+                ident = sym['identifier'] if sym.name == 'symbol' else sym
+                name = ident.content
+                if name not in symbols['symbols']:
+                    self.tree.new_error(
+                        ident, f'"{name}" is not exported by "{specifier}"',
+                        UNRESOLVED_IMPORT_WARNING)
+                elif 'alias' in sym:
+                    alias = sym['alias'].content
+                    self.import_symbol(name, alias, symbols, ident)
+                    imports.append(f"{self.compile(ident)} as {alias}")
+                else:
+                    self.import_symbol(name, name, symbols, ident)
+                    imports.append(self.compile(ident))
+        if not imports:
+            return ""
+        return f"from {module} import {', '.join(imports)}"
 
     def on_symbol(self, node) -> str:
         return ""  # For the time being
@@ -998,11 +1588,11 @@ class ts2pythonCompiler(Compiler):
         self.scope_type.append('interface')
         self.local_classes.append([])
         self.optional_keys.append([])
-        if self.use_type_parameters:  self.known_types.append(dict())
+        if self.use_type_parameters:  self.symbol_table.push_scope()
         tps, preface = self.process_type_parameters(node)
         preface += '\n'
         preface += node.get_attr('preface', '')
-        if not self.use_type_parameters:  self.known_types.append(dict())
+        if not self.use_type_parameters:  self.symbol_table.push_scope()
         base_class_list = []
         try:
             base_class_list = self.bases(node['extends'])
@@ -1018,13 +1608,13 @@ class ts2pythonCompiler(Compiler):
                     and (not self.use_variadic_generics
                          or 'function' in node['declarations_block']))\
                 else ''
-        if any(bc not in self.typed_dicts for bc in base_class_list):
+        if any(bc not in self.symbol_table.typed_dicts for bc in base_class_list):
             force_base_class = ' '
         elif 'function' in node['declarations_block']:
             force_base_class = ' '  # do not derive from TypeDict
         else:
             force_base_class = ''
-            self.typed_dicts.add(name)
+            self.symbol_table.typed_dicts.add(name)
         decls_block = node['declarations_block']
         save_render_anonymous = self.render_anonymous
         if force_base_class:
@@ -1046,9 +1636,12 @@ class ts2pythonCompiler(Compiler):
             interface += (ds + '    ' + self.render_local_classes()
                           .replace('\n', '\n    ')).rstrip(' ')
         self.render_anonymous = save_render_anonymous
+        if self.generate_schema and not force_base_class:
+            self.add_to_schema(name, ('typeddict', self.schema_fields(decls_block)),
+                               base_class_list)
         self.optional_keys.pop()
         self.local_classes.pop()
-        self.known_types.pop()
+        self.symbol_table.pop_scope()
         self.add_to_known_types(node, name, 'interface')
         self.scope_type.pop()
         self.obj_name.pop()
@@ -1072,16 +1665,17 @@ class ts2pythonCompiler(Compiler):
                for typ in node.select('type')):
             self.basic_type_aliases.add(alias)
         self.obj_name.append(alias)
-        if alias not in self.overloaded_type_names:
-            if self.use_type_parameters:  self.known_types.append(dict())
+        if alias not in self.symbol_table.overloaded:
+            if self.use_type_parameters:  self.symbol_table.push_scope()
             tps, preface = self.process_type_parameters(node)
             if not self.use_type_parameters:
                 if self.use_explicit_type_alias:
                     tps = ": TypeAlias"
                 else:
                     tps = ''
-            if self.known_types[-1].get(alias, '') \
-                    in ('namespace', 'enum', 'virtual_enum'):
+            commented_out = self.symbol_table.local_kind(alias) \
+                in ('namespace', 'enum', 'virtual_enum')
+            if commented_out:
                 preface = ('# commented out, because there is already an '
                            'enumeration with the same name\n# ' + preface)
             else:
@@ -1090,16 +1684,18 @@ class ts2pythonCompiler(Compiler):
             self.optional_keys.append([])
             types = self.compile(node['types'])
             preface += self.render_local_classes()  # TODO: worry about movind docstring in front of local classes?
+            if self.generate_schema and not commented_out:
+                self.add_to_schema(alias, ('alias', self.schema_type(node['types'])))
             self.optional_keys.pop()
             self.local_classes.pop()
-            if self.use_type_parameters:  self.known_types.pop()
+            if self.use_type_parameters:  self.symbol_table.pop_scope()
             code = preface + ("type " if self.use_type_parameters else "") \
                    + f"{alias}{tps} = {types}"
             # there follows a hack to avoid failure on type unions of
             # stringified type aliases and real types
             if not self.use_type_parameters \
-                    and types[-1:] == "'" and alias in self.known_types[-1]:
-                del self.known_types[-1][alias]
+                    and types[-1:] == "'" and self.symbol_table.local_kind(alias):
+                self.symbol_table.undefine(alias)
         else:
             code = ''
         if node[-1].name in ('comment__', 'docstring__'):
@@ -1178,7 +1774,7 @@ class ts2pythonCompiler(Compiler):
                 is_constructor = True
         else:  # anonymous function
             name = "__call__"
-        if self.use_type_parameters:  self.known_types.append(dict())
+        if self.use_type_parameters:  self.symbol_table.push_scope()
         tps, preface = self.process_type_parameters(node)
         if preface and not self.is_toplevel():
             self.local_classes[-1].insert(0, preface)
@@ -1195,7 +1791,7 @@ class ts2pythonCompiler(Compiler):
             return_type = self.compile(node['types'])
         except KeyError:
             return_type = 'Any'
-        if self.use_type_parameters:  self.known_types.pop()
+        if self.use_type_parameters:  self.symbol_table.pop_scope()
         decorator = node.get_attr('decorator', '')
         fallback = ""
         type_error = "raise TypeError(f'First argument {arg1} of single-dispatch " \
@@ -1356,7 +1952,46 @@ class ts2pythonCompiler(Compiler):
         return f"ReadOnly[{result}]" if self.allow_read_only and self.readonly_decl() \
             else result
 
+    def intern_declarations(self, decls: str) -> str:
+        """Renders an anonymous TypedDict as top-level class, unless a
+        class with the very same structure has already been rendered, and
+        returns the name of the class. Returns the empty string if the
+        anonymous interface refers to type parameters or other locally
+        defined symbols and, therefore, cannot be moved to the top level."""
+        def is_local(name: str) -> bool:
+            symbol = self.symbol_table.lookup(name)
+            return symbol is not None and (symbol.depth > 0 or symbol.kind == '[]'
+                                           or is_qualified(symbol.kind))
+
+        if '[' in self.obj_name[-1] or any(is_local(name) for name in RX_IDENTIFIER.findall(decls)):
+            return ''
+        self.anonymous_count += 1
+        names = [strip_type_parameters(name) for name in self.obj_name[1:]]
+        class_name = '_'.join(names) or self.obj_name[0]
+        local_classes = self.render_local_classes()
+        header = self.render_class_header(class_name, '')
+        shape = '\n'.join([header.replace(class_name, '', 1), local_classes, decls])
+        if shape in self.interned_shapes:
+            self.duplicates_count += 1
+            return self.interned_shapes[shape]
+        base_name, n = class_name, 1
+        while class_name in self.symbol_table or class_name in self.declared_names \
+                or class_name in self.interned_shapes.values():
+            class_name = f'{base_name}_{n}'
+            n += 1
+        if class_name != base_name:
+            header = self.render_class_header(class_name, '')
+        self.interned_shapes[shape] = class_name
+        self.interned_classes.append(
+            ''.join([local_classes, header, '    ', decls.replace('\n', '\n    ')]))
+        return class_name
+
     def render_declarations(self, decls: str) -> str:
+        if self.intern_anonymous and self.base_class_name == "TypedDict" \
+                and self.render_anonymous in ("local", "toplevel"):
+            class_name = self.intern_declarations(decls)
+            if class_name:
+                return class_name
         if self.base_class_name != "TypedDict" or self.render_anonymous == "local":
             return ''.join([self.render_class_header(self.obj_name[-1], '') + "    ",
                             self.render_local_classes().replace('\n', '\n    '),
@@ -1469,9 +2104,9 @@ class ts2pythonCompiler(Compiler):
 
     def on_virtual_enum(self, node) -> str:
         name = self.compile(node['identifier'])
-        if self.known_types[-1].get(name, '') == 'type_alias':
+        if self.symbol_table.local_kind(name) == 'type_alias':
             # silently overwrite type_alias
-            self.known_types[-1][name] = 'virtual_enum'
+            self.symbol_table.define(name, 'virtual_enum', node.pos)
         else:
             self.add_to_known_types(node, name, 'virtual_enum')
         save = self.strip_type_from_const
@@ -1483,11 +2118,22 @@ class ts2pythonCompiler(Compiler):
             else:
                 header =  f'class {name}(Enum):'
             self.strip_type_from_const = True
+            if self.generate_schema:
+                members = {self.schema_key(nd['declaration']['identifier']):
+                           self.schema_literal(nd['literal'])
+                           for nd in node.select_children('const')
+                           if 'literal' in nd and nd['literal'][0].name not in ('array', 'object')}
+                self.add_to_schema(name, ('enum', tuple(members.values())))
+                self.schema_members.update(
+                    ('.'.join(self.schema_scope + [name, member]), value)
+                    for member, value in members.items())
         else:
             header = ''
         namespace = []
+        self.schema_scope.append(name)
         for child in node.children[1:]:
             namespace.append(self.compile(child).replace('\n', '\n    '))
+        self.schema_scope.pop()
         if not header:
             header = self.render_class_header(name, '')[:-1]  # leave out the trailing "\n"
             # self.optional_keys.pop()?
@@ -1507,9 +2153,10 @@ class ts2pythonCompiler(Compiler):
         self.mark_overloaded_functions(node)
         self.obj_name.append(name)
         self.scope_type.append('namespace')
+        self.schema_scope.append(name)
         self.local_classes.append([])
         self.optional_keys.append([])
-        self.known_types.append(dict())
+        self.symbol_table.push_scope()
         self.mark_overloaded_functions(node)
         declaration = self.compile(node[1])
         declaration = declaration.lstrip('\n')
@@ -1528,10 +2175,11 @@ class ts2pythonCompiler(Compiler):
                                   '\n    '.join(declarations)])
             else:
                 result = '\n    '.join(declarations)
-        self.known_types.pop()
+        self.symbol_table.pop_scope()
         self.add_to_known_types(node, name, 'namespace')
         self.local_classes.pop()
         self.optional_keys.pop()
+        self.schema_scope.pop()
         self.scope_type.pop()
         self.obj_name.pop()
         return result
@@ -1550,6 +2198,19 @@ class ts2pythonCompiler(Compiler):
         enum = ['class ' + name + base_class + ':']
         for item in node.select_children({'item', 'docstring__'}):
             enum.append(self.compile(item).replace('\n', '\n    '))
+        if self.generate_schema and self.use_enums:
+            members, last = {}, 0
+            for item in node.select_children('item'):
+                if 'literal' not in item:
+                    members[self.schema_key(item[0])] = last = last + 1  # enum.auto()
+                elif item['literal'][0].name not in ('array', 'object'):
+                    value = self.schema_literal(item['literal'])
+                    members[self.schema_key(item[0])] = value
+                    if isinstance(value, int) and not isinstance(value, bool):
+                        last = value
+            self.add_to_schema(name, ('enum', tuple(members.values())))
+            self.schema_members.update(('.'.join(self.schema_scope + [name, member]), value)
+                                       for member, value in members.items())
         return '\n    '.join(enum)
 
     def on_item(self, node) -> str:
@@ -1619,7 +2280,6 @@ class ts2pythonCompiler(Compiler):
     def on_generic_type(self, node) -> str:
         type_name = node['type_name']
         if type_name.content == 'PromiseLike' \
-                and 'PromiseLike' not in self.known_types \
                 and 'PromiseLike' not in self.obj_name:  # a hack for a special case
             interface = pick_from_path(self.path, 'interface')  # a hack for a special case
             if not interface or not interface['identifier'].content == 'PromiseLike':
@@ -1628,7 +2288,7 @@ class ts2pythonCompiler(Compiler):
                 else:
                     promiselike_def = PROMISE_LIKE_CLASS_37
                 self.local_classes[-1].append(promiselike_def)
-                self.known_types[-1]['PromiseLike']= 'PromiseLike'
+                self.symbol_table.define('PromiseLike', 'PromiseLike', node.pos)
         base_type = self.compile(type_name)
         parameters = self.compile(node['type_parameters'])
         if parameters == 'None':
@@ -1720,6 +2380,7 @@ class ts2pythonCompiler(Compiler):
         identifier = node.content
         if node.get_attr('export', False):
             self.export.append(f"'{identifier}'")
+            self.symbol_table.exported.add(identifier)
         if keyword.iskeyword(identifier):
             identifier += '_'
         return identifier
@@ -1775,30 +2436,320 @@ serializations = expand_table(dict([('*', ['sxpr'])]))
 RESULT_FILE_EXTENSION = ".py"  # Change this according to your needs!
 
 
+class StageStats:
+    """Time and memory consumed by a stage of the processing pipeline.
+    Memory is only measured if tracemalloc is tracing."""
+    __slots__ = ('calls', 'time', 'allocated', 'peak')
+
+    def __init__(self):
+        self.calls: int = 0
+        self.time: float = 0.0
+        self.allocated: int = 0
+        self.peak: int = 0
+
+
+class PipelineProfile:
+    """Collects the time (and, optionally, the memory) spent on each stage
+    of the pipeline as well as the number of calls and the cumulative and
+    own time of the compiler's on_XXX()-handlers. A profile can be passed
+    to pipeline(), compile_src() or process_file(). The results of several
+    runs accumulate::
+
+        >>> profile = PipelineProfile()
+        >>> _ = compile_src('interface Position {\\n  line: number;\\n}', profile=profile)
+        >>> list(profile.stages.keys())
+        ['preprocessing', 'parsing', 'AST', 'py']
+        >>> profile.handlers['interface'][0]
+        1
+    """
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.stages: Dict[str, StageStats] = {}
+        self.handlers: Dict[str, List] = {}  # name -> [calls, cumulative time, own time]
+
+    def measure(self, name: str, stage: Callable, *args, **kwargs) -> Any:
+        import tracemalloc
+        stats = self.stages.setdefault(name, StageStats())
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            if hasattr(tracemalloc, 'reset_peak'):
+                tracemalloc.reset_peak()
+            else:  # Python 3.8: clearing the traces resets the peak, too
+                tracemalloc.clear_traces()
+            before, _ = tracemalloc.get_traced_memory()
+        start = perf_counter()
+        try:
+            return stage(*args, **kwargs)
+        finally:
+            stats.time += perf_counter() - start
+            stats.calls += 1
+            if tracing:
+                after, peak = tracemalloc.get_traced_memory()
+                stats.allocated += after - before
+                stats.peak = max(stats.peak, peak - before)
+
+    def factory(self, name: str, factory: Callable) -> Callable:
+        """Wraps the factory of a preprocessor, parser or junction so that the
+        objects it produces report to this profile."""
+        def profiled_factory():
+            return ProfiledStage(name, factory(), self)
+        profiled_factory.__name__ = getattr(factory, '__name__', name)
+        return profiled_factory
+
+    def __enter__(self):
+        import tracemalloc
+        self.started_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if self.started_tracing:
+            tracemalloc.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        import tracemalloc
+        if self.started_tracing:
+            tracemalloc.stop()
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Returns the profile as a JSON-serializable dictionary."""
+        return {'stages': {name: {slot: getattr(stats, slot) for slot in StageStats.__slots__}
+                           for name, stats in self.stages.items()},
+                'handlers': {'on_' + name: {'calls': calls, 'cumulative': cumulative,
+                                            'own': own}
+                             for name, (calls, cumulative, own) in self.handlers.items()}}
+
+    def report(self, max_handlers: int = 20) -> str:
+        """Returns a human-readable summary of the profile."""
+        lines = [f'{"stage":<16}{"calls":>8}{"time [ms]":>12}'
+                 + (f'{"allocated [KiB]":>18}{"peak [KiB]":>14}' if self.trace_memory else '')]
+        for name, st in self.stages.items():
+            lines.append(f'{name:<16}{st.calls:>8}{st.time * 1000:>12.1f}'
+                         + (f'{st.allocated / 1024:>18.1f}{st.peak / 1024:>14.1f}'
+                            if self.trace_memory else ''))
+        if self.handlers:
+            lines.append('')
+            lines.append(f'{"handler":<32}{"calls":>8}{"cumulative [ms]":>18}{"own [ms]":>12}')
+            handlers = sorted(self.handlers.items(), key=lambda item: -item[1][2])
+            for name, (calls, cumulative, own) in handlers[:max_handlers]:
+                lines.append(f'{"on_" + name:<32}{calls:>8}{cumulative * 1000:>18.1f}'
+                             f'{own * 1000:>12.1f}')
+        return '\n'.join(lines)
+
+
+class ProfiledStage:
+    """Wraps a preprocessor, parser, transformer or compiler and reports
+    each call to a PipelineProfile. Attributes are passed through to the
+    wrapped stage."""
+
+    def __init__(self, name: str, stage: Callable, profile: PipelineProfile):
+        self.__dict__.update(name__=name, stage__=stage, profile__=profile)
+
+    def __getattr__(self, attr):
+        return getattr(self.__dict__['stage__'], attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self.stage__, attr, value)
+
+    def __call__(self, *args, **kwargs):
+        stage = self.stage__
+        if isinstance(stage, ts2pythonCompiler):
+            stage.handler_stats = self.profile__.handlers
+            stage.handler_child_time = 0.0
+            try:
+                return self.profile__.measure(self.name__, stage, *args, **kwargs)
+            finally:
+                stage.handler_stats = None
+        return self.profile__.measure(self.name__, stage, *args, **kwargs)
+
+
+AST_CACHE_FORMAT = 1
+
+
+@lru_cache(maxsize=1)
+def script_checksum() -> str:
+    """Returns the checksum of this script, which contains the grammar,
+    the AST-transformation and the compiler."""
+    try:
+        with open(__file__, 'r', encoding='utf-8') as f:
+            return md5(f.read())
+    except (FileNotFoundError, IOError):
+        return version
+
+
+def pack_tree(node: Node) -> tuple:
+    """Converts a node-tree into nested tuples of marshallable values."""
+    attributes = node._attributes if node.has_attr() else None
+    if node._children:
+        return node.name, node._pos, attributes, tuple(pack_tree(nd) for nd in node._children)
+    return node.name, node._pos, attributes, str(node._result)
+
+
+def unpack_tree(data: tuple) -> Node:
+    """Restores a node-tree from the nested tuples produced by pack_tree()."""
+    name, pos, attributes, result = data
+    if isinstance(result, str):
+        node = Node(name, result, True)
+    else:
+        node = Node(name, tuple(unpack_tree(child) for child in result))
+    node._pos = pos
+    if attributes:
+        node.attr.update(attributes)
+    return node
+
+
+def restore_tree(packed: tuple, source_text: str, source_name: str = '',
+                 source_mapping: Optional[Callable] = None) -> RootNode:
+    """Restores an abstract syntax-tree from the nested tuples produced by
+    pack_tree(). Other than the original tree, the restored tree does not
+    contain any error messages. If the positions of the tree refer to the
+    preprocessed source text, the source mapping of the preprocessor must
+    be passed."""
+    ast = RootNode(unpack_tree(packed), source_text,
+                   source_mapping or gen_neutral_srcmap_func(source_text, source_name))
+    ast.docname = source_name or 'DHParser_Document'
+    ast.stage = 'AST'
+    return ast
+
+
+class ASTCache:
+    """Stores abstract syntax-trees in a compact binary format in a
+    directory, so that the parser and the AST-transformation can be
+    skipped when compiling a source text again, for example, with a
+    different compatibility level or RenderAnonymous-setting. The key of
+    a cached AST consists of the source text, the checksum of this script
+    and the configuration values that affect the preprocessing and the
+    AST-transformation (StripComments, KeepComments and DocComments). Only
+    ASTs without errors are cached.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    def file_name(self, source_text: str) -> str:
+        key = md5(source_text, script_checksum(),
+                  repr(get_config_value('ts2python.KeepComments', False)),
+                  repr(get_config_value('ts2python.DocComments', '')),
+                  repr(comments_stripped()))
+        return os.path.join(self.directory, key + '.ast')
+
+    def load(self, source_text: str, source_name: str = '') -> Optional[RootNode]:
+        """Returns the cached AST for the source text or None."""
+        import marshal
+        try:
+            with open(self.file_name(source_text), 'rb') as f:
+                data_format, packed = marshal.load(f)
+            if data_format != AST_CACHE_FORMAT:
+                raise ValueError
+        except (OSError, ValueError, EOFError, TypeError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        source_mapping = strip_comments(source_text, source_name)[1].map \
+            if comments_stripped() else None
+        return restore_tree(packed, source_text, source_name, source_mapping)
+
+    def store(self, source_text: str, ast: RootNode):
+        """Adds the AST of the source text to the cache."""
+        import marshal
+        file_name = self.file_name(source_text)
+        temp_name = f'{file_name}.{os.getpid()}.tmp'
+        with open(temp_name, 'wb') as f:
+            marshal.dump((AST_CACHE_FORMAT, pack_tree(ast)), f)
+        os.replace(temp_name, file_name)
+
+
+def configured_ast_cache() -> Optional[ASTCache]:
+    """Returns an ASTCache for the directory configured with the
+    "ts2python_ast_cache"-preset (see the --astcache-option) or None."""
+    directory = get_config_value('ts2python_ast_cache', '')
+    return ASTCache(directory) if directory else None
+
+
 def pipeline(source: str,
              target: str = "{NAME}",
              start_parser: str = "root_parser__",
-             *, cancel_query=None) -> PipelineResult:
+             *, cancel_query=None,
+             profile: Optional[PipelineProfile] = None,
+             ast_cache: Optional[ASTCache] = None) -> PipelineResult:
     """Runs the source code through the processing pipeline. If
     the parameter target is not the empty string, only the stages required
-    for the given target will be passed.
+    for the given target will be passed. If a profile is passed, the time
+    spent on each stage will be recorded in the profile. If an AST-cache
+    is passed, parsing and AST-transformation are skipped for sources, the
+    AST of which has been cached before.
     """
     global targets
     target_set = set([target]) if target else targets
-    return full_pipeline(
-        source, preprocessing.factory, parsing.factory, junctions, target_set,
-        start_parser, cancel_query=cancel_query)
+    if profile is None and ast_cache is None:
+        return full_pipeline(
+            source, preprocessing.factory, parsing.factory, junctions, target_set,
+            start_parser, cancel_query=cancel_query)
+    if profile is None:
+        prep_factory, parser_factory, js = preprocessing.factory, parsing.factory, junctions
+    else:
+        prep_factory = profile.factory('preprocessing', preprocessing.factory)
+        parser_factory = profile.factory('parsing', parsing.factory)
+        js = {Junction(j.src, profile.factory(j.dst, j.factory), j.dst) for j in junctions}
+    with nullcontext() if profile is None else profile:
+        if ast_cache is None or 'CST' in target_set or start_parser != "root_parser__":
+            return full_pipeline(source, prep_factory, parser_factory, js, target_set,
+                                 start_parser, cancel_query=cancel_query)
+        source_text = load_if_file(source)
+        ast = ast_cache.load(source_text, source if is_filename(source) else '')
+        if ast is not None:
+            return run_pipeline(js, {'AST': ast}, target_set, cancel_query=cancel_query)
+        results = full_pipeline(source, prep_factory, parser_factory, js, target_set | {'AST'},
+                                start_parser, cancel_query=cancel_query)
+        ast, errors = results['AST']
+        if not errors and isinstance(ast, RootNode):
+            ast_cache.store(source_text, ast)
+        if 'AST' not in target_set:
+            del results['AST']
+        return results
 
 
 def compile_src(source: str,
                 target: str = "py",
                 start_parser: str = "root_parser__",
-                *, cancel_query=None) -> Tuple[Any, List[Error]]:
+                *, cancel_query=None,
+                profile: Optional[PipelineProfile] = None,
+                ast_cache: Optional[ASTCache] = None) -> Tuple[Any, List[Error]]:
     """Compiles ``source`` and returns (result, errors)."""
-    full_compilation_result = pipeline(source, target, start_parser, cancel_query=cancel_query)
+    full_compilation_result = pipeline(source, target, start_parser, cancel_query=cancel_query,
+                                       profile=profile, ast_cache=ast_cache)
     return full_compilation_result[target]
 
 
+def export_symbols() -> Dict[str, Any]:
+    r"""Returns the global symbol table of the last compilation that has
+    been run in the current thread in a JSON-serializable form, e.g.::
+
+        >>> _ = compile_src('export interface Position {\n  line: number;\n}')
+        >>> symbols = export_symbols()
+        >>> symbols['symbols'], symbols['exported']
+        ({'Position': ['interface', 0]}, ['Position'])
+    """
+    return compiling.factory().symbol_table.export()
+
+
+def interning_statistics() -> Tuple[int, int]:
+    """Returns the number of anonymous interfaces and the number of
+    duplicates among them that have been replaced by a reference to
+    a structurally identical interface during the last compilation
+    (with configuration value "ts2python.InternAnonymous" set to True)."""
+    compiler = compiling.factory()
+    return compiler.anonymous_count, compiler.duplicates_count
+
+
+def warm_up():
+    """Instantiates the grammar, the AST-transformer and the compiler for
+    the current thread by compiling a small snippet, so that the next
+    compilation does not need to pay for their set-up."""
+    compile_src('interface WarmUp {\n  warm: boolean;\n}\n')
+
+
 def serialize_result(result: Any, format = "") -> Union[str, bytes]:
     """Serialization of the compilation-result."""
     if isinstance(result, Node):
@@ -1810,48 +2761,99 @@ def serialize_result(result: Any, format = "") -> Union[str, bytes]:
         return repr(result)
 
 
+def write_errors(errors: List[Error], result_filename: str) -> str:
+    """Writes the errors to a file named after ``result_filename`` and
+    returns the name of that file, or the empty string if there were none."""
+    if errors:
+        err_ext = '_ERRORS.txt' if has_errors(errors, ERROR) else '_WARNINGS.txt'
+        err_filename = os.path.splitext(result_filename)[0] + err_ext
+        with open(err_filename, 'w') as f:
+            f.write('\n'.join(canonical_error_strings(errors)))
+        return err_filename
+    return ''
+
+
+def result_file_name(source_filename: str, out_dir: str, target: str = 'py') -> str:
+    """Returns the name of the file to which the result of compiling the
+    file "source_filename" is written, or of "out.py", if the source is not
+    a file."""
+    extension = RESULT_FILE_EXTENSION if target == 'py' else '.' + serializations['*'][0]
+    if source_filename:
+        return os.path.join(out_dir,
+            os.path.splitext(os.path.basename(source_filename))[0] + extension)
+    return os.path.join(out_dir, "out.py")
+
+
+def result_up_to_date(result_filename: str, source_text: str) -> bool:
+    """Returns True, if the file "result_filename" contains the result of
+    compiling source_text with the present version of this script."""
+    if not os.path.isfile(result_filename):
+        return False
+    with open(result_filename, 'r', encoding='utf-8') as f:
+        result = f.read()
+    m = re.search(r'source_hash__ *= *"([\w.!? ]*)"', result)
+    return bool(m) and m.groups()[-1] == source_hash(source_text)
+
+
+def write_result(result: Any, errors: List[Error], source_filename: str,
+                 result_filename: str) -> str:
+    """Writes the serialized result to "result_filename", unless any fatal
+    errors have occurred, and the errors and warnings with write_errors().
+    Returns the name of the error-messages file or an empty string. The
+    list of errors is not changed."""
+    if not has_errors(errors, FATAL):
+        if os.path.abspath(source_filename) != os.path.abspath(result_filename):
+            with open(result_filename, 'w', encoding='utf-8') as f:
+                f.write(serialize_result(result))
+        else:
+            errors = errors + [Error('Source and destination have the same name "%s"!'
+                                     % result_filename, 0, FATAL)]
+    return write_errors(errors, result_filename)
+
+
 def process_file(source: str, out_dir: str = '', target: str='py',
-                 *, cancel_query=None) -> str:
+                 *, cancel_query=None, profile: Optional[PipelineProfile] = None) -> str:
     """Compiles the source and writes the serialized results back to disk,
     unless any fatal errors have occurred. Error and Warning messages are
     written to a file with the same name as `result_filename` with an
     appended "_ERRORS.txt" or "_WARNINGS.txt" in place of the name's
     extension. Returns the name of the error-messages file or an empty
-    string if no errors of warnings occurred.
+    string if no errors of warnings occurred. If a profile is passed,
+    the source will be compiled even if the result is up-to-date. If the
+    preset "ts2python_chunk_size" is set, the source is compiled in chunks,
+    see compile_chunked().
     """
     global targets, serializations
-    extension = RESULT_FILE_EXTENSION if target == 'py' else '.' + serializations['*'][0]
+    part_size = get_config_value('ts2python_package_output', 0) if target == 'py' else 0
+    chunk_size = get_config_value('ts2python_chunk_size', 0) \
+        if target == 'py' and not part_size and profile is None else 0
 
     source_filename = source if is_filename(source) else ''
-    if source_filename:
-        result_filename = os.path.join(out_dir,
-            os.path.splitext(os.path.basename(source_filename))[0] + extension)
-    else:
-        result_filename = os.path.join(out_dir, "out.py")
-    if os.path.isfile(result_filename):
-        with open(result_filename, 'r', encoding='utf-8') as f:
-            result = f.read()
+    result_filename = result_file_name(source_filename, out_dir, target)
+    if part_size:
+        package_dir = os.path.join(out_dir, python_module_name(
+            source_filename, os.path.dirname(source_filename)) if source_filename else 'out')
+        result_filename = package_dir + RESULT_FILE_EXTENSION
+    check_filename = os.path.join(package_dir, '__init__.py') if part_size else result_filename
+    if os.path.isfile(check_filename) and profile is None:
         if source_filename == source:
             with open(source_filename, 'r', encoding='utf-8') as f:
                 source = f.read()
-        m = re.search(r'source_hash__ *= *"([\w.!? ]*)"', result)
-        if m and m.groups()[-1] == source_hash(source):
+        if result_up_to_date(check_filename, source):
             return ''  # no re-compilation necessary, because source hasn't changed
-    result, errors = compile_src(source, target, cancel_query=cancel_query)
-    if not has_errors(errors, FATAL):
-        if os.path.abspath(source_filename) != os.path.abspath(result_filename):
-            with open(result_filename, 'w', encoding='utf-8') as f:
-                f.write(serialize_result(result))
-        else:
-            errors.append(Error('Source and destination have the same name "%s"!'
-                                % result_filename, 0, FATAL))
-    if errors:
-        err_ext = '_ERRORS.txt' if has_errors(errors, ERROR) else '_WARNINGS.txt'
-        err_filename = os.path.splitext(result_filename)[0] + err_ext
-        with open(err_filename, 'w') as f:
-            f.write('\n'.join(canonical_error_strings(errors)))
-        return err_filename
-    return ''
+    if chunk_size and os.path.abspath(source_filename) != os.path.abspath(result_filename):
+        return write_errors(compile_chunked(source, result_filename, chunk_size),
+                            result_filename)
+    result, errors = compile_src(source, target, cancel_query=cancel_query, profile=profile,
+                                 ast_cache=configured_ast_cache())
+    if part_size and not has_errors(errors, FATAL):
+        try:
+            write_package(serialize_result(result), package_dir, part_size)
+            return write_errors(errors, result_filename)
+        except SyntaxError as e:
+            errors.append(Error(f'Output written as a single module, because it could '
+                                f'not be split into a package: {e}', 0, WARNING))
+    return write_result(result, errors, source_filename, result_filename)
 
 
 def _process_file(args: Tuple[str, str, Callable]) -> str:
@@ -1870,6 +2872,898 @@ def batch_process(file_names: List[str], out_dir: str,
         submit_func=submit_func, log_func=log_func, cancel_query=cancel_func)
 
 
+#######################################################################
+#
+# Schema table: the type structure of the generated code for runtime
+# consumers like ts2python.json_validation, see
+# ts2pythonCompiler.schema_table()
+#
+#######################################################################
+
+def render_schema_table(table: Dict[str, tuple]) -> str:
+    """Renders the schema table as an assignment to the module-variable
+    ``__ts2python_schema__``."""
+    entries = ',\n    '.join(f'{name!r}: {entry!r}' for name, entry in table.items())
+    return f'__ts2python_schema__ = {{\n    {entries}\n}}\n'
+
+
+#######################################################################
+#
+# Package output: generated modules split into lazily loaded submodules
+#
+#######################################################################
+
+BEGIN_OF_GENERATED_CODE = '##### BEGIN OF ts2python generated code'
+PACKAGE_PART_SIZE = 400  # default number of lines per submodule
+
+PACKAGE_LINK_FUNCTION = '''
+
+import importlib as _importlib
+
+_links = {}
+_resolved = set()
+
+
+def _link(module_globals, links):
+    """Registers the names of this package that each of the names defined in
+    a module refers to, together with the modules where they are defined."""
+    _links[module_globals['__name__']] = (module_globals, links)
+
+
+def _resolve(module_name, name):
+    """Makes sure that all forward references that can be reached from the
+    definition of the name can be resolved by importing the modules that
+    define the referred names and binding these names in the referring
+    modules."""
+    stack = [(module_name, name)]
+    while stack:
+        key = stack.pop()
+        if key in _resolved:
+            continue
+        _resolved.add(key)
+        module_globals, links = _links[key[0]]
+        for ref, part in links.get(key[1], {}).items():
+            module = _importlib.import_module('.' + part, module_globals['__package__'])
+            if ref not in module_globals:
+                module_globals[ref] = vars(module)[ref]
+            stack.append((module.__name__, ref))
+'''
+
+PACKAGE_GETATTR_FUNCTION = '''
+
+def __getattr__(name):
+    try:
+        part = _parts[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    module = _importlib.import_module('.' + part, __name__)
+    _importlib.import_module('._common', __name__)._resolve(module.__name__, name)
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_parts))
+'''
+
+
+def split_module(code: str, part_size: int = PACKAGE_PART_SIZE) -> Dict[str, str]:
+    """Splits the code of a generated module into the modules of a package
+    and returns a dictionary that maps the file names of the modules to
+    their code. The package consists of the module "_common" that contains
+    the imports, submodules "_part_NNN" with groups of consecutive
+    top-level definitions of about ``part_size`` lines each, and an
+    "__init__"-module that imports a submodule only when one of its names
+    is accessed for the first time. A schema table (see
+    ts2pythonCompiler.schema_table()) remains in the "__init__"-module.
+    Raises a SyntaxError, if the code cannot be parsed by the running
+    python version.
+
+    Names that are needed when a submodule is executed are imported from
+    the preceding submodules. Names that are only referred to by forward
+    references are bound as soon as a name that refers to them directly or
+    indirectly is accessed for the first time, so that typing.get_type_hints()
+    works just as with the original module.
+    """
+    import ast
+    lines = code.split('\n')
+    begin = next(i for i, line in enumerate(lines) if line.startswith(BEGIN_OF_GENERATED_CODE))
+    statements = [stmt for stmt in ast.parse(code).body if stmt.lineno > begin]
+    header = '\n'.join(lines[:begin]).rstrip()
+    future = '\n'.join(line for line in lines[:begin] if line.startswith('from __future__'))
+    all_special = ''
+    schema = ''
+    texts: List[str] = []
+    definitions: List[List[str]] = []  # names defined by each statement
+    runtime_refs: List[Set[str]] = []  # names evaluated when executing each statement
+    string_refs: List[Set[str]] = []  # names referred to in string literals
+    aliases: List[bool] = []  # statement is not a class or function definition
+    bases: List[Set[str]] = []  # base classes of class definitions
+    start = begin + 1
+    for stmt in statements:
+        text = '\n'.join(lines[start:stmt.end_lineno]).strip('\n')
+        start = stmt.end_lineno
+        if isinstance(stmt, ast.Assign) and getattr(stmt.targets[0], 'id', '') == '__all__':
+            all_special = '\n'.join(lines[stmt.lineno - 1:stmt.end_lineno])
+            continue
+        if isinstance(stmt, ast.Assign) \
+                and getattr(stmt.targets[0], 'id', '') == '__ts2python_schema__':
+            schema = '\n'.join(lines[stmt.lineno - 1:stmt.end_lineno])
+            continue
+        texts.append(text)
+        bases.append({nd.id for nd in getattr(stmt, 'bases', []) if isinstance(nd, ast.Name)})
+        if isinstance(stmt, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            definitions.append([stmt.name])
+            aliases.append(False)
+        elif type(stmt).__name__ == 'TypeAlias':
+            definitions.append([stmt.name.id])
+            aliases.append(True)
+        elif isinstance(stmt, ast.AnnAssign) and stmt.value is None:
+            definitions.append([])  # a mere annotation does not bind the name
+            aliases.append(True)
+        else:
+            definitions.append([nd.id for nd in ast.walk(stmt) if isinstance(nd, ast.Name)
+                                and isinstance(nd.ctx, ast.Store)])
+            aliases.append(True)
+        runtime_refs.append({nd.id for nd in ast.walk(stmt)
+                             if isinstance(nd, ast.Name) and isinstance(nd.ctx, ast.Load)})
+        string_refs.append({name for nd in ast.walk(stmt)
+                            if isinstance(nd, ast.Constant) and isinstance(nd.value, str)
+                            for name in RX_IDENTIFIER.findall(nd.value)})
+
+    # group consecutive statements, keeping overloaded functions together
+    groups: List[int] = []
+    group, size = 0, 0
+    for text in texts:
+        registers = '.register' in text.lstrip().split('\n', 1)[0]
+        if size >= part_size and not registers:
+            group += 1
+            size = 0
+        groups.append(group)
+        size += text.count('\n') + 1
+
+    def part_name(group: int) -> str:
+        return f'_part_{group + 1:03d}'
+
+    last_definition: Dict[str, int] = {}
+    for i, names in enumerate(definitions):
+        for name in names:
+            last_definition[name] = i
+
+    # names needed for executing a submodule are imported from the preceding ones
+    imports: Dict[int, Dict[int, Set[str]]] = {}  # group -> imported group -> names
+    defined_before: Dict[str, int] = {}
+    for i in range(len(texts)):
+        for name in runtime_refs[i]:
+            if name in defined_before and groups[defined_before[name]] != groups[i]:
+                imports.setdefault(groups[i], {}).setdefault(
+                    groups[defined_before[name]], set()).add(name)
+        for name in definitions[i]:
+            defined_before[name] = i
+
+    # Forward references within the values of type aliases and within the
+    # annotations inherited from base classes are evaluated in the namespace
+    # of the module that refers to the type alias or derives from the base
+    # class. Thus, names that are reachable this way must be linked, too.
+    links: Dict[int, Dict[str, Dict[str, int]]] = {}  # group -> name -> referred name -> group
+    for i in range(len(texts)):
+        refs = runtime_refs[i] | string_refs[i]
+        stack = [(name, name in bases[i]) for name in refs]
+        seen = set(stack)
+        while stack:
+            name, is_base = stack.pop()
+            j = last_definition.get(name, -1)
+            if j >= 0 and (aliases[j] or is_base):
+                for ref in runtime_refs[j] | string_refs[j]:
+                    item = (ref, is_base and ref in bases[j])
+                    if item not in seen:
+                        seen.add(item)
+                        refs.add(ref)
+                        stack.append(item)
+        targets = {ref: groups[last_definition[ref]] for ref in sorted(refs)
+                   if ref in last_definition and ref not in definitions[i]}
+        if targets:
+            for name in definitions[i]:
+                links.setdefault(groups[i], {})[name] = targets
+
+    modules = {'_common.py': header + '\n' + PACKAGE_LINK_FUNCTION}
+    for g in range(group + 1 if texts else 0):
+        blocks = [f'# Part of a package generated by ts2python version {version}']
+        if future:
+            blocks.append(future)
+        blocks.append('from ._common import *\nfrom ._common import _link')
+        blocks.extend(f'from .{part_name(d)} import ' + ', '.join(sorted(names))
+                      for d, names in sorted(imports.get(g, {}).items()))
+        blocks.append('\n\n' + '\n\n'.join(text for i, text in enumerate(texts)
+                                          if groups[i] == g))
+        table = ',\n    '.join(
+            f"'{name}': {{" + ', '.join(f"'{ref}': '{part_name(d)}'"
+                                       for ref, d in targets.items()) + '}'
+            for name, targets in sorted(links.get(g, {}).items()))
+        blocks.append(f'\n\n_link(globals(), {{\n    {table}\n}})\n' if table
+                      else '\n\n_link(globals(), {})\n')
+        modules[part_name(g) + '.py'] = '\n'.join(blocks)
+
+    parts = ',\n    '.join(f"'{name}': '{part_name(groups[i])}'"
+                            for name, i in sorted(last_definition.items()))
+    comments = [line for line in lines[:begin] if line.startswith('# ')]
+    source_hash_line = next((line for line in lines[:begin]
+                             if line.startswith('source_hash__')), '')
+    modules['__init__.py'] = '\n'.join(
+        comments + ['', source_hash_line, '', 'import importlib as _importlib', '',
+                    all_special, '', f'_parts = {{\n    {parts}\n}}', '', schema,
+                    PACKAGE_GETATTR_FUNCTION])
+    return modules
+
+
+def write_package(code: str, package_dir: str, part_size: int = PACKAGE_PART_SIZE):
+    """Splits the generated code (see split_module()) and writes the modules
+    into the directory ``package_dir``. Submodules of an earlier version of
+    the package, which are not needed any more, are removed."""
+    modules = split_module(code, part_size)
+    os.makedirs(package_dir, exist_ok=True)
+    for file_name in os.listdir(package_dir):
+        if file_name.startswith('_part_') and file_name not in modules:
+            os.remove(os.path.join(package_dir, file_name))
+    for file_name, module_code in modules.items():
+        with open(os.path.join(package_dir, file_name), 'w', encoding='utf-8') as f:
+            f.write(module_code)
+
+
+#######################################################################
+#
+# Chunked compilation: large sources compiled one group of top-level
+# declarations after the other
+#
+#######################################################################
+
+
+CHUNK_SIZE = 2000  # default number of lines per chunk
+
+RX_SOURCE_TOKEN = re.compile(r'//[^\n]*|/\*.*?\*/|\'(?:\\.|[^\'\\\n])*\'|"(?:\\.|[^"\\\n])*"'
+                             r'|`(?:\\.|[^`\\])*`|[\w$]+|\n|\S', re.DOTALL)
+RX_DECLARATION = re.compile(
+    r'(?:export\s+)?(?:declare\s+)?(?:default\s+)?(?:abstract\s+)?(?:const\s+)?'
+    r'(?:interface|type|enum|namespace|module|function|class|const|let|var)\s+'
+    r'([\w$]+|\'[^\'\n]*\'|"[^"\n]*")')
+
+
+def top_level_declarations(source: str, start: int = 0, end: int = -1) \
+        -> Optional[List[Tuple[int, str]]]:
+    r"""Returns the positions and names of the top-level declarations in
+    ``source[start:end]``. A declaration starts at the beginning of the line
+    that follows the semicolon or closing brace which ends the preceding
+    declaration, so that any comments in between belong to the declaration.
+    Statements that do not declare a name, e.g. imports, are attached to the
+    preceding declaration. Returns None, if the brackets are unbalanced.
+    Example::
+
+        >>> src = 'interface A {\n  b: B;\n}\n// comment\ntype B = string;\n'
+        >>> top_level_declarations(src)
+        [(0, 'A'), (24, 'B')]
+    """
+    if end < 0:  end = len(source)
+    declarations = []
+    depth = 0
+    terminated = True  # True, if the preceding declaration has been terminated
+    line_start = start  # the beginning of the first line after the termination or -1
+    for m in RX_SOURCE_TOKEN.finditer(source, start, end):
+        token = m.group()
+        if token == '\n':
+            if terminated and line_start < 0:
+                line_start = m.end()
+            continue
+        if token[:2] in ('//', '/*'):
+            continue
+        if terminated:
+            if line_start >= 0:
+                match = RX_DECLARATION.match(source, m.start())
+                if match or not declarations:
+                    declarations.append((line_start, match.group(1) if match else ''))
+                terminated = False
+            elif token != ';':
+                terminated = False
+        if token in ('{', '(', '['):
+            depth += 1
+        elif token in ('}', ')', ']'):
+            depth -= 1
+            if depth < 0:
+                return None
+            if depth == 0 and token == '}':
+                terminated, line_start = True, -1
+        elif token == ';' and depth == 0:
+            terminated, line_start = True, -1
+    return declarations if depth == 0 else None
+
+
+def declared_names(source: str) -> Set[str]:
+    r"""Returns the names of all declarations in the source at any depth,
+    e.g. of the members of namespaces and ambient modules, as well. Because
+    the source is not parsed, the result may contain names from comments
+    that look like declarations. Example::
+
+        >>> sorted(declared_names('interface A {\n  b: B;\n}\nnamespace N {\n  type C = A;\n}'))
+        ['A', 'C', 'N']
+    """
+    return {m.group(1) for m in RX_DECLARATION.finditer(source) if m.group(1)[:1] not in '"\''}
+
+
+def _group_declarations(source: str, start: int, end: int,
+                        declarations: List[Tuple[int, str]],
+                        chunk_size: int) -> List[Tuple[int, int]]:
+    """Groups the declarations in ``source[start:end]`` into chunks of about
+    chunk_size lines, keeping all declarations of the same name together."""
+    last = {name: i for i, (_, name) in enumerate(declarations) if name}
+    chunks = []
+    chunk_start = previous = start
+    lines = 0
+    reach = 0  # the index of the last declaration of any name declared so far
+    for i, (pos, name) in enumerate(declarations):
+        lines += source.count('\n', previous, pos)
+        previous = pos
+        if lines >= chunk_size and pos > chunk_start and reach < i:
+            chunks.append((chunk_start, pos))
+            chunk_start, lines = pos, 0
+        if name:
+            reach = max(reach, last[name])
+    chunks.append((chunk_start, end))
+    return chunks
+
+
+def split_declarations(source: str, chunk_size: int = CHUNK_SIZE) \
+        -> Optional[List[Tuple[int, int]]]:
+    r"""Splits the source at the boundaries of top-level declarations into
+    chunks of about ``chunk_size`` lines and returns the start and end
+    positions of the chunks. The body of an ambient module, e.g.
+    'declare module "vscode" {...}', is split as if its declarations were
+    top-level declarations. All declarations of the same name, e.g.
+    overloaded functions or an interface and a namespace of the same name,
+    are kept in the same chunk. Returns None, if the source cannot be split,
+    because the brackets are unbalanced or because it contains more than
+    one ambient module. Example::
+
+        >>> src = 'interface A {\n  b: B;\n}\n// comment\ntype B = string;\n'
+        >>> split_declarations(src, 2)
+        [(0, 24), (24, 52)]
+        >>> split_declarations(src + 'interface A {\n  c: number;\n}\n', 2)
+        [(0, 81)]
+    """
+    declarations = top_level_declarations(source)
+    if declarations is None:
+        return None
+    segments = [(0, len(source), declarations)]
+    modules = [i for i, (_, name) in enumerate(declarations) if name[:1] in ('"', "'")]
+    if len(modules) > 1:
+        return None
+    if modules:
+        i = modules[0]
+        pos = declarations[i][0]
+        following = declarations[i + 1][0] if i + 1 < len(declarations) else len(source)
+        body_start = body_end = following
+        for m in RX_SOURCE_TOKEN.finditer(source, pos, following):
+            token = m.group()
+            if token == '{' and body_start == following:
+                body_start = m.end()
+            elif token == '}':
+                body_end = m.start()
+        body = top_level_declarations(source, body_start, body_end)
+        if body is None:
+            return None
+        segments = [(0, pos, declarations[:i]), (body_start, body_end, body),
+                    (following, len(source), declarations[i + 1:])]
+    chunks = []
+    for start, end, segment in segments:
+        if segment:
+            chunks.extend(_group_declarations(source, start, end, segment, chunk_size))
+    return chunks
+
+
+def _compile_chunks(source: str, chunks: List[Tuple[int, int]], result_filename: str) \
+        -> Optional[List[Error]]:
+    """Compiles the chunks of the source one after the other and writes the
+    result to the file ``result_filename``. Returns the errors or None,
+    if any chunk could not be compiled without errors."""
+    compiler = compiling.factory()
+    import_names = TYPING_NAMES + TYPEDDICT_NAMES + ('Enum', 'IntEnum', 'Self')
+    used_names = set()
+    lbreaks = linebreaks(source)
+    errors = []
+    leading, trailing = 0, 0  # newlines at the beginning and the end of the body
+    # names of interned classes must not collide with the declarations in later chunks
+    compiler.chunk_state = {'declared_names': declared_names(source)}
+    try:
+        with tempfile.TemporaryFile('w+', encoding='utf-8') as body:
+            for i, (start, end) in enumerate(chunks):
+                chunk = source[start:end]
+                if chunk[-1:] != '\n':
+                    chunk += '\n'  # a chunk without line breaks would be taken for a file name
+                code, chunk_errors = compile_src(chunk)
+                if has_errors(chunk_errors, ERROR):
+                    return None
+                for e in chunk_errors:
+                    line, column = line_col(lbreaks, e.pos + start)
+                    errors.append(Error(e.message, e.pos + start, e.code, line, column,
+                                        e.length))
+                used_names.update(name for name in import_names
+                                  if name not in used_names and re.search(rf'\b{name}\b', code))
+                stripped = code.strip(' \n')
+                newlines = code[:code.find(stripped)].count('\n')
+                if i == 0:
+                    leading = newlines
+                else:
+                    body.write('\n' * min(trailing + 2 + newlines, 3))
+                trailing = code[code.rfind(stripped) + len(stripped):].count('\n')
+                body.write(stripped)
+            compiler.chunk_state = None
+            code_blocks = compiler.render_header(' '.join(sorted(used_names)), source)
+            all_special = compiler.render_all_special()
+            if all_special:
+                code_blocks.append(all_special)
+            code_blocks.append('\n' * leading + '\0' + '\n' * trailing)
+            if compiler.generate_schema:
+                code_blocks.append(render_schema_table(compiler.schema_table()))
+            code_blocks.append('\n##### END OF ts2python generated code\n')
+            cooked = '\n\n'.join(code_blocks)
+            cooked = re.sub(' +(?=\n)', '', cooked)
+            head, tail = re.sub(r'\n\n\n+', '\n\n\n', cooked).split('\0')
+            body.seek(0)
+            with open(result_filename, 'w', encoding='utf-8') as f:
+                f.write(head)
+                shutil.copyfileobj(body, f)
+                f.write(tail)
+    finally:
+        compiler.chunk_state = None
+    return errors
+
+
+def compile_chunked(source: str, result_filename: str, chunk_size: int = CHUNK_SIZE) \
+        -> List[Error]:
+    """Compiles the source in chunks of about ``chunk_size`` lines (see
+    split_declarations()) and writes the generated code to the file
+    ``result_filename``. Other than compile_src(), which keeps the syntax
+    trees of the whole source in memory, this keeps only the syntax trees
+    of one chunk at a time and streams the generated code to a temporary
+    file. The symbol table is passed on from one chunk to the next, so the
+    result is the same as that of compile_src(), apart from the placement
+    of documentation comments at the chunk boundaries, which the parser may
+    attach to the end of the preceding declaration. If the source cannot be
+    split or if a chunk cannot be compiled without errors, e.g. because a
+    construct spans several chunks, the source is compiled as a whole.
+    Returns the errors and warnings."""
+    source_text = load_if_file(source)
+    chunks = split_declarations(source_text, chunk_size)
+    if chunks is not None and len(chunks) > 1:
+        errors = _compile_chunks(source_text, chunks, result_filename)
+        if errors is not None:
+            return errors
+    result, errors = compile_src(source)
+    if not has_errors(errors, FATAL):
+        with open(result_filename, 'w', encoding='utf-8') as f:
+            f.write(serialize_result(result))
+    return errors
+
+
+#######################################################################
+#
+# Variants: one source compiled with several configurations
+#
+#######################################################################
+
+
+def variant_configuration(spec: str) -> Tuple[str, Dict[str, Any]]:
+    """Returns the name and the configuration values of an output-variant
+    that is specified by the minimal required python version and,
+    optionally, the rendering of anonymous interfaces, e.g.::
+
+        >>> name, cfg = variant_configuration('3.11/toplevel')
+        >>> name
+        'py311_toplevel'
+        >>> cfg['ts2python.UseNotRequired'], cfg['ts2python.UseTypeParameters']
+        (True, False)
+    """
+    version, _, anonymous = spec.strip().partition('/')
+    try:
+        version_info = tuple(int(part) for part in version.split('.'))
+    except ValueError:
+        raise ValueError(f'Illegal variant "{spec}": "{version}" is not a python version')
+    if not version_info >= (3, 7):
+        raise ValueError(f'Illegal variant "{spec}": Compatibility version must be >= 3.7')
+    anonymous = anonymous.strip()
+    if anonymous and anonymous not in TS2PYTHON_CONFIG_ALLOWED_VALUES['RenderAnonymous']:
+        raise ValueError(f'Illegal variant "{spec}": "{anonymous}" is not a valid value '
+                         f'for RenderAnonymous')
+    # the variant's compatibility level supersedes the configured one
+    configuration = {key: TS2PYTHON_CONFIG_DEFAULT[key[len('ts2python.'):]]
+                     for version in ((3, 10), (3, 15)) for key in compatibility_settings(version)}
+    configuration.update(compatibility_settings(version_info))
+    if anonymous:
+        configuration['ts2python.RenderAnonymous'] = anonymous
+    name = 'py' + ''.join(str(part) for part in version_info[:2]) \
+        + ('_' + anonymous if anonymous else '')
+    return name, configuration
+
+
+def _compile_variant(args: Tuple[tuple, str, str, Dict[str, Any]]) -> Tuple[Any, List[Error]]:
+    packed, source_text, source_name, configuration = args
+    saved = {key: get_config_value(key, TS2PYTHON_CONFIG_DEFAULT.get(key[len('ts2python.'):]))
+             for key in configuration}
+    try:
+        for key, value in configuration.items():
+            set_config_value(key, value, allow_new_key=True)
+        ast = restore_tree(packed, source_text, source_name)
+        return run_pipeline(junctions, {'AST': ast}, {'py'})['py']
+    finally:
+        for key, value in saved.items():
+            set_config_value(key, value, allow_new_key=True)
+
+
+def compile_variants(source: str, variants: Dict[str, Dict[str, Any]],
+                     *, submit_func: Callable = None) -> Dict[str, Tuple[Any, List[Error]]]:
+    """Compiles the source once for each of the variants, which map a name
+    to the configuration values that differ from the current configuration
+    (see variant_configuration()). The source is parsed and transformed
+    only once and the compiler runs in parallel for the variants, if
+    batch processing parallelization is configured. Returns a dictionary
+    that maps the names of the variants to the results and the errors.
+    """
+    ast, errors = pipeline(source, 'AST', ast_cache=configured_ast_cache())['AST']
+    if has_errors(errors, FATAL) or not isinstance(ast, RootNode):
+        return {name: (None, errors) for name in variants}
+    packed = pack_tree(ast)
+    source_name = source if is_filename(source) else ''
+    base = {'ts2python.' + key: get_config_value('ts2python.' + key, value)
+            for key, value in TS2PYTHON_CONFIG_DEFAULT.items()}
+    pool = None
+    if submit_func is None:
+        from DHParser.toolkit import instantiate_executor, PickMultiCoreExecutor
+        pool = instantiate_executor(
+            get_config_value('batch_processing_parallelization') and len(variants) > 1,
+            PickMultiCoreExecutor)
+        submit_func = pool.submit
+    try:
+        futures = {name: submit_func(_compile_variant,
+                                     (packed, ast.source, source_name, {**base, **configuration}))
+                   for name, configuration in variants.items()}
+        results = {}
+        for name, future in futures.items():
+            result, variant_errors = future.result()
+            results[name] = result, errors + variant_errors
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return results
+
+
+def process_variants(source: str, out_dir: str, variants: Dict[str, Dict[str, Any]],
+                     *, submit_func: Callable = None) -> List[str]:
+    """Compiles the source for each of the variants and writes the results
+    into a subdirectory of ``out_dir`` named after the variant. Returns
+    a list of error-message files."""
+    source_filename = source if is_filename(source) else ''
+    base_name = os.path.splitext(os.path.basename(source_filename))[0] \
+        if source_filename else 'out'
+    error_files = []
+    for name, (result, errors) in compile_variants(source, variants,
+                                                   submit_func=submit_func).items():
+        variant_dir = os.path.join(out_dir, name)
+        os.makedirs(variant_dir, exist_ok=True)
+        result_filename = os.path.join(variant_dir, base_name + RESULT_FILE_EXTENSION)
+        if not has_errors(errors, FATAL):
+            with open(result_filename, 'w', encoding='utf-8') as f:
+                f.write(serialize_result(result))
+        error_file = write_errors(errors, result_filename)
+        if error_file:
+            error_files.append(error_file)
+    return error_files
+
+
+#######################################################################
+#
+# Projects: multiple source files that import from each other
+#
+#######################################################################
+
+RX_IMPORT_SPECIFIER = re.compile(
+    r"""//[^\n]*|/\*.*?\*/|`(?:\\.|[^`\\])*`"""
+    r"""|\bimport\s+(?:[\w*{},\s]*?\s+from\s+)?(["'])([^"'\n]*)\1"""
+    r"""|"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*'""", re.DOTALL)
+
+TS_SOURCE_EXTENSIONS = ('.d.ts', '.ts')
+
+SYMBOLS_CACHE_DIR = '.ts2python'
+
+
+def scan_imports(source: str) -> List[str]:
+    """Returns the module specifiers of all import statements in the
+    source text, skipping comments and string literals, e.g.::
+
+        >>> scan_imports('import {A} from "./a";  // import {B} from "./b"')
+        ['./a']
+    """
+    return [m.group(2) for m in RX_IMPORT_SPECIFIER.finditer(source) if m.group(2)]
+
+
+def resolve_import(specifier: str, importing_file: str) -> str:
+    """Returns the path of the source file that the relative module
+    specifier refers to, or the empty string, if it cannot be found or
+    refers to an external package."""
+    if not specifier.startswith('.'):
+        return ''
+    base = os.path.normpath(os.path.join(os.path.dirname(importing_file), specifier))
+    stem, ext = os.path.splitext(base)
+    candidates = [base] if base.endswith('.ts') else []
+    if ext in ('.js', '.mjs', '.cjs'):
+        candidates.extend(stem + ext for ext in TS_SOURCE_EXTENSIONS)
+    candidates.extend(base + ext for ext in TS_SOURCE_EXTENSIONS)
+    candidates.extend(os.path.join(base, 'index' + ext) for ext in TS_SOURCE_EXTENSIONS)
+    for candidate in candidates:
+        if os.path.isfile(candidate):
+            return candidate
+    return ''
+
+
+def python_module_name(file_name: str, root_dir: str) -> str:
+    """Returns the dotted name of the python module that is generated
+    from the source file relative to the project's root directory."""
+    parts = os.path.relpath(file_name, root_dir).split(os.sep)
+    for ext in TS_SOURCE_EXTENSIONS:
+        if parts[-1].endswith(ext):
+            parts[-1] = parts[-1][:-len(ext)]
+            break
+    for i, part in enumerate(parts):
+        part = re.sub(r'\W', '_', part)
+        if part[:1].isdigit():  part = '_' + part
+        if keyword.iskeyword(part):  part += '_'
+        parts[i] = part
+    return '.'.join(parts)
+
+
+def relative_module(from_module: str, to_module: str) -> str:
+    """Returns the name of ``to_module`` relative to ``from_module``, e.g.::
+
+        >>> relative_module('api.window', 'api.types')
+        '.types'
+        >>> relative_module('api.window', 'base')
+        '..base'
+    """
+    from_package = from_module.split('.')[:-1]
+    to_parts = to_module.split('.')
+    common = 0
+    while common < min(len(from_package), len(to_parts) - 1) \
+            and from_package[common] == to_parts[common]:
+        common += 1
+    return '.' * (len(from_package) - common + 1) + '.'.join(to_parts[common:])
+
+
+def module_graph(file_names: List[str]) -> Dict[str, Dict[str, str]]:
+    """Maps each of the given source files to a dictionary of the module
+    specifiers of its imports and the files among ``file_names`` they
+    refer to. Imports from outside the project are left out."""
+    project = set(file_names)
+    graph = {}
+    for file_name in file_names:
+        with open(file_name, 'r', encoding='utf-8') as f:
+            source = f.read()
+        dependencies = {}
+        for specifier in scan_imports(source):
+            dependency = resolve_import(specifier, file_name)
+            if dependency in project and dependency != file_name:
+                dependencies[specifier] = dependency
+        graph[file_name] = dependencies
+    return graph
+
+
+def collect_sources(paths: List[str], recursive: bool = False) -> List[str]:
+    """Returns the files in ``paths`` and the TypeScript-files in the
+    directories in ``paths`` (and their subdirectories, if ``recursive``
+    is True)."""
+    file_names = []
+    for name in paths:
+        if os.path.isdir(name):
+            if recursive:
+                for path, dirs, files in os.walk(name):
+                    dirs[:] = sorted(d for d in dirs if d != 'node_modules')
+                    file_names.extend(os.path.join(path, fn) for fn in sorted(files)
+                                      if fn.endswith('.ts'))
+            else:
+                file_names.extend(os.path.join(name, fn) for fn in sorted(os.listdir(name))
+                                  if fn.endswith('.ts'))
+        else:
+            file_names.append(name)
+    return file_names
+
+
+def compile_module(source_filename: str, out_dir: str, module: str,
+                   imports: Dict[str, Tuple[str, Dict[str, Any]]],
+                   cancel_query=None) -> Tuple[str, Dict[str, Any]]:
+    """Compiles a single module of a project. ``imports`` maps the module
+    specifiers of the import statements to the (relative) name of the
+    imported python module and its exported symbols. Returns the name of
+    the error-messages file (or the empty string) and the symbols that the
+    module exports. Exported symbols are cached in the SYMBOLS_CACHE_DIR
+    subdirectory of ``out_dir``, so that neither the module nor its
+    dependents need to be compiled again, as long as neither the
+    module's source nor the symbols it imports have changed.
+    """
+    import json
+    result_filename = os.path.join(out_dir, *module.split('.')) + RESULT_FILE_EXTENSION
+    cache_filename = os.path.join(out_dir, SYMBOLS_CACHE_DIR, module + '.json')
+    with open(source_filename, 'r', encoding='utf-8') as f:
+        source = f.read()
+    key = md5(source_hash(source), json.dumps(imports, sort_keys=True))
+    try:
+        with open(cache_filename, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached['key'] == key and os.path.isfile(result_filename):
+            return '', cached['symbols']
+    except (OSError, ValueError, KeyError):
+        pass
+    compiler = compiling.factory()
+    compiler.imported_modules = imports
+    try:
+        result, errors = compile_src(source, cancel_query=cancel_query,
+                                     ast_cache=configured_ast_cache())
+        symbols = export_symbols()
+    finally:
+        compiler.imported_modules = {}
+    if not has_errors(errors, FATAL):
+        with open(result_filename, 'w', encoding='utf-8') as f:
+            f.write(serialize_result(result))
+        with open(cache_filename, 'w', encoding='utf-8') as f:
+            json.dump({'key': key, 'symbols': symbols}, f)
+    return write_errors(errors, result_filename), symbols
+
+
+def _compile_module(args: Tuple[str, str, str, Dict, Callable]) -> Tuple[str, Dict[str, Any]]:
+    return compile_module(*args[:4], cancel_query=args[4])
+
+
+def compile_project(file_names: List[str], out_dir: str,
+                    *, submit_func: Callable = None,
+                    log_func: Callable = None,
+                    cancel_func: Callable = never_cancel) -> List[str]:
+    """Compiles the source files of a project, the modules of which import
+    from each other, to a python-package in ``out_dir``. Modules are
+    compiled in the order of their dependencies, so that the symbols
+    exported by a module are known when compiling the modules that import
+    it. Modules that do not depend on each other are compiled in parallel.
+    Import statements are translated to relative imports between the
+    generated modules. Returns a list of error-message files.
+    """
+    from concurrent.futures import wait, FIRST_COMPLETED
+    from DHParser.toolkit import instantiate_executor, PickMultiCoreExecutor
+    file_names = [os.path.abspath(fn) for fn in file_names]
+    if not file_names:
+        return []
+    graph = module_graph(file_names)
+    root_dir = os.path.commonpath([os.path.dirname(fn) for fn in file_names])
+    modules = {fn: python_module_name(fn, root_dir) for fn in file_names}
+    for module in modules.values():
+        package_dir = out_dir
+        for part in module.split('.')[:-1]:
+            package_dir = os.path.join(package_dir, part)
+            os.makedirs(package_dir, exist_ok=True)
+            init_file = os.path.join(package_dir, '__init__.py')
+            if not os.path.exists(init_file):
+                open(init_file, 'w').close()
+    os.makedirs(os.path.join(out_dir, SYMBOLS_CACHE_DIR), exist_ok=True)
+    if not os.path.exists(os.path.join(out_dir, '__init__.py')):
+        open(os.path.join(out_dir, '__init__.py'), 'w').close()
+
+    pool = None
+    if submit_func is None:
+        pool = instantiate_executor(get_config_value('batch_processing_parallelization'),
+                                    PickMultiCoreExecutor)
+        submit_func = pool.submit
+    pending = {fn: set(graph[fn].values()) for fn in file_names}
+    symbols: Dict[str, Dict[str, Any]] = {}
+    running = {}
+    error_files = []
+    try:
+        while (pending or running) and not cancel_func():
+            ready = [fn for fn, deps in pending.items() if deps <= symbols.keys()]
+            if not ready and not running:
+                # cyclic imports: compile the module with the fewest unresolved
+                # imports first, leaving the remaining references unresolved
+                fn = min(pending, key=lambda fn: (len(pending[fn] - symbols.keys()), fn))
+                if log_func:
+                    log_func(f'Cyclic imports in "{os.path.basename(fn)}": '
+                             + ', '.join(os.path.basename(dep)
+                                         for dep in sorted(pending[fn] - symbols.keys())))
+                ready = [fn]
+            for fn in ready:
+                del pending[fn]
+                imports = {specifier: (relative_module(modules[fn], modules[dep]), symbols[dep])
+                           for specifier, dep in graph[fn].items() if dep in symbols}
+                future = submit_func(_compile_module,
+                                     (fn, out_dir, modules[fn], imports, cancel_func))
+                running[future] = fn
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                fn = running.pop(future)
+                error_filename, symbols[fn] = future.result()
+                if log_func:
+                    suffix = (" with " + error_filename[error_filename.rfind('_') + 1:-4]) \
+                        if error_filename else ""
+                    log_func(f'Compiled "{os.path.basename(fn)}"' + suffix)
+                if error_filename:
+                    error_files.append(error_filename)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return error_files
+
+
+def watch(paths: List[str], out_dir: str,
+          *, project: bool = False,
+          interval: float = 0.5,
+          debounce: float = 0.25,
+          log_func: Callable = print,
+          cancel_func: Callable = never_cancel):
+    """Compiles the source files in ``paths`` (or in the directories in
+    ``paths``) and then polls them every ``interval`` seconds for changes.
+    Changed files are recompiled, as soon as there have not been any further
+    changes for ``debounce`` seconds. In project mode, modules that import
+    from changed files are recompiled as well. Compilation runs in the
+    current process, so that grammar and compiler stay warm. Returns when
+    ``cancel_func`` returns True or on a KeyboardInterrupt.
+    """
+    import time
+    from DHParser.toolkit import SingleThreadExecutor
+    executor = SingleThreadExecutor()
+
+    def snapshot() -> Dict[str, int]:
+        stamps = {}
+        for file_name in collect_sources(paths, recursive=project):
+            try:
+                stamps[file_name] = os.stat(file_name).st_mtime_ns
+            except OSError:
+                pass  # file has been deleted in the meantime
+        return stamps
+
+    def rebuild(file_names: List[str], detected: float, what: str = 'Rebuilt'):
+        start = perf_counter()
+        if project:
+            error_files = compile_project(sorted(stamps), out_dir, submit_func=executor.submit,
+                                          cancel_func=cancel_func)
+        else:
+            error_files = [error_file for error_file in
+                           (process_file(file_name, out_dir, cancel_query=cancel_func)
+                            for file_name in file_names) if error_file]
+        end = perf_counter()
+        if what == 'Rebuilt':
+            log_func(f'Rebuilt {len(file_names)} changed file(s) in {(end - start) * 1000:.0f} '
+                     f'ms ({(end - detected) * 1000:.0f} ms after the change was detected)')
+        else:
+            log_func(f'{what} {len(file_names)} file(s) in {(end - start) * 1000:.0f} ms')
+        for error_file in error_files:
+            log_func('  see: ' + error_file)
+
+    stamps = snapshot()
+    rebuild(sorted(stamps), perf_counter(), 'Compiled')
+    try:
+        while not cancel_func():
+            time.sleep(interval)
+            current = snapshot()
+            if current == stamps:
+                continue
+            detected = perf_counter()
+            while True:  # wait until a burst of changes has come to an end
+                time.sleep(debounce)
+                settled = snapshot()
+                if settled == current:
+                    break
+                current = settled
+            changed = [file_name for file_name, stamp in current.items()
+                       if stamps.get(file_name) != stamp]
+            stamps = current
+            if changed:
+                rebuild(changed, detected)
+    except KeyboardInterrupt:
+        pass
+
+
 INSPECT_TEMPLATE = """<h2>{testname}</h2>
 <h3>Test source</h3>
 <div style="background-color: cornsilk;">
@@ -1924,6 +3818,19 @@ def inspect(test_file_path: str):
     webbrowser.open('file://' + destpath if sys.platform == "darwin" else destpath)
 
 
+#######################################################################
+#
+# Grammar snapshot
+#
+#######################################################################
+
+
+# The snapshot is checked by ts2pythonServer before it imports this module,
+# which must not be imported before a stale parser-script has been rewritten.
+from ts2python.grammar_stamp import grammar_stamp_path, grammar_checksum, \
+    grammar_verified, record_grammar_snapshot
+
+
 def main(called_from_app=False):
     global targets, test_targets, serializations, junctions
     # recompile grammar if needed
@@ -1942,7 +3849,9 @@ def main(called_from_app=False):
         print('recompiling ' + grammar_path)
 
     if os.path.exists(grammar_path) and os.path.isfile(grammar_path):
-        if not recompile_grammar(grammar_path, script_path, force=False, notify=notify):
+        if grammar_verified(grammar_path, script_path):
+            pass
+        elif not recompile_grammar(grammar_path, script_path, force=False, notify=notify):
             error_file = base_path + '_ebnf_ERRORS.txt'
             with open(error_file, encoding="utf-8") as f:
                 print(f.read())
@@ -1951,6 +3860,8 @@ def main(called_from_app=False):
             print(os.path.basename(__file__) + ' has changed. '
                   'Please run again in order to apply updated compiler')
             sys.exit(0)
+        else:
+            record_grammar_snapshot(grammar_path, script_path)
     else:
         print('Could not check whether grammar requires recompiling, '
               'because grammar was not found at: ' + grammar_path)
@@ -1960,10 +3871,35 @@ def main(called_from_app=False):
     parser.add_argument('files', nargs='*' if called_from_app else '+')
     parser.add_argument('-D', '--debug', action='store_const', const='debug',
                         help='Write debug information to LOGS subdirectory')
-    parser.add_argument('-o', '--out', nargs=1, default=['ts2python_output'],
+    parser.add_argument('-o', '--out', nargs=1, default=None,
                         help='Output directory for batch processing')
     parser.add_argument('-v', '--verbose', action='store_const', const='verbose',
                         help='Verbose output')
+    parser.add_argument('--project', action='store_const', const='project',
+                        help='Compile the files (or all files in the given directories) as '
+                             'one project, the modules of which import from each other')
+    parser.add_argument('--watch', action='store_const', const='watch',
+                        help='Watch the files (or directories) and recompile files '
+                             'as soon as they have been changed')
+    parser.add_argument('--variants', nargs=1, metavar='VERSION[/ANONYMOUS],...',
+                        help='Parse each file only once and write one output for each of '
+                             'the comma-separated variants, e.g. "3.8,3.11/toplevel,3.13", '
+                             'into a subdirectory of the output directory')
+    parser.add_argument('--package', nargs='?', const=PACKAGE_PART_SIZE, type=int,
+                        metavar='LINES',
+                        help='Write a package for each file, the submodules of which are '
+                             'loaded only when needed, with about LINES lines per submodule '
+                             f'(default: {PACKAGE_PART_SIZE})')
+    parser.add_argument('--chunked', nargs='?', const=CHUNK_SIZE, type=int, metavar='LINES',
+                        help='Parse and compile large files in chunks of about LINES lines '
+                             'of top-level declarations to save memory '
+                             f'(default: {CHUNK_SIZE})')
+    parser.add_argument('--astcache', nargs=1, metavar='DIR',
+                        help='Cache the abstract syntax-trees of the sources in DIR, so that '
+                             'unchanged sources need not be parsed again')
+    parser.add_argument('--profile', nargs='?', const='time', choices=['time', 'memory'],
+                        help='Report the time (and memory, if "memory" is given) '
+                             'spent on each processing stage and compiler method')
     parser.add_argument('--singlethread', action='store_const', const='singlethread',
                         help='Run batch jobs in a single thread (recommended only for debugging)')
     parser.add_argument('-c', '--compatibility', nargs=1, action='extend', type=str,
@@ -1971,6 +3907,19 @@ def main(called_from_app=False):
     parser.add_argument('-a', '--anonymous', nargs=1, action='extend', type=str,
                         help='How to render anonymous interfaces: "local" (default), '
                              '"toplevel", "functional", "type"')
+    parser.add_argument('-i', '--intern', action='store_const', const='intern',
+                        help='Render structurally identical anonymous interfaces only '
+                             'once as top-level classes')
+    parser.add_argument('--minimalimports', action='store_const', const='minimalimports',
+                        help='Import only the names that the generated code uses '
+                             'to reduce its import time')
+    parser.add_argument('--schema', action='store_const', const='schema',
+                        help='Add a table of the generated types to the module for '
+                             'runtime consumers like ts2python.json_validation')
+    parser.add_argument('--stripcomments', action='store_const', const='stripcomments',
+                        help='Remove comments before parsing, so that they do not appear in '
+                             'the generated code. Has no effect with --comments or with '
+                             '--doccomments keep/docstrings')
     parser.add_argument('-d', '--doccomments', nargs=1, action='extend', type=str,
                         choices=['keep', 'drop', 'docstrings'],
                         help='How to handle documentation comments: "keep", "drop", "docstrings"')
@@ -1987,7 +3936,8 @@ def main(called_from_app=False):
                              '%s; default: %s' % (', '.join(test_targets), ', '.join(targets)))
 
     args = parser.parse_args()
-    file_names, out, log_dir = args.files, args.out[0], ''
+    file_names, log_dir = args.files, ''
+    out = 'ts2python_output' if args.out is None else args.out[0]
 
     read_local_config(os.path.join(scriptpath, 'ts2pythonConfig.ini'))
     ts2python_cfg = get_config_values('ts2python.*')
@@ -2015,8 +3965,17 @@ def main(called_from_app=False):
         targets = chosen
 
     if args.debug or args.compatibility or args.peps or args.anonymous \
-            or args.comments or args.doccomments:
+            or args.comments or args.doccomments or args.astcache or args.intern \
+            or args.package or args.minimalimports or args.schema or args.chunked \
+            or args.stripcomments:
         access_presets()
+        if args.package:
+            set_preset_value('ts2python_package_output', args.package, allow_new_key=True)
+        if args.chunked:
+            set_preset_value('ts2python_chunk_size', args.chunked, allow_new_key=True)
+        if args.astcache:
+            set_preset_value('ts2python_ast_cache', os.path.abspath(args.astcache[0]),
+                             allow_new_key=True)
         if args.debug is not None:
             log_dir = 'LOGS'
             set_preset_value('history_tracking', True)
@@ -2062,7 +4021,18 @@ def main(called_from_app=False):
                 if pep == '728':  set_preset_value('ts2python.UseExtraItems', **kwargs)
                 if pep in ('649', '749'):  set_preset_value('ts2python.AssumeDeferredEvaluation', **kwargs)
         if args.comments: set_preset_value('ts2python.KeepComments', True, allow_new_key=True)
+        if args.intern: set_preset_value('ts2python.InternAnonymous', True, allow_new_key=True)
+        if args.minimalimports:
+            set_preset_value('ts2python.MinimalImports', True, allow_new_key=True)
+        if args.schema:  set_preset_value('ts2python.GenerateSchema', True, allow_new_key=True)
+        if args.stripcomments:
+            set_preset_value('ts2python.StripComments', True, allow_new_key=True)
+            if not args.comments:
+                set_preset_value('ts2python.KeepComments', False, allow_new_key=True)
         finalize_presets()
+        if args.stripcomments and not comments_stripped():
+            print('Warning: --stripcomments has no effect, because comments are kept '
+                  'by --comments or --doccomments!')
         # _ = get_config_values('ts2python.*')  # fill config value cache
 
     start_logging(log_dir)
@@ -2076,14 +4046,53 @@ def main(called_from_app=False):
 
     if called_from_app and not file_names:  return False
 
+    profile = PipelineProfile(trace_memory=args.profile == 'memory') if args.profile else None
+
     batch_processing = True
-    if len(file_names) == 1:
+    if args.variants:
+        try:
+            variants = dict(variant_configuration(spec)
+                            for spec in args.variants[0].split(','))
+        except ValueError as e:
+            print(e)
+            sys.exit(1)
+        file_names = collect_sources(file_names)
+        if not os.path.exists(out):
+            os.mkdir(out)
+        error_files = []
+        from DHParser.toolkit import instantiate_executor, PickMultiCoreExecutor
+        with instantiate_executor(get_config_value('batch_processing_parallelization'),
+                                  PickMultiCoreExecutor) as pool:
+            for file_name in file_names:
+                echo(f'Compiling {len(variants)} variants of: ' + file_name)
+                error_files.extend(process_variants(file_name, out, variants,
+                                                    submit_func=pool.submit))
+        if error_files:
+            print("There have been errors or warnings! Please check files:")
+            print('\n'.join(error_files))
+            if any(f.endswith('_ERRORS.txt') for f in error_files):
+                sys.exit(1)
+        return
+    elif args.watch:
+        out_dir = out if len(file_names) > 1 or os.path.isdir(file_names[0]) \
+            or args.out is not None else '.'
+        if not os.path.exists(out_dir):
+            os.mkdir(out_dir)
+        echo('Watching for changes. Press Ctrl-C to stop.')
+        watch(file_names, out_dir, project=bool(args.project))
+        return
+    elif args.project:
+        for name in file_names:
+            if os.path.isdir(name):
+                echo('Collecting all source files in directory: ' + name)
+        file_names = collect_sources(file_names, recursive=True)
+    elif len(file_names) == 1:
         if os.path.isdir(file_names[0]):
             dir_name = file_names[0]
             echo('Processing all files in directory: ' + dir_name)
             file_names = [os.path.join(dir_name, fn) for fn in os.listdir(dir_name)
                           if os.path.isfile(os.path.join(dir_name, fn))]
-        elif not ('-o' in sys.argv or '--out' in sys.argv):
+        elif args.out is None:
             batch_processing = False
 
     if batch_processing:
@@ -2092,7 +4101,22 @@ def main(called_from_app=False):
         elif not os.path.isdir(out):
             print('Output directory "%s" exists and is not a directory!' % out)
             sys.exit(1)
-        error_files = batch_process(file_names, out, log_func=print if args.verbose else None)
+        if args.project:
+            if profile is not None:
+                print('Profiling is not supported in project mode!')
+                profile = None
+            error_files = compile_project(file_names, out,
+                                          log_func=print if args.verbose else None)
+        elif profile is not None:
+            # profile in the main process, compiling one file after the other
+            error_files = [error_file for error_file in
+                           (process_file(file_name, out, profile=profile)
+                            for file_name in file_names) if error_file]
+        else:
+            error_files = batch_process(file_names, out,
+                                        log_func=print if args.verbose else None)
+        if profile is not None:
+            print(profile.report())
         if error_files:
             category = "ERRORS" if any(f.endswith('_ERRORS.txt') for f in error_files) \
                 else "warnings"
@@ -2107,12 +4131,22 @@ def main(called_from_app=False):
     else:
         assert file_names[0].lower().endswith('.ts')
         if len(targets) == 1:
-            error_file = process_file(file_names[0], '.', target=next(iter(targets)))
+            error_file = process_file(file_names[0], '.', target=next(iter(targets)),
+                                      profile=profile)
         else:
-            error_file = process_file(file_names[0], '.')
+            error_file = process_file(file_names[0], '.', profile=profile)
         if error_file:
             with open(error_file, 'r', encoding='utf-8') as f:
                 print(f.read())
+        if profile is not None:
+            print(profile.report())
+
+
+if os.environ.get('TS2PYTHON_WARM_UP_ON_IMPORT', ''):
+    # set by ts2pythonServer.start_forkserver(), so that the worker processes
+    # inherit the grammar, the transformer and the compiler from the forkserver
+    warm_up()
+
 
 if __name__ == "__main__":
     main()
@@ -5,8 +5,15 @@
 """
 
 import asyncio
+from collections import OrderedDict
+from concurrent import futures
+from concurrent.futures import Executor
+from functools import partial
 import os
 import sys
+import threading
+import time
+from typing import Callable, Optional
 
 VERBOSE = False
 
@@ -22,6 +29,7 @@ except NameError:
 
 STOP_SERVER_REQUEST_BYTES = b"__STOP_SERVER__"   # hardcoded in order to avoid import from DHParser.server
 IDENTIFY_REQUEST = "identify()"
+COMPILE_FILE_REQUEST = "--compile-file "  # followed by a json-object with "source" and "out_dir"
 LOGGING_REQUEST = 'logging("")'
 LOG_PATH = 'LOGS/'
 
@@ -32,6 +40,18 @@ ALTERNATIVE_PORTS = [8888, 8889, 8898, 8980, 8988, 8989]
 DATA_RECEIVE_LIMIT = 262144
 SERVER_REPLY_TIMEOUT = 20
 
+RESULT_CACHE_SIZE = 64 * 1024 * 1024  # upper limit of the memory used for cached results
+WORKER_POOL_SIZE = 0  # number of worker processes, 0 means one per CPU
+WORKER_RECYCLE_TASKS = 256  # tasks per worker after which the pool is recycled, 0 means never
+MAX_PENDING_COMPILES = 64  # admitted, but unfinished compile requests, 0 means no limit
+MAX_PENDING_BATCH_JOBS = 4  # admitted, but unfinished batch jobs, 0 means no limit
+BATCH_SIZE = 8  # maximum number of small sources compiled in one worker task, 1 means no batching
+BATCH_SOURCE_LIMIT = 4096  # sources up to this size (in characters) are batched
+SERVER_BUSY = -32010  # error code of requests that are rejected, because the server is busy
+BUSY_RETRY_DELAYS = (0.05, 0.2, 1.0)  # delays of a client before it resends a rejected request
+WARM_UP_ON_IMPORT = 'TS2PYTHON_WARM_UP_ON_IMPORT'  # environment variable, see start_forkserver()
+PING_DELAY = 0.005  # seconds before a ping is resent, because another worker has answered it
+
 KNOWN_HOST = ''  # if host and port are retrieved from a config file, their
 KNOWN_PORT = -2  # values are stored to these global variables
 
@@ -146,6 +166,455 @@ def json_rpc(func_name, params={}, ID=None) -> dict:
     return {"jsonrpc": "2.0", "method": func_name, "params": params, "id": ID}
 
 
+class ResultCache:
+    """A memory-bounded LRU-cache of the results of compiling source texts,
+    i.e. of the (result, errors)-tuples returned by compile_src(). The key
+    of a result consists of the source text, the checksum of
+    ts2pythonParser.py and the configuration, the same data from which the
+    "source_hash__" of the generated code is computed, plus the target.
+    The size of a result is estimated from the length of the generated code
+    and the error messages. When the sizes of all results exceed
+    `max_size`, the least recently used results are evicted. The cache is
+    shared by the event loop and the threads running batch jobs.
+    """
+
+    def __init__(self, max_size: int = RESULT_CACHE_SIZE):
+        self.max_size = max_size
+        self.entries = OrderedDict()  # key -> (result, size)
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(source_text: str, target: str = 'py') -> str:
+        from DHParser.configuration import get_config_values
+        from DHParser.toolkit import md5
+        from ts2pythonParser import script_checksum
+        config = repr(sorted(get_config_values('ts2python.*').items()))
+        return md5(source_text, script_checksum(), config, target)
+
+    @staticmethod
+    def estimate_size(key: str, result) -> int:
+        code, errors = result
+        size = len(key) + (len(code) if isinstance(code, (str, bytes)) else len(repr(code)))
+        return size + sum(len(str(error)) + 64 for error in errors)
+
+    def get(self, key: str):
+        """Returns the cached result for the key or None."""
+        with self.lock:
+            entry = self.entries.get(key, None)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, result):
+        """Adds a result to the cache and evicts the least recently used
+        results, if the cache has grown too large. Results that are larger
+        than the cache are not added."""
+        size = self.estimate_size(key, result)
+        if size > self.max_size:
+            return
+        with self.lock:
+            if key in self.entries:
+                self.size -= self.entries.pop(key)[1]
+            self.entries[key] = (result, size)
+            self.size += size
+            while self.size > self.max_size:
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.size -= evicted_size
+                self.evictions += 1
+
+    def statistics(self) -> dict:
+        with self.lock:
+            return {'entries': len(self.entries), 'size': self.size,
+                    'maxSize': self.max_size, 'hits': self.hits,
+                    'misses': self.misses, 'evictions': self.evictions}
+
+
+def worker_ready() -> int:
+    """Returns the process-id of the worker. Since the initializer of the
+    worker runs before the first task, the worker is warm, once it has
+    answered this task."""
+    return os.getpid()
+
+
+def compile_batch(sources: list) -> list:
+    """Compiles several sources (or files) in one task and returns the
+    list of their results. If compiling a source raises an exception, the
+    exception takes the place of the result."""
+    from ts2pythonParser import compile_src
+    results = []
+    for source in sources:
+        try:
+            results.append(compile_src(source))
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+class WorkerPool(Executor):
+    """A pool of worker processes that are warmed up when the pool is started:
+    Each worker imports ts2pythonParser and instantiates the grammar, the
+    AST-transformer and the compiler in its initializer (warm_up()) before
+    it receives its first task. Starting the pool does not block: The
+    workers are warmed up in the background and the pool counts as warm,
+    once every worker has answered a ping-task with its process-id, so
+    that the warm-up overlaps with the start of the server. Tasks that
+    are submitted earlier wait for their worker to be ready. Workers that
+    fail to warm up are counted and reported to `log_func`.
+
+    To cap the memory growth of long-lived workers, the pool is recycled
+    after `recycle` tasks per worker on average (never, if `recycle` is 0):
+    A new pool is started and warmed up in the background, while the tasks
+    are still submitted to the old pool. As soon as all workers of the new
+    pool are ready, it replaces the old pool, which shuts down after having
+    completed its pending tasks. A new pool that fails to warm up is
+    discarded and the old pool is used for another `recycle` tasks per
+    worker.
+
+    The latency of the tasks, i.e. the time from their submission until
+    their results are available, is recorded separately for the first task
+    of every pool and for all subsequent tasks.
+    """
+
+    def __init__(self, size: int = WORKER_POOL_SIZE, recycle: int = WORKER_RECYCLE_TASKS,
+                 log_func: Optional[Callable[[str], None]] = None):
+        self.size = size or os.cpu_count() or 1
+        self.recycle = recycle
+        self.log_func = log_func
+        self.lock = threading.Lock()
+        self.generation = 0
+        self.tasks = 0            # tasks submitted to the current pool
+        self.recycle_after = self.size * self.recycle  # tasks until the pool is recycled
+        self.warm_up_time = 0.0   # seconds until all workers of the last pool were ready
+        self.warm_up_failures = 0
+        self.latencies = {'first': [0, 0.0, 0.0], 'subsequent': [0, 0.0, 0.0]}
+        self.successor = None     # (pool, warm) of a pool that is warming up
+        self.pool, self.warm = self.start_pool()
+
+    def start_pool(self) -> tuple:
+        """Starts a new pool and returns it together with a future that
+        yields True, as soon as every worker has answered a ping-task with
+        its process-id, or False, if a worker failed. A worker that has
+        finished its initializer early may answer several pings, while
+        another worker is still warming up. Then, the ping is sent again
+        after a short delay."""
+        from ts2pythonParser import warm_up
+        pool = futures.ProcessPoolExecutor(self.size, initializer=warm_up)
+        started = time.perf_counter()
+        warm = futures.Future()
+        pids = set()
+
+        def ping():
+            try:
+                pool.submit(worker_ready).add_done_callback(answered)
+            except RuntimeError as e:  # the pool has been shut down
+                failed(repr(e))
+
+        def failed(reason: str):
+            with self.lock:
+                if warm.done():
+                    return
+                self.warm_up_failures += 1
+                warm.set_result(False)
+            if self.log_func is not None:
+                self.log_func(f'Worker process could not be warmed up: {reason}')
+
+        def answered(future: futures.Future):
+            if future.cancelled() or future.exception() is not None:
+                failed('cancelled' if future.cancelled() else repr(future.exception()))
+                return
+            with self.lock:
+                if warm.done():
+                    return
+                pid = future.result()
+                if pid in pids:
+                    # not submitted from the pool's management thread, which runs this callback
+                    threading.Timer(PING_DELAY, ping).start()
+                    return
+                pids.add(pid)
+                if len(pids) == self.size:
+                    self.warm_up_time = time.perf_counter() - started
+                    warm.set_result(True)
+
+        for _ in range(self.size):
+            ping()
+        return pool, warm
+
+    def wait_warm(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until all workers of the current pool are ready or the
+        timeout has expired. Returns True, if all workers have been warmed
+        up successfully."""
+        try:
+            return self.warm.result(timeout)
+        except futures.TimeoutError:
+            return False
+
+    def record(self, kind: str, latency: float):
+        with self.lock:
+            statistics = self.latencies[kind]
+            statistics[0] += 1
+            statistics[1] += latency
+            statistics[2] = max(statistics[2], latency)
+
+    def submit(self, fn, /, *args, **kwargs) -> futures.Future:
+        retired = None
+        with self.lock:
+            if self.successor is not None and self.successor[1].done():
+                if self.successor[1].result():
+                    retired = self.pool
+                    self.pool, self.warm = self.successor
+                    self.generation += 1
+                    self.tasks = 0
+                    self.recycle_after = self.size * self.recycle
+                else:
+                    retired = self.successor[0]
+                    self.recycle_after = self.tasks + self.size * self.recycle
+                self.successor = None
+            elif self.recycle and self.successor is None \
+                    and self.tasks >= self.recycle_after:
+                self.successor = self.start_pool()
+            kind = 'subsequent' if self.tasks else 'first'
+            self.tasks += 1
+            submitted = time.perf_counter()
+            future = self.pool.submit(fn, *args, **kwargs)
+        if retired is not None:
+            retired.shutdown(wait=False)
+        future.add_done_callback(
+            lambda _: self.record(kind, time.perf_counter() - submitted))
+        return future
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False):
+        with self.lock:
+            pools = [self.pool] + ([self.successor[0]] if self.successor else [])
+            self.successor = None
+        for pool in pools:
+            if cancel_futures:  # the parameter has been added in Python 3.9
+                pool.shutdown(wait=wait, cancel_futures=True)
+            else:
+                pool.shutdown(wait=wait)
+
+    def statistics(self) -> dict:
+        """Returns the size of the pool, the number of tasks per worker after
+        which the pool is recycled, the number of recycles, the warm-up time
+        in milliseconds, the number of workers that failed to warm up and
+        the count, the mean and the maximum of the latencies in milliseconds
+        of the first and of subsequent tasks."""
+        with self.lock:
+            latencies = {kind: {'count': count,
+                                'mean': round(1000 * total / count, 3) if count else 0.0,
+                                'max': round(1000 * maximum, 3)}
+                         for kind, (count, total, maximum) in self.latencies.items()}
+            return {'size': self.size, 'recycleAfter': self.recycle,
+                    'generation': self.generation, 'tasks': self.tasks,
+                    'warmUp': round(1000 * self.warm_up_time, 3),
+                    'warmUpFailures': self.warm_up_failures, **latencies}
+
+
+def is_busy_error(response) -> bool:
+    """Returns True, if the (decoded) response is a "server busy"-error."""
+    try:
+        return response['error']['code'] == SERVER_BUSY
+    except (TypeError, KeyError, IndexError):
+        return False
+
+
+class AdmissionControl:
+    """Bounds the number of pending requests, i.e. of requests that have
+    been admitted but not yet finished, separately for every kind of
+    request. Requests beyond the limit of their kind are not queued but
+    rejected with a "server busy"-error (see `busy_error()`), so that the
+    latency of the admitted requests stays bounded and the memory used for
+    the queued tasks does not grow with the load. The client can resend a
+    rejected request later or compile it itself. A limit of 0 means that
+    requests of that kind are never rejected.
+
+    The instance is only accessed from the event loop and, therefore,
+    needs no lock.
+    """
+
+    def __init__(self, limits: dict):
+        self.limits = dict(limits)
+        self.pending = {kind: 0 for kind in self.limits}
+        self.peak = {kind: 0 for kind in self.limits}
+        self.admitted = {kind: 0 for kind in self.limits}
+        self.rejected = {kind: 0 for kind in self.limits}
+        self.coalesced = 0
+
+    def admit(self, kind: str) -> bool:
+        """Admits a request of the given kind and returns True, or returns
+        False, if the limit of pending requests of this kind is reached."""
+        if 0 < self.limits[kind] <= self.pending[kind]:
+            self.rejected[kind] += 1
+            return False
+        self.pending[kind] += 1
+        self.admitted[kind] += 1
+        self.peak[kind] = max(self.peak[kind], self.pending[kind])
+        return True
+
+    def release(self, kind: str):
+        """Marks an admitted request of the given kind as finished."""
+        self.pending[kind] -= 1
+
+    def busy_error(self, kind: str) -> dict:
+        return {'error': {'code': SERVER_BUSY,
+                          'message': f'Server busy: {self.pending[kind]} {kind}-requests '
+                                     f'are pending. Please, try again later.'}}
+
+    def statistics(self) -> dict:
+        return {kind: {'pending': self.pending[kind], 'limit': self.limits[kind],
+                       'peak': self.peak[kind], 'admitted': self.admitted[kind],
+                       'rejected': self.rejected[kind]}
+                for kind in self.limits}
+
+
+class RequestBatcher:
+    """Submits compilation requests to the worker pool. As long as a worker
+    is idle, every request is submitted as a task of its own. When all
+    workers are busy, requests for small sources are held back and
+    submitted together as a single task (compile_batch()) as soon as a
+    worker has finished its task or `size` requests have been collected,
+    which saves the overhead of passing many small tasks to the workers
+    one by one. A `size` of 1 turns batching off.
+
+    The instance is only accessed from the event loop and, therefore,
+    needs no lock.
+    """
+
+    def __init__(self, pool: WorkerPool, size: int = BATCH_SIZE,
+                 source_limit: int = BATCH_SOURCE_LIMIT):
+        self.pool = pool
+        self.size = size
+        self.source_limit = source_limit
+        self.running = 0   # submitted tasks that have not yet been completed
+        self.held = []     # (source, future)-tuples of the requests held back
+        self.batches = 0   # tasks with more than one request
+        self.batched = 0   # requests that were submitted as part of a batch
+
+    def compile(self, source: str, source_size: int) -> asyncio.Future:
+        """Returns a future for the result of compiling the source, which
+        may also be the name of a file."""
+        future = asyncio.get_running_loop().create_future()
+        if self.size > 1 and source_size <= self.source_limit \
+                and self.running >= self.pool.size:
+            self.held.append((source, future))
+            if len(self.held) >= self.size:
+                self.flush()
+        else:
+            self.submit([(source, future)])
+        return future
+
+    def flush(self):
+        """Submits the requests that have been held back."""
+        requests, self.held = self.held, []
+        if requests:
+            self.submit(requests)
+
+    def submit(self, requests: list):
+        self.running += 1
+        if len(requests) > 1:
+            self.batches += 1
+            self.batched += len(requests)
+        task = asyncio.wrap_future(
+            self.pool.submit(compile_batch, [source for source, _ in requests]))
+        task.add_done_callback(partial(self.completed, requests))
+
+    def completed(self, requests: list, task: asyncio.Future):
+        self.running -= 1
+        if task.cancelled():
+            results = [asyncio.CancelledError()] * len(requests)
+        elif task.exception() is not None:
+            results = [task.exception()] * len(requests)
+        else:
+            results = task.result()
+        for (_, future), result in zip(requests, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+        self.flush()
+
+    def statistics(self) -> dict:
+        return {'running': self.running, 'held': len(self.held), 'batchSize': self.size,
+                'batches': self.batches, 'batched': self.batched}
+
+
+class BatchProgress:
+    """Reports the progress of a batch job to the client while the job is
+    running: "$/progress"-notifications with the work done progress token
+    `token` when the job begins, after every file and when it ends, and a
+    notification "ts2python/fileCompiled" with the name of the output and
+    the diagnostics of every file as soon as the output has been written,
+    so that the client can process it before the job has been finished.
+
+    Besides the message and the percentage of the Language Server Protocol,
+    the reports contain the number of files done, the number of bytes of
+    the sources processed and the throughput in bytes per second.
+
+    The methods are called from the thread that runs the batch job (and
+    from the threads of the worker pool), while the notifications are sent
+    by the event loop.
+    """
+
+    def __init__(self, connection, token):
+        self.connection = connection
+        self.token = token
+        self.lock = threading.Lock()
+        self.files_total = 0
+        self.files_done = 0
+        self.bytes_processed = 0
+        self.started = time.perf_counter()
+
+    def notify(self, method: str, params: dict):
+        asyncio.run_coroutine_threadsafe(
+            self.connection.server_notification(method, params), self.connection.exec.loop)
+
+    def progress(self, value: dict):
+        self.notify('$/progress', {'token': self.token, 'value': value})
+
+    def begin(self, file_names: list):
+        self.files_total = len(file_names)
+        self.started = time.perf_counter()
+        self.progress({'kind': 'begin', 'title': 'ts2python',
+                       'message': f'0/{self.files_total} files', 'percentage': 0,
+                       'cancellable': False})
+
+    def file_done(self, source: str, output: str, error_file: str, errors=(),
+                  up_to_date: bool = False):
+        """Reports a source file of the batch."""
+        size = os.path.getsize(source) if os.path.isfile(source) else 0
+        with self.lock:
+            self.files_done += 1
+            self.bytes_processed += size
+            files_done, bytes_processed = self.files_done, self.bytes_processed
+            throughput = bytes_processed / max(time.perf_counter() - self.started, 1e-6)
+            self.notify('ts2python/fileCompiled',
+                        {'source': source, 'output': output, 'errorFile': error_file,
+                         'upToDate': up_to_date,
+                         'diagnostics': [error.diagnostic_obj() for error in errors]})
+            self.progress({'kind': 'report',
+                           'message': f'{files_done}/{self.files_total} files, '
+                                      f'{bytes_processed // 1024} kB, '
+                                      f'{throughput / 1024:.0f} kB/s',
+                           'percentage': 100 * files_done // max(self.files_total, 1),
+                           'filesDone': files_done, 'filesTotal': self.files_total,
+                           'bytesProcessed': bytes_processed,
+                           'throughput': round(throughput)})
+
+    def end(self, error_files):
+        message = f'{self.files_done} files compiled'
+        if isinstance(error_files, list) and error_files:
+            message += f', {len(error_files)} with errors or warnings'
+        self.progress({'kind': 'end', 'message': message})
+
+
 class ts2pythonCPUBoundTasks:
     def __init__(self, lsp_data: dict):
         from DHParser.lsp import gen_lsp_table
@@ -177,6 +646,13 @@ class ts2pythonLanguageServerProtocol:
             'serverCapabilities': {}
         }
         self.connection = None
+        self.worker_pool = None
+        self.batcher = None
+        self.result_cache = ResultCache()
+        self.admission = AdmissionControl({'compile': MAX_PENDING_COMPILES,
+                                           'batch': MAX_PENDING_BATCH_JOBS})
+        self.in_flight = {}  # cache key -> future of a compilation that is under way
+        self.batch_count = 0
         self.cpu_bound = ts2pythonCPUBoundTasks(self.lsp_data)
         self.blocking = ts2pythonBlockingTasks(self.lsp_data)
         self.lsp_table = gen_lsp_table(self, prefix='lsp_')
@@ -188,6 +664,10 @@ class ts2pythonLanguageServerProtocol:
 
     def connect(self, connection):
         self.connection = connection
+        if self.worker_pool is None:
+            self.worker_pool = WorkerPool(WORKER_POOL_SIZE, WORKER_RECYCLE_TASKS,
+                                          log_func=lambda msg: self.connection.log(msg))
+            self.batcher = RequestBatcher(self.worker_pool, BATCH_SIZE)
 
     def lsp_initialize(self, **kwargs):
         # # This has been taken care of by DHParser.server.Server.lsp_verify_initialization()
@@ -203,19 +683,69 @@ class ts2pythonLanguageServerProtocol:
     def lsp_custom(self, **kwargs):
         return kwargs
 
+    def lsp_ts2python_cacheStatistics(self, **kwargs):
+        """Returns the number of entries, the estimated size in bytes and the
+        number of hits, misses and evictions of the result cache."""
+        return self.result_cache.statistics()
+
+    def lsp_ts2python_workerStatistics(self, **kwargs):
+        """Returns the size, the warm-up time and the latencies of the first
+        and of subsequent tasks of the worker pool."""
+        return self.worker_pool.statistics()
+
+    def lsp_ts2python_loadStatistics(self, **kwargs):
+        """Returns the pending, admitted and rejected requests per kind of
+        request, the number of coalesced requests and the number of batches."""
+        return {'requests': self.admission.statistics(),
+                'coalesced': self.admission.coalesced,
+                'inFlight': len(self.in_flight),
+                **self.batcher.statistics()}
+
+    async def lsp_ts2python_compileBatch(self, inDir: str = '.', outDir: str = 'out',
+                                         files: list = (), workDoneToken=None, **kwargs):
+        """Compiles the files like the batch request "--in inDir --out outDir
+        files...", but reports the progress while the job is running with
+        "$/progress"-notifications under the workDoneToken (or a token
+        generated by the server, if the client has not passed one) and each
+        compiled file with a "ts2python/fileCompiled"-notification. Returns
+        the list of error-messages files."""
+        if not self.admission.admit('batch'):
+            return self.admission.busy_error('batch')
+        try:
+            self.batch_count += 1
+            progress = BatchProgress(self.connection,
+                                     workDoneToken or f'ts2python-batch-{self.batch_count}')
+            exenv = self.connection.exec
+            result = await exenv.loop.run_in_executor(
+                exenv.thread_executor,
+                partial(self.batch_files, inDir, outDir, list(files) or ['.'], progress))
+        finally:
+            self.admission.release('batch')
+        if isinstance(result, str):
+            return {'error': {'code': -32602, 'message': result}}  # InvalidParams
+        return {'errorFiles': result}
+
     def lsp_shutdown(self, **kwargs):
         self.lsp_data['processId'] = 0
         self.lsp_data['rootUri'] = ''
         self.lsp_data['clientCapabilities'] = {}
         return {}
 
-    def batch_job(self, argstr: str):
-        from ts2pythonParser import batch_process
+    def batch_job(self, argstr: str, progress: Optional['BatchProgress'] = None):
         args = argstr.split(' ')
         indir, outdir = args[1], args[3]
 
         assert args[0] == '--in'
         assert args[2] == '--out'
+        return self.batch_files(indir, outdir, args[4:], progress)
+
+    def batch_files(self, indir: str, outdir: str, entries: list,
+                    progress: Optional['BatchProgress'] = None):
+        """Compiles the files listed in entries (or the files of the first
+        directory among them) relative to indir and writes the results to
+        outdir. Returns the list of error-messages files or an error message.
+        If progress is given, the progress is reported to the client."""
+        from ts2pythonParser import batch_process
         if not os.path.exists(outdir): os.mkdir(outdir)
         elif not os.path.isdir(outdir):
             return 'Output directory "%s" exists and is not a directory!' % outdir
@@ -225,7 +755,7 @@ class ts2pythonLanguageServerProtocol:
             return 'Input place "%s" is not a directory!' % indir
 
         file_names = []
-        for entry in args[4:]:
+        for entry in entries:
             if not os.path.isabs(entry):
                 entry = os.path.abspath(os.path.join(indir, entry))
             if os.path.isdir(entry):
@@ -236,25 +766,183 @@ class ts2pythonLanguageServerProtocol:
                 break  # allow at most one directory
             else:
                 file_names.append(entry)
-        exenv = self.connection.exec
-        error_list = batch_process(file_names, outdir, submit_func=exenv.submit_as_process,
-                                   log_func=self.connection.log)
+        if progress is not None:
+            progress.begin(file_names)
+        if not self.plain_output():
+            def submit(func, *args):
+                # _process_file() expects its arguments as a tuple
+                future = self.worker_pool.submit(func, args)
+                if progress is None:
+                    return future
+                # batch_process() waits for the report of the file, not just for the file
+                reported = futures.Future()
+                future.add_done_callback(partial(self.processed, args[0],
+                                                 self.output_name(args[0], outdir),
+                                                 progress, reported))
+                return reported
+            error_list = batch_process(file_names, outdir, submit_func=submit,
+                                       log_func=self.connection.log)
+        else:
+            error_list = self.cached_batch(file_names, outdir, progress)
+        if progress is not None:
+            progress.end(error_list)
         return error_list
 
+    @staticmethod
+    def output_name(file_name: str, outdir: str) -> str:
+        """Returns the name of the module or the package directory to which
+        the result of compiling the file is written."""
+        from DHParser.configuration import get_config_value
+        from ts2pythonParser import python_module_name, result_file_name
+        if get_config_value('ts2python_package_output', 0):
+            return os.path.join(outdir, python_module_name(file_name, os.path.dirname(file_name)))
+        return result_file_name(file_name, outdir)
+
+    @staticmethod
+    def processed(file_name: str, output: str, progress: 'BatchProgress',
+                  reported: futures.Future, future: futures.Future):
+        """Reports a file that has been compiled by batch_process() with
+        package or chunked output and passes on the outcome to `reported`.
+        The diagnostics are only written to the error-messages file in
+        this case."""
+        if future.cancelled():
+            reported.cancel()
+            return
+        try:
+            if future.exception() is None:
+                progress.file_done(file_name, output, future.result() or '')
+        finally:
+            if future.exception() is None:
+                reported.set_result(future.result())
+            else:
+                reported.set_exception(future.exception())
+
+    @staticmethod
+    def plain_output() -> bool:
+        """Returns True, if every source is compiled into a single module
+        in one go, which is a precondition for caching the results."""
+        from DHParser.configuration import get_config_value
+        return not get_config_value('ts2python_package_output', 0) \
+            and not get_config_value('ts2python_chunk_size', 0)
+
+    def cached_batch(self, file_names: list, outdir: str,
+                     progress: Optional['BatchProgress'] = None) -> list:
+        """Compiles the files and writes the results to outdir like
+        batch_process(), but takes the results from the result cache, if
+        possible, and adds the results of compiled files to the cache. The
+        results are written as soon as they are available. Returns the list
+        of error-messages files."""
+        from ts2pythonParser import compile_src, result_file_name, result_up_to_date
+        error_files = [''] * len(file_names)
+        pending = {}  # future -> (index, key)
+        for i, file_name in enumerate(file_names):
+            with open(file_name, 'r', encoding='utf-8') as f:
+                source = f.read()
+            key = self.result_cache.key(source)
+            result = self.result_cache.get(key)
+            if result is not None:
+                error_files[i] = self.write_batch_result(file_name, outdir, result, progress)
+            elif not result_up_to_date(result_file_name(file_name, outdir), source):
+                pending[self.worker_pool.submit(compile_src, file_name)] = (i, key)
+            elif progress is not None:
+                progress.file_done(file_name, result_file_name(file_name, outdir), '',
+                                   up_to_date=True)
+        for future in futures.as_completed(pending):
+            i, key = pending[future]
+            result = future.result()
+            self.result_cache.put(key, result)
+            error_files[i] = self.write_batch_result(file_names[i], outdir, result, progress)
+        return [error_file for error_file in error_files if error_file]
+
+    def write_batch_result(self, file_name: str, outdir: str, result: tuple,
+                           progress: Optional['BatchProgress'] = None) -> str:
+        """Writes the result of compiling a file of a batch, logs and reports
+        it and returns the name of the error-messages file or the empty
+        string."""
+        from ts2pythonParser import result_file_name, write_result
+        output = result_file_name(file_name, outdir)
+        error_file = write_result(*result, file_name, output)
+        self.connection.log(f'Compiled "{os.path.basename(file_name)}"'
+                            + (' with ' + error_file[error_file.rfind('_') + 1:-4]
+                               if error_file else ''))
+        if progress is not None:
+            progress.file_done(file_name, output, error_file, result[1])
+        return error_file
+
     # def simply_compile(self, argstr):
     #     from ts2pythonParser import compile_src
     #     return compile_src(argstr)
 
     async def simply_compile(self, argstr: str):
         from functools import partial
-        from ts2pythonParser import compile_src
-        exenv = self.connection.exec
-        if argstr[:2] != '--':
-            return await exenv.loop.run_in_executor(
-                exenv.process_executor, partial(compile_src, argstr))
+        from ts2pythonParser import process_file
+        if argstr.startswith(COMPILE_FILE_REQUEST):
+            import json
+            if not self.admission.admit('compile'):
+                return self.admission.busy_error('compile')
+            try:
+                exenv = self.connection.exec
+                params = json.loads(argstr[len(COMPILE_FILE_REQUEST):])
+                if self.plain_output() and os.path.isfile(params['source']):
+                    error_list = await exenv.loop.run_in_executor(
+                        exenv.thread_executor,
+                        partial(self.cached_batch, [params['source']], params['out_dir']))
+                    return {'errorFile': error_list[0] if error_list else ''}
+                error_file = await exenv.loop.run_in_executor(
+                    self.worker_pool,
+                    partial(process_file, params['source'], params['out_dir']))
+                return {'errorFile': error_file}
+            finally:
+                self.admission.release('compile')
+        elif argstr[:2] != '--':
+            from DHParser.toolkit import load_if_file
+            source = load_if_file(argstr)
+            key = self.result_cache.key(source)
+            result = self.result_cache.get(key)
+            if result is not None:
+                return result
+            future = self.in_flight.get(key, None)
+            if future is not None:
+                # an identical source is being compiled, right now
+                self.admission.coalesced += 1
+            elif not self.admission.admit('compile'):
+                return self.admission.busy_error('compile')
+            else:
+                future = self.batcher.compile(argstr, len(source))
+                self.in_flight[key] = future
+                future.add_done_callback(partial(self.compiled, key))
+            return await asyncio.shield(future)
         else:
-            return await exenv.loop.run_in_executor(
-                exenv.thread_executor, partial(self.batch_job, argstr))
+            if not self.admission.admit('batch'):
+                return self.admission.busy_error('batch')
+            try:
+                exenv = self.connection.exec
+                return await exenv.loop.run_in_executor(
+                    exenv.thread_executor, partial(self.batch_job, argstr))
+            finally:
+                self.admission.release('batch')
+
+    def compiled(self, key: str, future: asyncio.Future):
+        """Caches the result of a compilation that has been admitted by
+        simply_compile() and releases it."""
+        del self.in_flight[key]
+        self.admission.release('compile')
+        if not future.cancelled() and future.exception() is None:
+            self.result_cache.put(key, future.result())
+
+
+def start_forkserver():
+    """Starts the forkserver from which the worker processes are forked.
+    The forkserver imports ts2pythonParser and instantiates the grammar, the
+    AST-transformer and the compiler (see ts2pythonParser.warm_up()) once,
+    so that every worker inherits them instead of building them anew."""
+    from multiprocessing import forkserver, set_forkserver_preload
+    set_forkserver_preload(['ts2pythonParser'])
+    os.environ[WARM_UP_ON_IMPORT] = '1'
+    try:
+        forkserver.ensure_running()
+    finally:
+        del os.environ[WARM_UP_ON_IMPORT]
 
 
 def run_server(host, port, log_path=None):
@@ -267,7 +955,8 @@ def run_server(host, port, log_path=None):
 
     from multiprocessing import set_start_method
     # 'forkserver' or 'spawn' required to avoid broken process pools
-    if sys.platform.lower().startswith('linux') :  set_start_method('forkserver')
+    if sys.platform.lower().startswith('linux') :
+        set_start_method('forkserver')
     else:  set_start_method('spawn')
 
     try:
@@ -285,13 +974,22 @@ def run_server(host, port, log_path=None):
             if dhparserdir not in sys.path:  sys.path.insert(0, dhparserdir)
 
     from DHParser.dsl import recompile_grammar
-    if grammar_src and not recompile_grammar(grammar_src, force=False,
+    # ts2pythonParser must not be imported before it has been regenerated
+    from ts2python.grammar_stamp import grammar_verified, record_grammar_snapshot
+    parser_src = grammar_src[:-5] + 'Parser.py'
+    if not grammar_src or grammar_verified(grammar_src, parser_src):
+        pass
+    elif not recompile_grammar(grammar_src, force=False,
             notify=lambda: print('recompiling ' + grammar_src)):
         print('\nErrors while recompiling "%s":' % grammar_src +
               '\n--------------------------------------\n\n')
         with open('ts2python_ebnf_ERRORS.txt', 'r', encoding='utf-8') as f:
             print(f.read())
         sys.exit(1)
+    else:
+        record_grammar_snapshot(grammar_src, parser_src)
+    if sys.platform.lower().startswith('linux'):
+        start_forkserver()
 
     from DHParser.server import Server, probe_tcp_server, StreamReaderProxy, StreamWriterProxy
     # from DHParser.lsp import gen_lsp_table
@@ -316,6 +1014,8 @@ def run_server(host, port, log_path=None):
         reader = StreamReaderProxy(sys.stdin)
         writer = StreamWriterProxy(sys.stdout)
         ts2python_server.run_stream_server(reader, writer)
+        if ts2python_lsp.worker_pool is not None:
+            ts2python_lsp.worker_pool.shutdown(wait=False)
         return
 
     cfg_filename = get_config_filename()
@@ -368,6 +1068,8 @@ def run_server(host, port, log_path=None):
         finally:
             if not ports:
                 echo('Server on %s:%i stopped' % (host, port))
+                if ts2python_lsp.worker_pool is not None:
+                    ts2python_lsp.worker_pool.shutdown(wait=False)
                 try:
                     os.remove(cfg_filename)
                     verbose('removing temporary config file: ' + cfg_filename)
@@ -387,6 +1089,24 @@ async def send_request(reader, writer, request, timeout=SERVER_REPLY_TIMEOUT) ->
     return data.decode()
 
 
+async def send_json_request(reader, writer, request, timeout=SERVER_REPLY_TIMEOUT):
+    """Sends a request and returns the decoded JSON-response. The server
+    precedes JSON-responses with a "Content-Length"-header, which is
+    stripped before decoding."""
+    import json
+    writer.write(request.encode() if isinstance(request, str) else request)
+    data = await asyncio.wait_for(reader.read(DATA_RECEIVE_LIMIT), timeout)
+    if data.startswith(b'Content-Length:'):
+        while data.find(b'\r\n\r\n') < 0:
+            data += await asyncio.wait_for(reader.read(DATA_RECEIVE_LIMIT), timeout)
+        i = data.find(b'\r\n\r\n')
+        length = int(data[len(b'Content-Length:'):i].strip())
+        data = data[i + 4:]
+        if len(data) < length:
+            data += await asyncio.wait_for(reader.readexactly(length - len(data)), timeout)
+    return json.loads(data.decode())
+
+
 async def close_connection(writer):
     """Closes the communication-channel."""
     writer.close()
@@ -478,11 +1198,14 @@ async def start_server_daemon(host, port, requests, timeout=SERVER_REPLY_TIMEOUT
         else:
             verbose('Connection to server "%s" established.' % ident)
     else:
+        options = ['--workers', str(WORKER_POOL_SIZE), '--recycle', str(WORKER_RECYCLE_TASKS),
+                   '--maxpending', str(MAX_PENDING_COMPILES), '--batch', str(BATCH_SIZE)]
         try:
             if sys.platform.find('win') >= 0:  raise OSError
-            subprocess.Popen([__file__, '--startserver', host, str(port)])
+            subprocess.Popen([__file__, '--startserver', host, str(port)] + options)
         except OSError:
-            subprocess.Popen([sys.executable, __file__, '--startserver', host, str(port)])
+            subprocess.Popen([sys.executable, __file__, '--startserver', host, str(port)]
+                             + options)
         verbose('Server starting on %s:%i.' % (host, port))
         reader, writer, ident = await connect_to_daemon(host, port)
         if ident is None:
@@ -502,6 +1225,56 @@ async def start_server_daemon(host, port, requests, timeout=SERVER_REPLY_TIMEOUT
     return results
 
 
+async def compile_on_daemon(file_names, out_dir, host, port) -> list:
+    """Sends requests to compile the files to a running daemon. Returns the
+    list of error-files (or empty strings) or None, if no daemon could be
+    reached or the daemon failed to process the requests."""
+    import json
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), 1.0)
+    except (OSError, asyncio.TimeoutError):
+        return None
+    try:
+        ident = await send_request(reader, writer, IDENTIFY_REQUEST, 2.0)
+        if ident.find(servername) < 0:
+            return None
+        error_files = []
+        for file_name in file_names:
+            request = COMPILE_FILE_REQUEST + json.dumps({'source': file_name, 'out_dir': out_dir})
+            response = await send_json_request(reader, writer, request, SERVER_REPLY_TIMEOUT)
+            for delay in BUSY_RETRY_DELAYS:
+                if not is_busy_error(response):
+                    break
+                await asyncio.sleep(delay)
+                response = await send_json_request(reader, writer, request, SERVER_REPLY_TIMEOUT)
+            # if the server is still busy, the KeyError leads to compiling in-process
+            error_files.append(response['errorFile'])
+        return error_files
+    except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError, KeyError,
+            TypeError):
+        return None
+    finally:
+        await close_connection(writer)
+
+
+def compile_files(file_names, out_dir, host, port) -> list:
+    """Compiles the files on a running daemon, or, if no daemon is running,
+    in the current process and returns the list of error-files."""
+    file_names = [os.path.abspath(file_name) for file_name in file_names]
+    out_dir = os.path.abspath(out_dir)
+    os.makedirs(out_dir, exist_ok=True)
+    error_files = None
+    if os.path.exists(get_config_filename()):
+        error_files = asyncio_run(compile_on_daemon(file_names, out_dir, host, port))
+    if error_files is None:
+        verbose('No daemon running on %s:%i. Compiling in-process.' % (host, port))
+        if scriptpath not in sys.path:
+            sys.path.append(scriptpath)
+        from ts2pythonParser import process_file
+        error_files = [process_file(file_name, out_dir) for file_name in file_names]
+    return [error_file for error_file in error_files if error_file]
+
+
 def parse_logging_args(args):
     if args.logging or args.logging is None:
         global host, port
@@ -524,6 +1297,7 @@ def parse_logging_args(args):
 
 
 def main():
+    global WORKER_POOL_SIZE, WORKER_RECYCLE_TASKS, MAX_PENDING_COMPILES, BATCH_SIZE
     from argparse import ArgumentParser, REMAINDER
     parser = ArgumentParser(description="Setup and Control of a Server for processing ts2python-files.")
     action_group = parser.add_mutually_exclusive_group()
@@ -537,6 +1311,9 @@ def main():
     action_group.add_argument('-k', '--stopserver', action='store_true',
                               help="starts the server")
     action_group.add_argument('-r', '--stream', action='store_true', help="start stream server")
+    action_group.add_argument('-c', '--compile', nargs='+', metavar="FILE",
+                              help="compiles the files on a running daemon or, "
+                                   "if there is none, in-process")
     parser.add_argument('-a', '--host', nargs=1, default=[''],
                         help='host name or IP-address of the server (default: 127.0.0.1)')
     parser.add_argument('-p', '--port', nargs=1, type=int, default=[-1],
@@ -546,6 +1323,19 @@ def main():
                              'specific directory (implies on)')
     parser.add_argument('-o', '--out', nargs='?',
                         help='output directory for batch processing')
+    parser.add_argument('-w', '--workers', nargs=1, type=int, default=[WORKER_POOL_SIZE],
+                        help='number of worker processes of the server (default: one per CPU)')
+    parser.add_argument('--recycle', nargs=1, type=int, default=[WORKER_RECYCLE_TASKS],
+                        metavar='TASKS',
+                        help='replace the worker processes after this many tasks per '
+                             'worker, 0 means never (default: %i)' % WORKER_RECYCLE_TASKS)
+    parser.add_argument('--maxpending', nargs=1, type=int, default=[MAX_PENDING_COMPILES],
+                        metavar='N',
+                        help='reject compile requests as "server busy" while N requests are '
+                             'pending, 0 means no limit (default: %i)' % MAX_PENDING_COMPILES)
+    parser.add_argument('--batch', nargs=1, type=int, default=[BATCH_SIZE], metavar='N',
+                        help='compile up to N small sources in one worker task while all '
+                             'workers are busy, 1 means no batching (default: %i)' % BATCH_SIZE)
     parser.add_argument('-v', '--verbose', action='store_true', help="verbose messages")
     parser.add_argument('more_files', nargs='*')
 
@@ -555,6 +1345,10 @@ def main():
 
     host = args.host[0]
     port = int(args.port[0])
+    WORKER_POOL_SIZE = max(args.workers[0], 0)
+    WORKER_RECYCLE_TASKS = max(args.recycle[0], 0)
+    MAX_PENDING_COMPILES = max(args.maxpending[0], 0)
+    BATCH_SIZE = max(args.batch[0], 1)
 
     if args.stream:
         CONNECTION_TYPE = 'streams'
@@ -599,6 +1393,11 @@ def main():
         log_path, _ = parse_logging_args(args)
         sys.exit(run_server(host, port, log_path))
 
+    elif args.compile:
+        for error_file in compile_files(args.compile, args.out or '.', host, port):
+            with open(error_file, 'r', encoding='utf-8') as f:
+                echo(f.read())
+
     elif args.startdaemon:
         log_path, log_request = parse_logging_args(args)
         asyncio.run(start_server_daemon(host, port, [log_request] if log_request else []))
@@ -637,11 +1436,12 @@ def main():
 
     else:
         echo('Usages:\n'
-             + '    python ts2pythonServer.py --startserver [--host host] [--port port] [--logging [ON|LOG_PATH|OFF]]\n'
-             + '    python ts2pythonServer.py --startdaemon [--host host] [--port port] [--logging [ON|LOG_PATH|OFF]]\n'
+             + '    python ts2pythonServer.py --startserver [--host host] [--port port] [--logging [ON|LOG_PATH|OFF]] [--workers N] [--recycle TASKS] [--maxpending N] [--batch N]\n'
+             + '    python ts2pythonServer.py --startdaemon [--host host] [--port port] [--logging [ON|LOG_PATH|OFF]] [--workers N] [--recycle TASKS] [--maxpending N] [--batch N]\n'
              + '    python ts2pythonServer.py --stream\n'
              + '    python ts2pythonServer.py --stopserver\n'
              + '    python ts2pythonServer.py --status\n'
+             + '    python ts2pythonServer.py --compile FILENAME.ts [FILENAME.ts ...] [--out DIR]\n'
              + '    python ts2pythonServer.py --logging [ON|LOG_PATH|OFF]\n'
              + '    python ts2pythonServer.py FILENAME.dsl [--host host] [--port port]  [--logging [ON|LOG_PATH|OFF]]')
         sys.exit(1)